@@ -8,6 +8,7 @@ from templates.multi_turns import MultiTurnsPage
 from templates.history import HistoryPage
 from templates.scenario import ScenarioPage
 from templates.pathways import PathwaysPage
+from templates.sensitivity import SensitivityPage
 from utils.data_manager import DataManager
 
 def main():
@@ -46,6 +47,7 @@ def main():
         "📜 Histórico",
         "🔍 Cenários",
         "🛤️ Caminhos",
+        "🎯 Sensibilidade",
         "📚 Conceitos"
     ])
     
@@ -64,6 +66,8 @@ def main():
     with tabs[6]:
         PathwaysPage(data_manager).render()
     with tabs[7]:
+        SensitivityPage(data_manager).render()
+    with tabs[8]:
         ConceptsPage().render()
 
 if __name__ == "__main__":
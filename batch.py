@@ -0,0 +1,109 @@
+# batch.py: Execução de simulações em lote pela linha de comando (sem Streamlit)
+import argparse
+import logging
+import os
+import sys
+
+from utils.data_manager import DataManager
+from models.batch_runner import run_batch, write_summary
+from models.hospital_sim import ENGINES
+from models.jit_kernel import BACKENDS
+from models.farm import FarmCoordinator, run_worker
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Executa configurações YAML/JSON do planejador hospitalar sem interface gráfica."
+    )
+    parser.add_argument("configs", nargs="*", help="Ficheiros ou diretórios com configurações YAML/JSON")
+    parser.add_argument("-r", "--replications", type=int, default=1, help="Replicações por configuração")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Processos em paralelo")
+    parser.add_argument("--engine", choices=ENGINES, default="simpy", help="Motor de simulação")
+    parser.add_argument("--seed", type=int, default=0, help="Semente da primeira replicação")
+    parser.add_argument("--sessions-dir", default="sessions", help="Diretório onde gravar as sessões")
+    parser.add_argument("--no-sessions", action="store_true", help="Não gravar ficheiros de sessão")
+    parser.add_argument("-o", "--output", default="resumo_lote.csv", help="Tabela de resumo (.csv ou .json)")
+    parser.add_argument("--replay", metavar="SESSAO",
+                        help="Reproduzir os percursos de uma sessão (.json) ou traço (.npz) em cada configuração")
+    parser.add_argument("--kernel", choices=BACKENDS,
+                        help="Amostrar os percursos em lote com este núcleo (numba/numpy) e simular só a contenção")
+    parser.add_argument("--farm", metavar="HOST:PORTA",
+                        help="Coordenar trabalhadores remotos em vez de simular localmente")
+    parser.add_argument("--lease-seconds", type=float, default=600.0,
+                        help="Prazo para um trabalhador devolver uma unidade antes de ser repetida")
+    parser.add_argument("--worker", metavar="URL", help="Trabalhar para o coordenador em URL (ex.: http://host:8765)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Mostrar progresso detalhado")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Função principal da execução em lote."""
+    args = parse_args(argv)
+    # Os modelos registam cada passo em DEBUG; num lote só interessa o progresso
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    logging.getLogger("models").setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    if args.worker:
+        completed = run_worker(args.worker)
+        print(f"Trabalhador terminou: {completed} unidades executadas.")
+        return 0
+
+    data_manager = DataManager()
+    try:
+        configs = data_manager.load_config_files(args.configs)
+    except (OSError, ValueError) as e:
+        print(f"Erro ao carregar configurações: {e}", file=sys.stderr)
+        return 2
+    if not configs:
+        print("Nenhuma configuração encontrada.", file=sys.stderr)
+        return 2
+
+    if args.replay and not os.path.isfile(args.replay):
+        print(f"Traço não encontrado: {args.replay}", file=sys.stderr)
+        return 2
+
+    if args.replay and args.kernel:
+        print("--replay e --kernel não podem ser usados juntos.", file=sys.stderr)
+        return 2
+
+    if args.farm:
+        if args.replay or args.kernel:
+            print("--replay e --kernel não são suportados com --farm.", file=sys.stderr)
+            return 2
+        host, _, port = args.farm.rpartition(":")
+        coordinator = FarmCoordinator(
+            configs,
+            seeds=[args.seed + r for r in range(args.replications)],
+            engine=args.engine,
+            lease_seconds=args.lease_seconds
+        )
+        rows = coordinator.serve(host or "0.0.0.0", int(port))
+        for unit_id, error in coordinator.failed.items():
+            print(f"Unidade {unit_id} falhou: {error}", file=sys.stderr)
+    else:
+        rows = run_batch(
+            configs,
+            replications=args.replications,
+            workers=args.workers,
+            base_seed=args.seed,
+            sessions_dir=None if args.no_sessions else args.sessions_dir,
+            engine=args.engine,
+            trace=args.replay,
+            kernel=args.kernel
+        )
+    if not rows:
+        print("Nenhum resultado obtido.", file=sys.stderr)
+        return 1
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    df = write_summary(rows, args.output)
+
+    summary = df.groupby("Config")[["Tempo Médio (min)", "Tempo no Sistema (min)", "Ocupação Médicos (%)"]].mean()
+    print(summary.to_string(float_format=lambda v: f"{v:.2f}"))
+    print(f"Resumo gravado em {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+# benchmark.py: Medição de desempenho da simulação e das análises
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from models.markov_model import MarkovHospitalModel
+from models.hospital_sim import HospitalSimulator
+from models.batch_runner import save_session
+from models.flows import flow_matrix
+from models.jit_kernel import PathSampler, HAS_NUMBA
+from models.markov_analytics import IncrementalMarkovAnalysis, routing_matrix, fundamental_matrix
+
+PROFILES = {
+    # Perfil rápido, usado para comparar com a linha de base guardada
+    "quick": {
+        "num_patients": [10, 100, 1000],
+        "sectors": [3, 10],
+        "medicos": [2, 5],
+        "congestion": ["baixa", "alta"],
+        "transition_sectors": [3, 50, 200]
+    },
+    "full": {
+        "num_patients": [10, 100, 1000, 10000, 100000, 1000000],
+        "sectors": [3, 10, 50, 200],
+        "medicos": [1, 5, 20],
+        "congestion": ["baixa", "média", "alta"],
+        "transition_sectors": [3, 10, 50, 200]
+    }
+}
+
+# Congestionamento: quanto menor a probabilidade de saída, mais passos por paciente
+CONGESTION_EXIT_PROBS = {"baixa": 0.5, "média": 0.2, "alta": 0.05}
+BASELINE_KEY_METRIC = "seconds"
+
+
+def make_config(num_sectors, num_patients=10, medicos=5, congestion="média", seed=0):
+    """Cria uma configuração sintética com `num_sectors` setores."""
+    rng = np.random.default_rng(seed)
+    sectors = ["Triagem", "Consulta"] + [f"Setor {i}" for i in range(3, num_sectors + 1)]
+    transition_base = rng.uniform(0, 1, (num_sectors, num_sectors))
+    transition_base /= transition_base.sum(axis=1, keepdims=True)
+    exit_prob = CONGESTION_EXIT_PROBS[congestion]
+    return {
+        "sectors": sectors,
+        "transition_base": (transition_base * (1 - exit_prob)).tolist(),
+        "exit_probs": [exit_prob] * num_sectors,
+        "num_patients": num_patients,
+        "turno": "manhã",
+        "gravidade": "média",
+        "medicos_disponiveis": medicos,
+        "prioridade_ativa": True
+    }
+
+
+def measure(func, repeats=1, memory=True):
+    """Mede o melhor tempo de `repeats` execuções e o pico de memória."""
+    best = None
+    value = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        value = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    metrics = {"seconds": best}
+    if memory:
+        tracemalloc.start()
+        func()
+        metrics["peak_kib"] = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+    return metrics, value
+
+
+def bench_transitions(profile, repeats):
+    cases = []
+    for num_sectors in profile["transition_sectors"]:
+        config = make_config(num_sectors)
+
+        def run():
+            return MarkovHospitalModel(dict(config)).compute_transitions()
+
+        metrics, _ = measure(run, repeats)
+        cases.append({"name": f"compute_transitions/S={num_sectors}", "params": {"sectors": num_sectors}, **metrics})
+    return cases
+
+
+def bench_simulation(profile, repeats, max_seconds):
+    """Varre pacientes x setores x médicos x congestionamento."""
+    cases = []
+    sessions = {}
+    for num_sectors in profile["sectors"]:
+        for medicos in profile["medicos"]:
+            for congestion in profile["congestion"]:
+                for num_patients in profile["num_patients"]:
+                    config = make_config(num_sectors, num_patients, medicos, congestion)
+                    np.random.seed(0)
+                    transition_probs = MarkovHospitalModel(config).compute_transitions()
+
+                    def run():
+                        np.random.seed(0)
+                        return HospitalSimulator(config, transition_probs).run_simulation()
+
+                    metrics, (results, stats) = measure(run, repeats)
+                    metrics["patients_per_sec"] = num_patients / metrics["seconds"] if metrics["seconds"] > 0 else None
+                    metrics["steps"] = int(sum(stats["sector_visits"].values()))
+                    name = f"run_simulation/S={num_sectors}/medicos={medicos}/congestion={congestion}/N={num_patients}"
+                    params = {"sectors": num_sectors, "medicos": medicos, "congestion": congestion, "num_patients": num_patients}
+                    cases.append({"name": name, "params": params, **metrics})
+                    sessions[num_patients] = (config, results, stats)
+                    # Os casos maiores demorariam ainda mais: passar à combinação seguinte
+                    if metrics["seconds"] > max_seconds:
+                        break
+    return cases, sessions
+
+
+def bench_row_edit(profile, repeats):
+    """Edição de uma linha da matriz: atualização de posto 1 contra inversão completa."""
+    cases = []
+    for num_sectors in profile["transition_sectors"]:
+        config = make_config(num_sectors)
+        transitions = np.array(config["transition_base"], dtype=float)
+        exits = np.array(config["exit_probs"], dtype=float)
+        analysis = IncrementalMarkovAnalysis(transitions, exits)
+        edits = [transitions[num_sectors // 2] * factor for factor in (1.1, 0.9)]
+
+        def incremental():
+            for edited in edits:
+                analysis.update_row(num_sectors // 2, edited)
+            return analysis.visits()
+
+        def full():
+            for edited in edits:
+                transitions[num_sectors // 2] = edited
+                fundamental_matrix(routing_matrix(transitions, exits))
+
+        for mode, func in (("incremental", incremental), ("full", full)):
+            metrics, _ = measure(func, repeats)
+            metrics["seconds"] /= len(edits)
+            cases.append({"name": f"row_edit/{mode}/S={num_sectors}", "params": {"mode": mode, "sectors": num_sectors}, **metrics})
+    return cases
+
+
+def bench_kernel(profile, repeats):
+    """Amostragem de percursos em lote: núcleo NumPy e, se instalado, Numba."""
+    cases = []
+    backends = ["numpy", "numba"] if HAS_NUMBA else ["numpy"]
+    for num_sectors in profile["sectors"]:
+        for congestion in profile["congestion"]:
+            config = make_config(num_sectors, congestion=congestion)
+            np.random.seed(0)
+            sampler_config = PathSampler(config, "numpy").config
+            for backend in backends:
+                sampler = PathSampler(sampler_config, backend)
+                for num_patients in profile["num_patients"]:
+                    metrics, paths = measure(lambda: sampler.sample(num_patients, seed=0), repeats)
+                    metrics["patients_per_sec"] = num_patients / metrics["seconds"] if metrics["seconds"] > 0 else None
+                    metrics["steps"] = int(paths.sector_visits.sum())
+                    name = f"path_kernel/{backend}/S={num_sectors}/congestion={congestion}/N={num_patients}"
+                    params = {"backend": backend, "sectors": num_sectors, "congestion": congestion, "num_patients": num_patients}
+                    cases.append({"name": name, "params": params, **metrics})
+    return cases
+
+
+def bench_io(sessions, repeats):
+    """Mede gravação/leitura de sessões, exportação e agregação de fluxos."""
+    cases = []
+    try:
+        from utils.exporter import Exporter
+        exporter = Exporter()
+    except ImportError:
+        exporter = None
+
+    with tempfile.TemporaryDirectory() as sessions_dir:
+        for num_patients, (config, results, stats) in sorted(sessions.items()):
+            session = {"config": config, "results": results, "stats": stats}
+            params = {"num_patients": num_patients}
+
+            metrics, path = measure(lambda: save_session(sessions_dir, "bench", session), repeats)
+            cases.append({"name": f"session_save/N={num_patients}", "params": params, **metrics})
+
+            def load():
+                with open(path) as f:
+                    return json.load(f)
+
+            metrics, _ = measure(load, repeats)
+            cases.append({"name": f"session_load/N={num_patients}", "params": params, **metrics})
+
+            metrics, _ = measure(lambda: flow_matrix(results, config["sectors"]), repeats)
+            cases.append({"name": f"flow_matrix/N={num_patients}", "params": params, **metrics})
+
+            if exporter is None:
+                continue
+            metrics, _ = measure(lambda: exporter.to_csv(results, stats), repeats)
+            cases.append({"name": f"export_csv/N={num_patients}", "params": params, **metrics})
+            np.random.seed(0)
+            config = dict(config)
+            transition_probs = MarkovHospitalModel(config).compute_transitions()
+            metrics, _ = measure(lambda: exporter.to_pdf(results, transition_probs, stats, config), repeats, memory=False)
+            cases.append({"name": f"export_pdf/N={num_patients}", "params": params, **metrics})
+    return cases
+
+
+def compare(cases, baseline, threshold):
+    """Compara os tempos com a linha de base; devolve as regressões encontradas."""
+    reference = {case["name"]: case for case in baseline["cases"]}
+    regressions = []
+    for case in cases:
+        base_case = reference.get(case["name"])
+        if not base_case or not base_case.get(BASELINE_KEY_METRIC):
+            continue
+        ratio = case[BASELINE_KEY_METRIC] / base_case[BASELINE_KEY_METRIC]
+        case["baseline_ratio"] = ratio
+        if ratio > threshold:
+            regressions.append((case["name"], ratio))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do planejador hospitalar.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick", help="Conjunto de casos")
+    parser.add_argument("--repeats", type=int, default=3, help="Repetições por caso (conta o melhor tempo)")
+    parser.add_argument("--max-seconds", type=float, default=60.0,
+                        help="Interrompe a varredura de pacientes quando um caso excede este tempo")
+    parser.add_argument("-o", "--output", default="bench_results.json", help="Ficheiro JSON de resultados")
+    parser.add_argument("--baseline", help="Linha de base JSON para comparação")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Razão de tempo acima da qual um caso conta como regressão")
+    parser.add_argument("--save-baseline", action="store_true", help="Grava os resultados como nova linha de base")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.getLogger("models").setLevel(logging.ERROR)
+    profile = PROFILES[args.profile]
+
+    cases = bench_transitions(profile, args.repeats)
+    cases += bench_row_edit(profile, args.repeats)
+    sim_cases, sessions = bench_simulation(profile, args.repeats, args.max_seconds)
+    cases += sim_cases
+    cases += bench_kernel(profile, args.repeats)
+    cases += bench_io(sessions, args.repeats)
+
+    report = {
+        "profile": args.profile,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cases": cases
+    }
+    exit_code = 0
+    if args.baseline and not args.save_baseline:
+        with open(args.baseline) as f:
+            regressions = compare(cases, json.load(f), args.threshold)
+        report["baseline"] = args.baseline
+        report["regressions"] = [{"name": name, "ratio": ratio} for name, ratio in regressions]
+        for name, ratio in regressions:
+            print(f"REGRESSÃO {name}: {ratio:.2f}x mais lento")
+        exit_code = 1 if regressions else 0
+
+    output = args.baseline if args.save_baseline and args.baseline else args.output
+    output_dir = os.path.dirname(output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    for case in cases:
+        extra = f"  {case['patients_per_sec']:.0f} pacientes/s" if case.get("patients_per_sec") else ""
+        ratio = f"  ({case['baseline_ratio']:.2f}x)" if "baseline_ratio" in case else ""
+        print(f"{case['name']:<70} {case['seconds'] * 1000:10.2f} ms{extra}{ratio}")
+    print(f"Resultados gravados em {output}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
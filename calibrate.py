@@ -0,0 +1,83 @@
+# calibrate.py: Calibração das configurações a partir de registos históricos de eventos (CSV)
+import argparse
+import json
+import logging
+import os
+import sys
+
+from utils.data_manager import DataManager
+from models.calibration import CalibrationState, ingest, CHUNK_SIZE, MIN_COUNT
+from models.schedule import TURNOS
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Lê registos de admissões/transferências/altas em blocos e gera configurações calibradas."
+    )
+    parser.add_argument("logs", nargs="*", help="Ficheiros CSV ou diretórios com registos (por ordem cronológica)")
+    parser.add_argument("--state", default="calibracao_estado.json",
+                        help="Estado acumulado: lido no início e gravado no fim (ficheiros já lidos são ignorados)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Linhas por bloco")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Processos para resumir blocos em paralelo")
+    parser.add_argument("--turno", choices=TURNOS, help="Calibrar só para este turno")
+    parser.add_argument("--gravidade", choices=["baixa", "média", "alta"], help="Calibrar só para esta gravidade")
+    parser.add_argument("--all", action="store_true", help="Gerar uma configuração por (turno, gravidade) no diretório -o")
+    parser.add_argument("--min-count", type=int, default=MIN_COUNT,
+                        help="Observações mínimas por setor antes de usar os totais de todos os turnos")
+    parser.add_argument("-o", "--output", default="calibrado.yaml", help="Configuração (.yaml/.json) ou diretório com --all")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Mostrar progresso detalhado")
+    return parser.parse_args(argv)
+
+
+def write_config(config, path):
+    """Grava em YAML ou JSON, pela extensão (o formato lido por batch.py)."""
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Instale 'pyyaml' para gravar configurações YAML.")
+            yaml.safe_dump(config, f, allow_unicode=True, sort_keys=False, default_flow_style=None)
+        else:
+            json.dump(config, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    logging.getLogger("models").setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    try:
+        state = CalibrationState.load(args.state)
+        state = ingest(args.logs, state, chunk_size=args.chunk_size, workers=args.workers)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Erro ao ler os registos: {e}", file=sys.stderr)
+        return 2
+    state.save(args.state)
+    counters = state.counters
+    print(f"{counters['rows']} linhas, {counters['visits']} visitas, {len(state.open)} ainda abertas, "
+          f"{counters['invalid']} inválidas, {counters['incomplete'] + counters['orphan']} incompletas.")
+
+    data_manager = DataManager()
+    combos = state.combos() if args.all else [(args.turno, args.gravidade)]
+    try:
+        outputs = []
+        for turno, gravidade in combos:
+            config = data_manager.validate_config(state.to_config(turno, gravidade, args.min_count), "calibração")
+            if args.all:
+                os.makedirs(args.output, exist_ok=True)
+                path = os.path.join(args.output, f"calibrado_{turno}_{gravidade}.yaml")
+            else:
+                path = args.output
+            outputs.append(write_config(config, path))
+    except (ValueError, ImportError) as e:
+        print(f"Erro na calibração: {e}", file=sys.stderr)
+        return 1
+    for path in outputs:
+        print(f"Configuração gravada em {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
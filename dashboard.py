@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from utils.visualizer import Visualizer
+from models.flows import flow_matrix
+from models.rare_events import TailEstimator
 import plotly.graph_objects as go
 import plotly.express as px
 
@@ -39,21 +41,7 @@ class DashboardPage:
 
         # Criar matriz de fluxos
         sectors = config["sectors"]  # Ex.: ["Triagem", "Consulta", "Exames"]
-        flows = np.zeros((len(sectors), len(sectors)))
-        valid_transitions = 0
-
-        for r in results:
-            path = r.get("sectors_visited", [])
-            if len(path) < 2:
-                continue
-            for i in range(len(path) - 1):
-                source = path[i]
-                target = path[i + 1]
-                if source in sectors and target in sectors:
-                    source_idx = sectors.index(source)
-                    target_idx = sectors.index(target)
-                    flows[source_idx, target_idx] += 1
-                    valid_transitions += 1
+        flows, valid_transitions = flow_matrix(results, sectors)
 
         # Exibir matriz de fluxos como tabela
         flows_df = pd.DataFrame(flows, index=sectors, columns=sectors)
@@ -124,4 +112,24 @@ class DashboardPage:
             xaxis_tickangle=45,
             margin=dict(l=50, r=50, t=80, b=50)
         )
-        st.plotly_chart(fig_bar, use_container_width=True)
\ No newline at end of file
+        st.plotly_chart(fig_bar, use_container_width=True)
+        self.render_tail_probability(config)
+
+    def render_tail_probability(self, config):
+        """Probabilidade de espera longa estimada por amostragem por importância."""
+        st.subheader("⏱️ Probabilidade de Espera Longa")
+        st.markdown("Eventos raros (p. ex. mais de 4 h) estimados sem simular milhões de pacientes.")
+        cols = st.columns(3)
+        threshold = cols[0].number_input("Limiar (min)", min_value=1.0, value=240.0, step=30.0)
+        target = cols[1].selectbox("Tempo", ["Total"] + list(config["sectors"]))
+        samples = cols[2].number_input("Percursos", min_value=1000, max_value=200000, value=10000, step=1000)
+        if st.button("Estimar Probabilidade"):
+            estimator = TailEstimator(config, seed=0)
+            estimate = estimator.estimate(threshold, None if target == "Total" else target, samples=int(samples))
+            col1, col2 = st.columns(2)
+            col1.metric(f"P(tempo > {threshold:.0f} min)", f"{estimate.probability:.3e}")
+            col2.metric("Intervalo de 95%", f"[{estimate.ci_low:.2e}, {estimate.ci_high:.2e}]")
+            st.caption(
+                f"Erro relativo {estimate.relative_error:.1%} com {estimate.samples} percursos; "
+                f"a simulação direta precisaria de ~{estimate.plain_runs:,} pacientes."
+            )
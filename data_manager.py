@@ -1,9 +1,103 @@
 # data_manager.py: Gerenciamento de configurações e dados
+import glob
+import json
+import os
+
+from models.compiled_config import CompiledConfig, compile_config
+
+# Valores usados quando um ficheiro de configuração omite um parâmetro
+# (os mesmos que a página Planejador apresenta por omissão)
+DEFAULT_CONFIG = {
+    "num_patients": 20,
+    "turno": "manhã",
+    "gravidade": "média",
+    "medicos_disponiveis": 5,
+    "prioridade_ativa": True
+}
+DEFAULT_EXIT_PROB = 0.1
+
+
 class DataManager:
     def __init__(self):
         """Inicializa o gerenciador de dados."""
         pass
 
     def load_config(self, config_dict):
-        """Retorna o dicionário de configuração fornecido pela interface."""
-        return config_dict
\ No newline at end of file
+        """Valida e compila a configuração fornecida pela interface."""
+        return self.compile_config(config_dict)
+
+    def compile_config(self, config, source="config"):
+        """Valida uma vez e devolve a CompiledConfig imutável usada pelos modelos.
+
+        Ao contrário de `validate_config`, mantém as `transition_probs` já
+        calculadas (sessões gravadas), que passam a tabela de alias.
+        """
+        if isinstance(config, CompiledConfig):
+            return config
+        validated = self.validate_config(config, source)
+        if "transition_probs" in config:
+            validated["transition_probs"] = config["transition_probs"]
+        return compile_config(validated)
+
+    def compile_session(self, config, source="sessão"):
+        """Compila a configuração de uma sessão gravada.
+
+        Sessões antigas (p. ex. sessions/simulacao_1.json) não guardam a
+        matriz normalizada; nesse caso é recalculada pelo modelo de Markov,
+        como na simulação, para que gráficos e relatório a encontrem.
+        """
+        from models.batch_runner import with_markov_transitions
+        return with_markov_transitions(self.compile_config(config, source))
+
+    def load_config_file(self, path):
+        """Lê uma configuração YAML ou JSON (ou o campo 'config' de uma sessão salva)."""
+        with open(path, "r", encoding="utf-8") as f:
+            if path.endswith((".yaml", ".yml")):
+                try:
+                    import yaml
+                except ImportError:
+                    raise ImportError("Instale 'pyyaml' para ler configurações YAML.")
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+        if isinstance(data, dict) and "config" in data:
+            data = data["config"]
+        return self.validate_config(data, source=path)
+
+    def load_config_files(self, paths):
+        """Carrega vários ficheiros (ou diretórios) e devolve {nome: config}."""
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                for pattern in ("*.yaml", "*.yml", "*.json"):
+                    files.extend(sorted(glob.glob(os.path.join(path, pattern))))
+            else:
+                files.append(path)
+        configs = {}
+        for path in files:
+            name = os.path.splitext(os.path.basename(path))[0]
+            configs[name] = self.load_config_file(path)
+        return configs
+
+    def validate_config(self, config, source="config"):
+        """Valida os campos obrigatórios e completa os opcionais."""
+        if not isinstance(config, dict):
+            raise ValueError(f"{source}: a configuração deve ser um dicionário.")
+        sectors = config.get("sectors")
+        if not sectors or len(sectors) < 2:
+            raise ValueError(f"{source}: indique pelo menos 2 setores em 'sectors'.")
+        transition_base = config.get("transition_base")
+        if (not transition_base or len(transition_base) != len(sectors)
+                or any(len(row) != len(sectors) for row in transition_base)):
+            raise ValueError(f"{source}: 'transition_base' deve ser uma matriz {len(sectors)}x{len(sectors)}.")
+
+        # As probabilidades normalizadas são recalculadas a cada execução
+        config = {key: value for key, value in config.items() if key != "transition_probs"}
+        for key, value in DEFAULT_CONFIG.items():
+            config.setdefault(key, value)
+        config.setdefault("exit_probs", [DEFAULT_EXIT_PROB] * len(sectors))
+        if len(config["exit_probs"]) != len(sectors):
+            raise ValueError(f"{source}: 'exit_probs' deve ter {len(sectors)} valores.")
+        config["turno"] = str(config["turno"]).lower()
+        config["gravidade"] = str(config["gravidade"]).lower()
+        return config
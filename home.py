@@ -5,9 +5,20 @@ import json
 import os
 from models.markov_model import MarkovHospitalModel
 from models.hospital_sim import HospitalSimulator
+from models.results_table import ResultsTable
+from models.path_index import PathIndex
+from models.profiler import PhaseProfiler
+from models.compiled_config import CompiledConfig
+from models.worker_pool import shared_pool, PoolBusyError
+from models.markov_analytics import transient_occupancy, simulated_occupancy, service_means, IncrementalMarkovAnalysis
+from models.compiled_config import GRAVIDADE_SERVICE_FACTORS
+from models.transition_matrix import TransitionMatrix, EXIT_COLUMN
 from utils.visualizer import Visualizer
 from utils.exporter import Exporter
 
+# Tempo máximo de espera por uma vaga no pool partilhado
+POOL_ADMISSION_SECONDS = 30
+
 class HomePage:
     def __init__(self, data_manager):
         """Inicializa a página com o gerenciador de dados."""
@@ -17,12 +28,14 @@ class HomePage:
         self.sessions_dir = "sessions"
         os.makedirs(self.sessions_dir, exist_ok=True)
 
-    def save_session(self, config, results, stats, session_name):
+    def save_session(self, config, results, stats, session_name, profile=None):
         session_data = {
-            "config": config,
+            "config": config.to_dict() if isinstance(config, CompiledConfig) else config,
             "results": results,
             "stats": stats
         }
+        if profile is not None:
+            session_data["profile"] = profile.to_dict()
         session_path = os.path.join(self.sessions_dir, f"{session_name}.json")
         with open(session_path, "w") as f:
             json.dump(session_data, f, indent=2)
@@ -44,7 +57,10 @@ class HomePage:
         session_name = st.sidebar.text_input("Nome da Sessão", value="simulacao_1")
         if st.sidebar.button("Salvar Sessão"):
             if "results" in st.session_state and "stats" in st.session_state:
-                self.save_session(st.session_state["config"], st.session_state["results"], st.session_state["stats"], session_name)
+                self.save_session(
+                    st.session_state["config"], st.session_state["results"], st.session_state["stats"],
+                    session_name, st.session_state.get("profile")
+                )
                 st.sidebar.success(f"Sessão '{session_name}' salva!")
             else:
                 st.sidebar.error("Execute uma simulação primeiro!")
@@ -53,61 +69,43 @@ class HomePage:
         selected_session = st.sidebar.selectbox("Carregar Sessão", [""] + saved_sessions)
         if selected_session and st.sidebar.button("Carregar"):
             session_data = self.load_session(selected_session)
-            if session_data:
-                st.session_state["config"] = session_data["config"]
+            try:
+                config = self.data_manager.compile_session(session_data["config"], selected_session) if session_data else None
+            except ValueError as e:
+                st.sidebar.error(f"Sessão inválida: {e}")
+                config = None
+            if config is not None:
+                st.session_state["config"] = config
                 st.session_state["results"] = session_data["results"]
                 st.session_state["stats"] = session_data["stats"]
+                if "profile" in session_data:
+                    st.session_state["profile"] = PhaseProfiler.from_dict(session_data["profile"])
+                else:
+                    st.session_state.pop("profile", None)
                 st.sidebar.success(f"Sessão '{selected_session}' carregada!")
 
         # Configurações
         st.sidebar.header("⚙️ Configurações")
+        self.render_matrix_import()
         with st.sidebar.expander("Setores do Hospital", expanded=True):
-            setores_input = st.text_area("Setores (um por linha)", value="Triagem\nConsulta\nExames")
+            setores_input = st.text_area("Setores (um por linha)", value="Triagem\nConsulta\nExames", key="setores_input")
             setores = [s.strip() for s in setores_input.split("\n") if s.strip()]
             if len(setores) < 2:
                 st.sidebar.error("Insira pelo menos 2 setores.")
                 return
+            if len(set(setores)) != len(setores):
+                st.sidebar.error("Os nomes dos setores devem ser únicos.")
+                return
 
-        with st.sidebar.expander("Probabilidades de Transição"):
-            transition_base = []
-            for i, setor_origem in enumerate(setores):
-                st.markdown(f"**De {setor_origem} para:**")
-                probs = []
-                cols = st.columns(len(setores))
-                for j, setor_destino in enumerate(setores):
-                    prob = cols[j].number_input(
-                        f"{setor_destino}",
-                        min_value=0.0,
-                        max_value=1.0,
-                        value=0.3,
-                        step=0.01,
-                        key=f"prob_{i}_{j}"
-                    )
-                    probs.append(prob)
-                transition_base.append(probs)
-
-        with st.sidebar.expander("Probabilidade de Saída"):
-            exit_probs = []
-            for i, setor in enumerate(setores):
-                prob = st.number_input(
-                    f"Saída após {setor}",
-                    min_value=0.0,
-                    max_value=1.0,
-                    value=0.1,
-                    step=0.01,
-                    key=f"exit_prob_{i}"
-                )
-                exit_probs.append(prob)
-
-        # Validação em tempo real
-        prob_errors = []
-        for i, probs in enumerate(transition_base):
-            total_prob = sum(probs) + exit_probs[i]
-            if abs(total_prob - 1.0) > 0.01:
-                prob_errors.append(f"Probabilidades para {setores[i]} devem somar 1 (atual: {total_prob:.2f}).")
+        matrix = self.render_matrix_editor(setores)
+        transition_base, exit_probs = matrix.transitions.tolist(), matrix.exits.tolist()
+
+        # Validação em tempo real (vetorizada); a análise só renormaliza as linhas editadas
+        prob_errors = matrix.errors()
         if prob_errors:
             st.sidebar.error("\n".join(prob_errors))
             return
+        analysis = self.markov_analysis(setores, matrix.transitions, matrix.exits)
 
         with st.sidebar.expander("Parâmetros"):
             num_pacientes = st.slider("Pacientes", 1, 200, 20)
@@ -115,6 +113,16 @@ class HomePage:
             gravidade = st.selectbox("Gravidade", ["Baixa", "Média", "Alta"])
             medicos_disponiveis = st.slider("Médicos", 1, 30, 5)
             prioridade_ativa = st.checkbox("Prioridade", value=True)
+            seed = st.number_input("Semente", min_value=0, max_value=2**31 - 1, value=0, step=1)
+
+        with st.sidebar.expander("Desempenho"):
+            trace_memory = st.checkbox("Medir memória (tracemalloc)", value=True)
+            profile_engine = st.checkbox("Capturar cProfile do simulador", value=False)
+            show_performance = st.checkbox("Mostrar painel de desempenho", value=False)
+            show_analysis = st.checkbox("Mostrar análise de Markov", value=False)
+
+        if show_analysis:
+            self.render_markov_analysis(analysis, setores, gravidade.lower())
 
         # Simulação com preview
         if st.button("▶️ Simular Atendimentos", type="primary"):
@@ -131,20 +139,31 @@ class HomePage:
 
             progress_bar = st.progress(0)
             status_text = st.empty()
-            markov_model = MarkovHospitalModel(config)
+            profiler = PhaseProfiler(trace_memory=trace_memory)
             try:
-                transition_probs = markov_model.compute_transitions()
-                config["transition_probs"] = transition_probs.tolist()
+                with profiler.phase("Compilação da configuração"):
+                    config = self.data_manager.compile_config(config)
             except Exception as e:
                 st.error(f"Erro ao calcular probabilidades: {e}")
                 return
-            
-            simulator = HospitalSimulator(config, transition_probs)
+
             try:
-                results, stats = simulator.run_simulation()
+                if profile_engine:
+                    # O cProfile só mede o processo atual: simular aqui, fora do pool
+                    results, stats, config = self.simulate_locally(config, seed, profiler, profile_engine)
+                else:
+                    # Pool partilhado: pedidos iguais de outras sessões são feitos uma só vez
+                    status_text.text("Na fila do servidor...")
+                    with profiler.phase("Simulação (pool partilhado)"):
+                        session = shared_pool().run(config, seed, timeout=POOL_ADMISSION_SECONDS)
+                    config = self.data_manager.compile_config(session["config"])
+                    results, stats = session["results"], session["stats"]
                 for i in range(100):
                     progress_bar.progress(i + 1)
                     status_text.text(f"Simulando... {i+1}%")
+            except PoolBusyError as e:
+                st.warning(f"Servidor ocupado, tente de novo dentro de instantes. ({e})")
+                return
             except Exception as e:
                 st.error(f"Erro durante a simulação: {e}")
                 return
@@ -153,57 +172,273 @@ class HomePage:
             st.session_state["config"] = config
             st.session_state["results"] = results
             st.session_state["stats"] = stats
+            st.session_state["profile"] = profiler
+            with profiler.phase("Índice de caminhos"):
+                st.session_state["path_index"] = PathIndex(results)
 
-            # Resultados
-            st.subheader("📊 Resultados")
-            df_results = pd.DataFrame([
-                {
-                    "Paciente": r["patient_id"],
-                    "Tempo Total (min)": f"{r['total_waiting_time']:.2f}",
-                    "Setores Visitados": " -> ".join(r["sectors_visited"]),
-                    "Prioridade": r["priority"]
-                } for r in results
-            ])
-
-            # Filtros
-            st.markdown("**Filtros**")
-            priority_filter = st.selectbox("Prioridade", ["Todos", "Alta", "Normal"])
-            sector_filter = st.selectbox("Setor", ["Todos"] + config["sectors"])
-            time_filter = st.slider("Tempo Mínimo (min)", 0, int(max(df_results["Tempo Total (min)"].astype(float))), 0)
-
-            filtered_df = df_results
-            if priority_filter != "Todos":
-                filtered_df = filtered_df[filtered_df["Prioridade"] == priority_filter]
-            if sector_filter != "Todos":
-                filtered_df = filtered_df[filtered_df["Setores Visitados"].str.contains(sector_filter)]
-            filtered_df = filtered_df[filtered_df["Tempo Total (min)"].astype(float) >= time_filter]
-            
-            st.dataframe(filtered_df, use_container_width=True)
+        if "results" in st.session_state and "stats" in st.session_state:
+            # Sessões carregadas sem medições recebem um perfil novo para os gráficos e exportação
+            profiler = st.session_state.setdefault("profile", PhaseProfiler(trace_memory=trace_memory))
+            self.render_results(st.session_state["config"], st.session_state["results"], st.session_state["stats"], profiler)
+            if show_performance:
+                self.render_performance(profiler)
 
-            # Gargalos
-            st.subheader("🚨 Gargalos")
-            max_wait_sector = max(stats["avg_time_per_sector"], key=stats["avg_time_per_sector"].get)
-            st.warning(f"Setor mais lento: **{max_wait_sector}** ({stats['avg_time_per_sector'][max_wait_sector]:.2f} min)")
-            st.write(f"Ocupação dos médicos: **{stats['doctor_occupation']:.2%}**")
-            
-            # Visualizações
-            st.subheader("📈 Visualizações")
-            st.info("Filtre o gráfico Sankey ou baixe os gráficos!")
-            sankey_priority = st.selectbox("Filtrar Sankey por Prioridade", ["Todos", "Alta", "Normal"])
-            filtered_results = results if sankey_priority == "Todos" else [r for r in results if r["priority"] == sankey_priority]
-            self.visualizer.plot_waiting_times(results)
-            self.visualizer.plot_transition_probabilities(transition_probs, config["sectors"])
-            self.visualizer.plot_sankey_flow(filtered_results, config["sectors"])
-            self.visualizer.plot_doctor_occupation(stats["doctor_usage"])
-            self.visualizer.plot_sector_times(stats, config["sectors"])
-            self.visualizer.plot_normalized_probs(config["transition_probs"], config["exit_probs"], config["sectors"])
-
-            # Exportação
-            st.subheader("📥 Exportar")
-            csv_data = self.exporter.to_csv(results, stats)
-            st.download_button("Baixar CSV", csv_data, "resultados.csv", "text/csv")
-            pdf_data = self.exporter.to_pdf(results, transition_probs, stats, config)
-            if pdf_data:
-                st.download_button("Baixar Relatório PDF", pdf_data, "relatorio.pdf", "application/pdf")
+    def render_matrix_import(self):
+        """Importa a matriz de um CSV ou YAML (esquema de static/config.yaml), uma vez por ficheiro.
+
+        Corre antes da caixa de setores para poder substituir a lista de setores.
+        """
+        with st.sidebar.expander("Importar Matriz"):
+            uploaded = st.file_uploader("CSV ou YAML", type=["csv", "yaml", "yml"], key="matrix_upload")
+        if uploaded is None or st.session_state.get("matrix_import_id") == (uploaded.name, uploaded.size):
+            return
+        st.session_state["matrix_import_id"] = (uploaded.name, uploaded.size)
+        text = uploaded.getvalue().decode("utf-8")
+        try:
+            if uploaded.name.endswith(".csv"):
+                matrix = TransitionMatrix.from_csv(text)
             else:
-                st.warning("Instale 'reportlab' para exportar PDF.")
\ No newline at end of file
+                matrix = TransitionMatrix.from_yaml(text, self.data_manager, uploaded.name)
+        except (ValueError, KeyError, ImportError) as e:
+            st.sidebar.error(f"Matriz inválida: {e}")
+            return
+        self.set_matrix(matrix)
+        st.session_state["setores_input"] = "\n".join(matrix.sectors)
+        st.sidebar.success(f"Matriz de {len(matrix.sectors)} setores importada de '{uploaded.name}'.")
+
+    def set_matrix(self, matrix):
+        """Nova matriz de base do editor (um editor novo, que parte dos valores de `matrix`)."""
+        st.session_state["transition_matrix"] = matrix
+        st.session_state["edited_matrix"] = matrix
+        st.session_state["matrix_version"] = st.session_state.get("matrix_version", 0) + 1
+
+    def render_matrix_editor(self, setores):
+        """Um único editor de tabela para transições e saídas, qualquer que seja o número de setores.
+
+        O resultado de cada edição fica em `edited_matrix`; quando a lista de
+        setores muda, o editor novo parte dele, mantendo as edições manuais dos
+        setores que continuam.
+        """
+        matrix = st.session_state.get("transition_matrix")
+        if matrix is None or matrix.sectors != setores:
+            edited = st.session_state.get("edited_matrix", matrix)
+            self.set_matrix(TransitionMatrix(setores) if edited is None else edited.resized(setores))
+            matrix = st.session_state["transition_matrix"]
+
+        with st.expander(f"Probabilidades de Transição ({len(setores)} setores)"):
+            st.caption("Linhas: setor de origem. Cada linha (destinos + Saída) deve somar 1.")
+            probability = st.column_config.NumberColumn(min_value=0.0, max_value=1.0, step=0.01, format="%.2f")
+            edited = st.data_editor(
+                matrix.to_frame(),
+                num_rows="fixed",
+                use_container_width=True,
+                column_config={column: probability for column in setores + [EXIT_COLUMN]},
+                key=f"matrix_editor_{st.session_state['matrix_version']}"
+            )
+            edited_matrix = TransitionMatrix.from_frame(edited, setores)
+            st.session_state["edited_matrix"] = edited_matrix
+            cols = st.columns(2)
+            cols[0].download_button("Baixar CSV", edited_matrix.to_csv(), "matriz.csv", "text/csv")
+            try:
+                cols[1].download_button("Baixar YAML", edited_matrix.to_yaml(), "matriz.yaml", "application/x-yaml")
+            except ImportError as e:
+                cols[1].caption(str(e))
+        return edited_matrix
+
+    def markov_analysis(self, setores, transition_base, exit_probs):
+        """Análise incremental da matriz editada, mantida na sessão entre edições.
+
+        Só é reconstruída quando os setores mudam; caso contrário as linhas
+        alteradas são aplicadas uma a uma (atualização de posto 1).
+        """
+        analysis = st.session_state.get("markov_analysis")
+        if analysis is None or st.session_state.get("markov_analysis_sectors") != setores:
+            analysis = IncrementalMarkovAnalysis(transition_base, exit_probs)
+            st.session_state["markov_analysis"] = analysis
+            st.session_state["markov_analysis_sectors"] = list(setores)
+        else:
+            analysis.update(transition_base, exit_probs)
+        return analysis
+
+    def render_markov_analysis(self, analysis, setores, gravidade):
+        """Visitas e tempos esperados da matriz base (sem filas), atualizados a cada edição."""
+        analysis.set_means(service_means(setores, GRAVIDADE_SERVICE_FACTORS.get(gravidade, 1.0)))
+        st.subheader("🧮 Análise de Markov")
+        st.dataframe(
+            pd.DataFrame({
+                "Setor": setores,
+                "Visitas Esperadas": analysis.visits(),
+                "Tempo Esperado (min)": analysis.sector_time(),
+                "Tempo até à Saída (min)": analysis.absorption_time()
+            }),
+            use_container_width=True
+        )
+        st.write(f"Tempo total esperado por paciente: **{analysis.total_time():.2f} min**")
+        with st.expander("Matriz fundamental N = (I - Q)⁻¹"):
+            st.dataframe(pd.DataFrame(analysis.fundamental, index=setores, columns=setores), use_container_width=True)
+        counters = analysis.counters
+        st.caption(
+            f"{counters['row_updates']} linhas editadas, {counters['rank_one']} atualizações de posto 1, "
+            f"{counters['full_solves']} inversões completas."
+        )
+
+    def simulate_locally(self, config, seed, profiler, profile_engine):
+        """Markov + simulação no processo da sessão (usado para o cProfile do motor)."""
+        np.random.seed(seed)
+        markov_model = MarkovHospitalModel(config)
+        with profiler.phase("Probabilidades (compute_transitions)"):
+            transition_probs = markov_model.compute_transitions()
+            config = config.with_transitions(transition_probs, markov_model.normalized_exit_probs)
+        results, stats = HospitalSimulator(config).run_simulation(profiler, profile_engine)
+        return results, stats, config
+
+    def render_occupancy(self, config, results):
+        """Curvas de ocupação por uniformização, recalculadas a cada alteração dos controlos."""
+        if config.transition_probs is None:
+            return
+        horizon = st.slider("Horizonte da ocupação (min)", 30, 1440, 480, step=30)
+        points = st.select_slider("Pontos da grelha", [50, 100, 200, 500, 1000], value=200)
+        times = np.linspace(0.0, horizon, points)
+        analytic = transient_occupancy(
+            config.transition_probs.to_dense(), config.exit_probs, config.service_means, times, len(results)
+        )
+        simulated = simulated_occupancy(results, config.sectors, times)
+        self.visualizer.plot_occupancy(times, analytic, simulated, list(config.sectors))
+        st.caption(
+            "A curva analítica supõe servidores sem fila (todos os pacientes entram no primeiro setor em t = 0); "
+            "a simulada encadeia os tempos de atendimento de cada paciente."
+        )
+
+    def render_performance(self, profiler):
+        """Painel com o tempo e a memória de cada fase da última execução."""
+        st.subheader("⏱️ Desempenho")
+        pool = shared_pool().stats()
+        st.caption(
+            f"Pool partilhado: {pool['workers']} processos, {pool['in_flight']}/{pool['max_pending']} em curso, "
+            f"{pool['submitted']} executadas, {pool['coalesced']} pedidos juntos a outros, {pool['rejected']} recusados."
+        )
+        rows = profiler.rows()
+        if not rows:
+            st.info("Sem medições para esta sessão.")
+            return
+        st.dataframe(
+            pd.DataFrame(rows),
+            use_container_width=True,
+            column_config={
+                "Tempo (s)": st.column_config.NumberColumn(format="%.4f"),
+                "CPU (s)": st.column_config.NumberColumn(format="%.4f"),
+                "Pico Memória (KiB)": st.column_config.NumberColumn(format="%.1f")
+            }
+        )
+        st.download_button("Baixar Desempenho (JSON)", profiler.to_json(), "desempenho.json", "application/json")
+        for name, text in profiler.profiles.items():
+            with st.expander(f"cProfile: {name}"):
+                st.code(text)
+                if name in profiler.raw_profiles:
+                    st.download_button(
+                        "Baixar perfil (.prof)", profiler.raw_profiles[name], "simulador.prof",
+                        "application/octet-stream", key=f"prof_{name}"
+                    )
+
+    def results_table(self, config, results):
+        """Tabela indexada dos resultados atuais, reconstruída só quando estes mudam."""
+        table = st.session_state.get("results_table")
+        if table is None or table.results is not results:
+            table = ResultsTable(results, config.sectors)
+            st.session_state["results_table"] = table
+        return table
+
+    def results_artifact(self, results, name, build):
+        """Gráfico ou exportação dos resultados atuais, construído uma vez por conjunto de resultados.
+
+        Filtros, páginas e controlos da ocupação voltam a correr a página; os
+        artefactos que não dependem deles vêm desta cache.
+        """
+        cache = st.session_state.get("results_artifacts")
+        if cache is None or cache["results"] is not results:
+            cache = {"results": results}
+            st.session_state["results_artifacts"] = cache
+        if name not in cache:
+            cache[name] = build()
+        return cache[name]
+
+    def render_results(self, config, results, stats, profiler):
+        if config.router is None:
+            config = self.data_manager.compile_session(config)
+            st.session_state["config"] = config
+        transition_probs = config.transition_probs.to_dense()
+
+        # Resultados
+        st.subheader("📊 Resultados")
+        table = self.results_table(config, results)
+
+        # Filtros
+        st.markdown("**Filtros**")
+        cols = st.columns(3)
+        priority_filter = cols[0].selectbox("Prioridade", ["Todos", "Alta", "Normal"])
+        sector_filter = cols[1].selectbox("Setor", ["Todos"] + list(config.sectors))
+        time_filter = cols[2].slider("Tempo Mínimo (min)", 0, int(table.max_time), 0)
+        indices = table.filter(priority_filter, sector_filter, time_filter)
+
+        cols = st.columns(3)
+        page_size = cols[0].selectbox("Linhas por página", [25, 100, 500], index=1)
+        num_pages = ResultsTable.num_pages(len(indices), page_size)
+        page = cols[1].number_input("Página", min_value=1, max_value=num_pages, value=1, step=1)
+        cols[2].metric("Pacientes filtrados", f"{len(indices)} / {len(table)}")
+        st.dataframe(
+            table.page(indices, page - 1, page_size),
+            use_container_width=True,
+            column_config={"Tempo Total (min)": st.column_config.NumberColumn(format="%.2f")}
+        )
+
+        # Gargalos
+        st.subheader("🚨 Gargalos")
+        max_wait_sector = max(stats["avg_time_per_sector"], key=stats["avg_time_per_sector"].get)
+        st.warning(f"Setor mais lento: **{max_wait_sector}** ({stats['avg_time_per_sector'][max_wait_sector]:.2f} min)")
+        st.write(f"Ocupação dos médicos: **{stats['doctor_occupation']:.2%}**")
+
+        # Visualizações
+        st.subheader("📈 Visualizações")
+        st.info("Filtre o gráfico Sankey ou baixe os gráficos!")
+        sankey_priority = st.selectbox("Filtrar Sankey por Prioridade", ["Todos", "Alta", "Normal"])
+        visualizer = self.visualizer
+        sectors = list(config["sectors"])
+        with profiler.phase("Gráfico: tempos de espera"):
+            st.pyplot(self.results_artifact(results, "waiting_times", lambda: visualizer.waiting_times_figure(results)))
+        with profiler.phase("Gráfico: probabilidades de transição"):
+            st.pyplot(self.results_artifact(
+                results, "transition_probabilities",
+                lambda: visualizer.transition_probabilities_figure(transition_probs, sectors)
+            ))
+        with profiler.phase("Gráfico: Sankey"):
+            filtered_results = results if sankey_priority == "Todos" else [r for r in results if r["priority"] == sankey_priority]
+            st.plotly_chart(self.results_artifact(
+                results, f"sankey_{sankey_priority}", lambda: visualizer.sankey_figure(filtered_results, sectors)
+            ))
+        with profiler.phase("Gráfico: ocupação dos médicos"):
+            st.pyplot(self.results_artifact(
+                results, "doctor_occupation", lambda: visualizer.doctor_occupation_figure(stats["doctor_usage"])
+            ))
+        with profiler.phase("Gráfico: ocupação por setor (analítica)"):
+            self.render_occupancy(config, results)
+        with profiler.phase("Gráfico: tempo por setor"):
+            st.pyplot(self.results_artifact(results, "sector_times", lambda: visualizer.sector_times_figure(stats, sectors)))
+        with profiler.phase("Gráfico: probabilidades normalizadas"):
+            st.pyplot(self.results_artifact(
+                results, "normalized_probs",
+                lambda: visualizer.normalized_probs_figure(config["transition_probs"], config["exit_probs"], sectors)
+            ))
+
+        # Exportação
+        st.subheader("📥 Exportar")
+        with profiler.phase("Exportação CSV"):
+            csv_data = self.results_artifact(results, "csv", lambda: self.exporter.to_csv(results, stats))
+        st.download_button("Baixar CSV", csv_data, "resultados.csv", "text/csv")
+        with profiler.phase("Exportação PDF"):
+            pdf_data = self.results_artifact(
+                results, "pdf", lambda: self.exporter.to_pdf(results, transition_probs, stats, config)
+            )
+        if pdf_data:
+            st.download_button("Baixar Relatório PDF", pdf_data, "relatorio.pdf", "application/pdf")
+        else:
+            st.warning("Instale 'reportlab' para exportar PDF.")
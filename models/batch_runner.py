@@ -0,0 +1,152 @@
+# batch_runner.py: Execução de simulações em lote, sem dependências de interface
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from models.markov_model import MarkovHospitalModel
+from models.hospital_sim import HospitalSimulator
+from models.compiled_config import compile_config, config_hash
+from models.jit_kernel import PathSampler
+
+logger = logging.getLogger(__name__)
+
+
+def with_markov_transitions(config):
+    """Configuração compilada com a matriz normalizada (calculada só se ainda não existir)."""
+    if config.router is not None:
+        return config
+    markov_model = MarkovHospitalModel(config)
+    transition_probs = markov_model.compute_transitions()
+    return config.with_transitions(transition_probs, markov_model.normalized_exit_probs)
+
+
+def run_replication(config, seed, engine="simpy", trace=None, kernel=None):
+    """Executa uma replicação (Markov + simulação) com semente fixa.
+
+    Com `trace` (sessão gravada ou PatientTrace) os percursos e tempos são
+    reproduzidos e só a contenção muda com a configuração. Com `kernel`
+    ("auto", "numba", "numpy" ou "python") os percursos são amostrados em lote
+    pelo núcleo de models.jit_kernel e só a contenção é simulada. Uma
+    configuração que já traga `transition_probs` (p. ex. calculadas em lote
+    por `ExperimentPlan`) é simulada com essa matriz, sem a recalcular.
+    """
+    np.random.seed(seed)
+    config = compile_config(config)
+    if kernel is not None:
+        config = with_markov_transitions(config)
+        trace = PathSampler(config, kernel).sample(seed=seed).trace
+    if trace is not None:
+        results, stats = HospitalSimulator(config, trace=trace, engine=engine).run_simulation()
+        return {"config": config.to_dict(), "results": results, "stats": stats}
+    config = with_markov_transitions(config)
+    simulator = HospitalSimulator(config, engine=engine)
+    results, stats = simulator.run_simulation()
+    return {"config": config.to_dict(), "results": results, "stats": stats}
+
+
+def time_in_system(results):
+    """Tempo no hospital (saída - chegada) de cada paciente, com as esperas nas filas.
+
+    Sessões gravadas antes de os resultados terem `departure_time` usam a
+    soma dos atendimentos (`total_waiting_time`).
+    """
+    return np.array([
+        r["departure_time"] - r.get("arrival_time", 0.0) if "departure_time" in r else r["total_waiting_time"]
+        for r in results
+    ], dtype=float)
+
+
+def summarize(name, replication, seed, session):
+    """Resume uma replicação numa linha da tabela de resultados.
+
+    "Tempo Médio"/"Tempo P90" somam os atendimentos de cada paciente; "Tempo
+    no Sistema" e "Espera Média" incluem as filas, pelo que mudam quando um
+    traço é reproduzido com outra equipa.
+    """
+    results = session["results"]
+    stats = session["stats"]
+    times = np.array([r["total_waiting_time"] for r in results], dtype=float)
+    in_system = time_in_system(results)
+    return {
+        "Config": name,
+        "Replicação": replication,
+        "Semente": seed,
+        "Pacientes": len(results),
+        "Tempo Médio (min)": float(times.mean()) if len(times) else 0.0,
+        "Tempo P90 (min)": float(np.percentile(times, 90)) if len(times) else 0.0,
+        "Tempo no Sistema (min)": float(in_system.mean()) if len(in_system) else 0.0,
+        "Tempo no Sistema P90 (min)": float(np.percentile(in_system, 90)) if len(in_system) else 0.0,
+        "Espera Média (min)": float(np.mean(in_system - times)) if len(times) else 0.0,
+        "Ocupação Médicos (%)": stats["doctor_occupation"] * 100,
+        "Setor Mais Congestionado": max(stats["avg_time_per_sector"], key=stats["avg_time_per_sector"].get)
+    }
+
+
+def save_session(sessions_dir, session_name, session):
+    """Grava uma sessão no mesmo formato usado pela página Planejador."""
+    os.makedirs(sessions_dir, exist_ok=True)
+    session_data = {
+        "config": session["config"],
+        "results": session["results"],
+        "stats": session["stats"]
+    }
+    session_path = os.path.join(sessions_dir, f"{session_name}.json")
+    with open(session_path, "w") as f:
+        json.dump(session_data, f, indent=2)
+    return session_path
+
+
+def _run_task(name, config, replication, seed, engine, trace=None, kernel=None):
+    session = run_replication(config, seed, engine, trace, kernel)
+    return name, replication, seed, session
+
+
+def run_batch(configs, replications=1, workers=1, base_seed=0, sessions_dir=None, engine="simpy", trace=None,
+              kernel=None):
+    """Executa todas as configurações com o número pedido de replicações.
+
+    `configs` é um dicionário {nome: config}. A replicação `r` de todas as
+    configurações usa a semente `base_seed + r`, para que cenários diferentes
+    sejam comparados com os mesmos números aleatórios. Devolve as linhas do
+    resumo, ordenadas por configuração e replicação. Com `trace`, todas as
+    configurações reproduzem o mesmo traço; com `kernel`, os percursos são
+    amostrados em lote (ver `run_replication`).
+    """
+    tasks = [
+        (name, config, replication, base_seed + replication, engine, trace, kernel)
+        for name, config in configs.items()
+        for replication in range(replications)
+    ]
+    rows = []
+
+    def collect(name, replication, seed, session):
+        rows.append(summarize(name, replication, seed, session))
+        if sessions_dir:
+            save_session(sessions_dir, f"{name}_rep{replication}", session)
+        logger.info(f"Concluído: {name} (replicação {replication}, semente {seed})")
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_run_task, *task) for task in tasks]
+            for future in as_completed(futures):
+                collect(*future.result())
+    else:
+        for task in tasks:
+            collect(*_run_task(*task))
+
+    rows.sort(key=lambda row: (row["Config"], row["Replicação"]))
+    return rows
+
+
+def write_summary(rows, output_path):
+    """Grava a tabela de resumo em CSV (ou JSON, pela extensão)."""
+    df = pd.DataFrame(rows)
+    if output_path.endswith(".json"):
+        df.to_json(output_path, orient="records", indent=2, force_ascii=False)
+    else:
+        df.to_csv(output_path, index=False)
+    return df
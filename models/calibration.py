@@ -0,0 +1,450 @@
+# calibration.py: Calibração do modelo a partir de registos de eventos (ADT) lidos em blocos
+import io
+import json
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from models.schedule import TURNOS
+
+logger = logging.getLogger(__name__)
+
+# Eventos do registo: admissão (abre a primeira visita), transferência (fecha a
+# visita atual e abre outra) e alta (fecha a visita atual e sai do hospital)
+ADMIT, TRANSFER, DISCHARGE = 0, 1, 2
+EVENT_CODES = {
+    "a": ADMIT, "admissão": ADMIT, "admissao": ADMIT, "admit": ADMIT,
+    "t": TRANSFER, "transferência": TRANSFER, "transferencia": TRANSFER, "transfer": TRANSFER,
+    "d": DISCHARGE, "alta": DISCHARGE, "discharge": DISCHARGE
+}
+# Nomes das colunas do registo (podem ser trocados por `columns`)
+DEFAULT_COLUMNS = {
+    "patient": "patient_id", "time": "timestamp", "event": "event", "sector": "sector", "gravidade": "gravidade"
+}
+DEFAULT_GRAVIDADE = "média"
+# Turnos de 8 horas, o primeiro (manhã) às 07:00
+SHIFT_START_HOUR = 7
+CHUNK_SIZE = 200_000
+# Observações mínimas de uma linha (ou setor) antes de se usar o total de todos os turnos/gravidades
+MIN_COUNT = 30
+
+
+def turno_of_hours(hours):
+    """Turno de cada hora do dia (array), com turnos de 8 horas a partir de SHIFT_START_HOUR."""
+    return np.asarray(TURNOS, dtype=object)[((np.asarray(hours) - SHIFT_START_HOUR) % 24) // 8]
+
+
+def _clean(series, lower=False):
+    """Texto sem espaços (e em minúsculas), tratando só os valores distintos; em falta fica None."""
+    codes, uniques = pd.factorize(series)
+    cleaned = pd.Index(uniques, dtype=object).str.strip()
+    if lower:
+        cleaned = cleaned.str.lower()
+    # O código -1 (valor em falta) escolhe o None acrescentado no fim
+    return np.append(cleaned.to_numpy(dtype=object), None)[codes]
+
+
+def _welford_merge(a, b):
+    """Junta dois resumos (n, média, M2) pela fórmula de Chan (Welford em paralelo)."""
+    n = a[0] + b[0]
+    if n == 0:
+        return [0, 0.0, 0.0]
+    delta = b[1] - a[1]
+    return [n, a[1] + delta * b[0] / n, a[2] + b[2] + delta * delta * a[0] * b[0] / n]
+
+
+def _add_counts(target, source):
+    for key, value in source.items():
+        target[key] = target.get(key, 0) + value
+
+
+class CalibrationState:
+    def __init__(self):
+        """Contagens acumuladas de um ou mais blocos do registo, por (turno, gravidade).
+
+        `transitions[(turno, gravidade, origem, destino)]`, `exits[(turno,
+        gravidade, setor)]` e `service[(turno, gravidade, setor)] = [n, média,
+        M2]` (tempos de atendimento em minutos, por Welford). As visitas
+        ainda abertas no fim do último bloco ficam em `open` e são fechadas
+        pelo primeiro evento do paciente num bloco seguinte (`heads`), pelo
+        que os blocos — e os ficheiros de dias seguintes — se juntam por ordem
+        com `merge`.
+        """
+        self.sectors = []
+        self.transitions = {}
+        self.exits = {}
+        self.service = {}
+        self.admissions = {}
+        self.shifts = set()
+        self.open = {}
+        self.heads = []
+        self.files = {}
+        self.counters = {"rows": 0, "invalid": 0, "visits": 0, "incomplete": 0, "orphan": 0}
+
+    def _add_sectors(self, sectors):
+        known = set(self.sectors)
+        for sector in sectors:
+            if sector not in known:
+                self.sectors.append(sector)
+                known.add(sector)
+
+    def _close(self, visit, time, event, sector):
+        """Fecha uma visita aberta (setor, início, turno, gravidade) com o evento seguinte."""
+        origin, start, turno, gravidade = visit
+        if event == ADMIT or time < start:
+            self.counters["incomplete"] += 1
+            return
+        key = (turno, gravidade, origin)
+        if event == TRANSFER:
+            transition = (turno, gravidade, origin, sector)
+            self.transitions[transition] = self.transitions.get(transition, 0) + 1
+        else:
+            self.exits[key] = self.exits.get(key, 0) + 1
+        # Atualização de Welford com uma observação
+        self.service[key] = _welford_merge(self.service.get(key, [0, 0.0, 0.0]), [1, time - start, 0.0])
+        self.counters["visits"] += 1
+
+    def merge(self, other):
+        """Acrescenta `other` (o bloco seguinte do registo) a este estado; devolve self."""
+        self._add_sectors(other.sectors)
+        for patient, time, event, sector in other.heads:
+            visit = self.open.pop(patient, None)
+            if visit is None:
+                if event != ADMIT:
+                    self.counters["orphan"] += 1
+                continue
+            self._close(visit, time, event, sector)
+        _add_counts(self.transitions, other.transitions)
+        _add_counts(self.exits, other.exits)
+        _add_counts(self.admissions, other.admissions)
+        for key, summary in other.service.items():
+            self.service[key] = _welford_merge(self.service.get(key, [0, 0.0, 0.0]), summary)
+        self.shifts |= other.shifts
+        self.open.update(other.open)
+        self.files.update(other.files)
+        _add_counts(self.counters, other.counters)
+        return self
+
+    def sector_order(self):
+        """Setores com o de admissão mais frequente primeiro (o modelo começa no setor 0).
+
+        Os restantes seguem por ordem alfabética, para que a configuração não
+        dependa da divisão do registo em blocos.
+        """
+        entry = {}
+        for (_, _, sector), count in self.admissions.items():
+            entry[sector] = entry.get(sector, 0) + count
+        sectors = sorted(self.sectors)
+        if not sectors:
+            return []
+        first = max(sectors, key=lambda s: (entry.get(s, 0), -sectors.index(s)))
+        return [first] + [s for s in sectors if s != first]
+
+    def _combo(self, turno, gravidade, sectors):
+        codes = {sector: code for code, sector in enumerate(sectors)}
+        counts = np.zeros((len(sectors), len(sectors)))
+        exits = np.zeros(len(sectors))
+        service = [[0, 0.0, 0.0] for _ in sectors]
+        for (t, g, origin, destination), count in self.transitions.items():
+            if turno in (None, t) and gravidade in (None, g):
+                counts[codes[origin], codes[destination]] += count
+        for (t, g, sector), count in self.exits.items():
+            if turno in (None, t) and gravidade in (None, g):
+                exits[codes[sector]] += count
+        for (t, g, sector), summary in self.service.items():
+            if turno in (None, t) and gravidade in (None, g):
+                service[codes[sector]] = _welford_merge(service[codes[sector]], summary)
+        return counts, exits, service
+
+    def to_config(self, turno=None, gravidade=None, min_count=MIN_COUNT):
+        """Configuração calibrada para um turno e gravidade (None = todos os registos).
+
+        Linhas e setores com menos de `min_count` observações usam os totais
+        de todos os turnos e gravidades. O modelo multiplica transições e
+        saídas pelo mesmo fator de turno/gravidade antes de normalizar, pelo
+        que as probabilidades observadas entram tal como estão. Os tempos
+        médios vão em `service_means` ({setor: minutos}) e `num_patients` é a
+        média de admissões por turno observado.
+        """
+        sectors = self.sector_order()
+        if len(sectors) < 2:
+            raise ValueError("O registo tem menos de 2 setores; não é possível calibrar.")
+        counts, exits, service = self._combo(turno, gravidade, sectors)
+        pooled_counts, pooled_exits, pooled_service = self._combo(None, None, sectors)
+        sparse = counts.sum(axis=1) + exits < min_count
+        counts[sparse], exits[sparse] = pooled_counts[sparse], pooled_exits[sparse]
+        totals = counts.sum(axis=1) + exits
+        scale = np.where(totals > 0, 1.0 / np.where(totals > 0, totals, 1.0), 0.0)
+
+        service_means = {}
+        for code, sector in enumerate(sectors):
+            summary = service[code] if service[code][0] >= min_count else pooled_service[code]
+            if summary[0] > 0:
+                service_means[sector] = round(summary[1], 4)
+
+        admissions = sum(
+            count for (t, g, _), count in self.admissions.items()
+            if turno in (None, t) and gravidade in (None, g)
+        )
+        shifts = sum(1 for shift in self.shifts if turno in (None, shift.rsplit(":", 1)[1]))
+        config = {
+            "sectors": sectors,
+            "transition_base": np.round(counts * scale[:, None], 6).tolist(),
+            "exit_probs": np.round(exits * scale, 6).tolist(),
+            "service_means": service_means,
+            "num_patients": max(1, int(round(admissions / shifts))) if shifts else 1
+        }
+        if turno is not None:
+            config["turno"] = turno
+        if gravidade is not None:
+            config["gravidade"] = gravidade
+        return config
+
+    def combos(self):
+        """Pares (turno, gravidade) presentes no registo."""
+        return sorted({key[:2] for key in self.service})
+
+    def to_dict(self):
+        return {
+            "sectors": self.sectors,
+            "transitions": [list(key) + [count] for key, count in self.transitions.items()],
+            "exits": [list(key) + [count] for key, count in self.exits.items()],
+            "service": [list(key) + summary for key, summary in self.service.items()],
+            "admissions": [list(key) + [count] for key, count in self.admissions.items()],
+            "shifts": sorted(self.shifts),
+            "open": {patient: list(visit) for patient, visit in self.open.items()},
+            "files": self.files,
+            "counters": self.counters
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls()
+        state.sectors = list(data["sectors"])
+        state.transitions = {tuple(row[:4]): row[4] for row in data["transitions"]}
+        state.exits = {tuple(row[:3]): row[3] for row in data["exits"]}
+        state.service = {tuple(row[:3]): list(row[3:]) for row in data["service"]}
+        state.admissions = {tuple(row[:3]): row[3] for row in data["admissions"]}
+        state.shifts = set(data["shifts"])
+        state.open = {patient: tuple(visit) for patient, visit in data["open"].items()}
+        state.files = dict(data["files"])
+        state.counters.update(data["counters"])
+        return state
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Estado gravado em `path`, ou um estado vazio se o ficheiro não existir."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def summarize_chunk(frame, columns=None):
+    """Resume um bloco do registo (DataFrame) num CalibrationState parcial, sem ciclos por linha.
+
+    Os eventos de cada paciente são ordenados pelo instante (estável, para
+    manter a ordem do registo em empates). Cada visita fechada dentro do
+    bloco conta uma transição ou saída e um tempo de atendimento; o primeiro
+    evento de cada paciente fica em `heads` (pode fechar uma visita de um
+    bloco anterior) e a última visita ainda aberta em `open`.
+    """
+    columns = dict(DEFAULT_COLUMNS, **(columns or {}))
+    state = CalibrationState()
+    state.counters["rows"] = len(frame)
+    times = pd.to_datetime(frame[columns["time"]], errors="coerce")
+    events = pd.Series(_clean(frame[columns["event"]], lower=True), index=frame.index).map(EVENT_CODES)
+    sectors = _clean(frame[columns["sector"]])
+    if columns["gravidade"] in frame:
+        gravidade = _clean(frame[columns["gravidade"]].fillna(DEFAULT_GRAVIDADE), lower=True)
+    else:
+        gravidade = DEFAULT_GRAVIDADE
+    df = pd.DataFrame({
+        "patient": frame[columns["patient"]].astype(str),
+        "minutes": (times - pd.Timestamp(0)) / pd.Timedelta(minutes=1),
+        "event": events,
+        "sector": sectors,
+        "gravidade": gravidade,
+        "hour": times.dt.hour,
+        # O turno da noite começa num dia e acaba no seguinte: conta no dia em que começou
+        "shift_date": (times - pd.Timedelta(hours=SHIFT_START_HOUR)).dt.strftime("%Y-%m-%d")
+    })
+    valid = times.notna() & events.notna() & (frame[columns["patient"]].notna())
+    valid &= (df["event"] == DISCHARGE) | df["sector"].notna()
+    state.counters["invalid"] = int((~valid).sum())
+    df = df[valid].sort_values(["patient", "minutes"], kind="mergesort")
+    if df.empty:
+        return state
+    df["event"] = df["event"].astype(int)
+    df["turno"] = turno_of_hours(df["hour"].to_numpy(dtype=int))
+    opens = df["event"].to_numpy() != DISCHARGE
+    state._add_sectors(pd.unique(df.loc[opens, "sector"]))
+
+    patient = df["patient"].to_numpy()
+    same_next = np.append(patient[1:] == patient[:-1], False)
+    first = np.insert(patient[1:] != patient[:-1], 0, True)
+    event = df["event"].to_numpy()
+    next_event = np.append(event[1:], DISCHARGE)
+
+    # Visitas fechadas dentro do bloco
+    closed = opens & same_next & (next_event != ADMIT)
+    state.counters["incomplete"] = int((opens & same_next & (next_event == ADMIT)).sum())
+    visits = pd.DataFrame({
+        "turno": df["turno"].to_numpy()[closed],
+        "gravidade": df["gravidade"].to_numpy()[closed],
+        "origin": df["sector"].to_numpy()[closed],
+        "destination": np.append(df["sector"].to_numpy()[1:], "")[closed],
+        "exit": next_event[closed] == DISCHARGE,
+        "duration": (np.append(df["minutes"].to_numpy()[1:], 0.0) - df["minutes"].to_numpy())[closed]
+    })
+    backwards = visits["duration"] < 0
+    state.counters["incomplete"] += int(backwards.sum())
+    visits = visits[~backwards]
+    state.counters["visits"] = len(visits)
+    moved = visits[~visits["exit"]]
+    state.transitions = moved.groupby(["turno", "gravidade", "origin", "destination"]).size().to_dict()
+    state.exits = visits[visits["exit"]].groupby(["turno", "gravidade", "origin"]).size().to_dict()
+    grouped = visits.groupby(["turno", "gravidade", "origin"])["duration"]
+    sizes, means, variances = grouped.size(), grouped.mean(), grouped.var(ddof=0)
+    state.service = {
+        key: [int(n), float(mean), float(variance * n)]
+        for key, n, mean, variance in zip(sizes.index, sizes.to_numpy(), means.to_numpy(), variances.to_numpy())
+    }
+
+    admitted = event == ADMIT
+    state.admissions = pd.DataFrame({
+        "turno": df["turno"].to_numpy()[admitted], "gravidade": df["gravidade"].to_numpy()[admitted],
+        "sector": df["sector"].to_numpy()[admitted]
+    }).groupby(["turno", "gravidade", "sector"]).size().to_dict()
+    state.shifts = {
+        f"{date}:{turno}" for date, turno in zip(df["shift_date"].to_numpy()[admitted], df["turno"].to_numpy()[admitted])
+    }
+
+    heads = df[first]
+    state.heads = list(zip(heads["patient"], heads["minutes"], heads["event"], heads["sector"]))
+    tails = df[opens & ~same_next]
+    state.open = {
+        row.patient: (row.sector, row.minutes, row.turno, row.gravidade)
+        for row in tails[["patient", "sector", "minutes", "turno", "gravidade"]].itertuples(index=False)
+    }
+    return state
+
+
+class _ByteRange(io.RawIOBase):
+    def __init__(self, f, size):
+        """Leitura de no máximo `size` bytes de `f` (o resto do ficheiro pode estar a ser escrito)."""
+        self.f = f
+        self.remaining = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        view = memoryview(buffer)[:self.remaining]
+        count = self.f.readinto(view)
+        self.remaining -= count
+        return count
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE, columns=None, offset=0, end=None):
+    """Blocos de `chunk_size` linhas de um registo CSV (memória limitada ao bloco).
+
+    Lê os bytes [offset, end) do ficheiro (por omissão, todos). Com `offset`
+    (o início de uma linha) a leitura usa os nomes das colunas do cabeçalho:
+    continua um ficheiro que cresceu.
+    """
+    columns = dict(DEFAULT_COLUMNS, **(columns or {}))
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [name for name in columns.values() if name in header]
+    options = {"header": None, "names": list(header)} if offset else {}
+    end = os.path.getsize(path) if end is None else end
+    with open(path, "rb") as f:
+        f.seek(offset)
+        reader = io.BufferedReader(_ByteRange(f, end - offset))
+        yield from pd.read_csv(reader, chunksize=chunk_size, usecols=usecols, dtype=str, **options)
+
+
+def _resume_offset(state, path):
+    """Byte a partir do qual `path` ainda não foi lido (None se já foi lido por inteiro).
+
+    `state.files` guarda, por ficheiro, os bytes e linhas já ingeridos. Um
+    ficheiro que só cresceu continua no fim da última leitura; um ficheiro
+    mais pequeno, ou que não acabava numa linha completa, foi alterado e a
+    leitura pararia a meio: é um erro em vez de contar eventos duas vezes.
+    """
+    size = os.path.getsize(path)
+    read = state.files.get(os.path.abspath(path))
+    if read is None:
+        return 0
+    read_bytes = read["bytes"] if isinstance(read, dict) else read
+    if size == read_bytes:
+        return None
+    if isinstance(read, dict) and size > read_bytes:
+        with open(path, "rb") as f:
+            f.seek(read_bytes - 1)
+            if f.read(1) == b"\n":
+                return read_bytes
+    raise ValueError(
+        f"O registo {path} mudou desde a última leitura ({read_bytes} -> {size} bytes) sem ser só por "
+        "linhas acrescentadas no fim; recomece a calibração com um estado novo."
+    )
+
+
+def ingest(paths, state=None, chunk_size=CHUNK_SIZE, workers=1, columns=None):
+    """Lê os registos em blocos e acrescenta-os ao `state` (novo, se None); devolve o estado.
+
+    Os ficheiros são lidos pela ordem dada (e devem estar em ordem
+    cronológica); ficheiros já ingeridos são ignorados e os que cresceram
+    continuam onde a última leitura acabou (ver `_resume_offset`), pelo que
+    se pode chamar de novo com o diretório inteiro, ou com um registo a que
+    se acrescentaram linhas, quando chegam os eventos de um novo dia. Com
+    `workers > 1` os blocos são resumidos num pool de processos (no máximo
+    2 * workers em curso) e juntados pela ordem do registo, com o mesmo
+    resultado da leitura sequencial.
+    """
+    state = CalibrationState() if state is None else state
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".csv")))
+        else:
+            files.append(path)
+    # Validar todos os ficheiros antes de ler, para não deixar o estado a meio
+    offsets = [(path, _resume_offset(state, path)) for path in files]
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for path, offset in offsets:
+            if offset is None:
+                continue
+            size = os.path.getsize(path)
+            rows = state.counters["rows"]
+            in_flight = deque()
+            for chunk in read_chunks(path, chunk_size, columns, offset, size):
+                if executor is None:
+                    state.merge(summarize_chunk(chunk, columns))
+                    continue
+                in_flight.append(executor.submit(summarize_chunk, chunk, columns))
+                if len(in_flight) >= 2 * workers:
+                    state.merge(in_flight.popleft().result())
+            while in_flight:
+                state.merge(in_flight.popleft().result())
+            previous = state.files.get(os.path.abspath(path))
+            state.files[os.path.abspath(path)] = {
+                "bytes": size,
+                "rows": (previous["rows"] if offset else 0) + state.counters["rows"] - rows
+            }
+            logger.info(f"Registo ingerido: {path} ({state.counters['visits']} visitas no total)")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return state
@@ -0,0 +1,159 @@
+# compiled_config.py: Configuração compilada (imutável) com estruturas pré-calculadas
+import copy
+import hashlib
+import json
+from collections.abc import Mapping
+
+import numpy as np
+
+from models.markov_model import TURNO_FACTORS, GRAVIDADE_FACTORS
+from models.sampling import SparseTransitions, AliasTable
+
+# Tempo médio de atendimento (min) e ajuste pela gravidade do caso
+CONSULTA_MEAN_TIME = 15.0
+SECTOR_MEAN_TIME = 10.0
+GRAVIDADE_SERVICE_FACTORS = {"baixa": 1.2, "média": 1.0, "alta": 0.8}
+DOCTOR_SECTOR = "Consulta"
+
+
+def _json_default(value):
+    """Valores não-JSON da configuração: arrays e escalares numpy por inteiro (o `str` de
+    um array grande é truncado com "..." e matrizes diferentes teriam o mesmo hash)."""
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    if isinstance(value, SparseTransitions):
+        return value.to_dict()
+    return str(value)
+
+
+def config_hash(config):
+    """Gera um identificador estável para uma configuração (dicionário ou compilada)."""
+    if isinstance(config, CompiledConfig):
+        return config.digest
+    payload = json.dumps(config, sort_keys=True, ensure_ascii=False, default=_json_default)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def _frozen_array(values):
+    array = np.array(values, dtype=float)
+    array.setflags(write=False)
+    return array
+
+
+class CompiledConfig(Mapping):
+    def __init__(self, config):
+        """Forma imutável de uma configuração, compilada uma única vez.
+
+        Guarda os setores como tuplo e mapa nome -> código, as matrizes em
+        arrays numpy só de leitura, a tabela de alias das transições (se a
+        configuração já as tiver), os fatores de turno e gravidade resolvidos e
+        o tempo médio de atendimento por setor. `config["service_means"]`
+        ({setor: minutos} ou lista) substitui os tempos por omissão e não é
+        ajustado pela gravidade (são tempos observados).
+
+        Continua a ler-se como um dicionário (`config["sectors"]`); as leituras
+        devolvem cópias, para que a configuração não mude depois de compilada.
+        É hashable (pelo `digest`) e pode servir de chave de cache.
+        """
+        raw = {key: value for key, value in config.items()}
+        transition_probs = raw.get("transition_probs")
+        if isinstance(transition_probs, SparseTransitions):
+            raw["transition_probs"] = transition_probs.to_dict()
+        elif isinstance(transition_probs, np.ndarray):
+            raw["transition_probs"] = transition_probs.tolist()
+        set_ = object.__setattr__
+        set_(self, "_raw", copy.deepcopy(raw))
+        set_(self, "digest", config_hash(self._raw))
+
+        sectors = tuple(raw["sectors"])
+        set_(self, "sectors", sectors)
+        set_(self, "num_sectors", len(sectors))
+        set_(self, "sector_codes", {sector: code for code, sector in enumerate(sectors)})
+        set_(self, "doctor_sector", self.sector_codes.get(DOCTOR_SECTOR, -1))
+        set_(self, "num_patients", int(raw.get("num_patients", 0)))
+        set_(self, "medicos", int(raw.get("medicos_disponiveis", 1)))
+        set_(self, "turno", raw.get("turno"))
+        set_(self, "gravidade", raw.get("gravidade"))
+        set_(self, "prioridade_ativa", bool(raw.get("prioridade_ativa", False)))
+        set_(self, "turno_factor", TURNO_FACTORS.get(self.turno, 1.0))
+        set_(self, "gravidade_factor", GRAVIDADE_FACTORS.get(self.gravidade, 1.0))
+        set_(self, "service_factor", GRAVIDADE_SERVICE_FACTORS.get(self.gravidade, 1.0))
+        set_(self, "priority", -1 if self.prioridade_ativa and self.gravidade == "alta" else 0)
+        set_(self, "transition_base", _frozen_array(raw["transition_base"]) if "transition_base" in raw else None)
+        set_(self, "exit_probs", _frozen_array(raw["exit_probs"]) if "exit_probs" in raw else None)
+        set_(self, "service_means", _frozen_array(self._service_means(raw.get("service_means"))))
+
+        if transition_probs is not None:
+            sparse = SparseTransitions.from_any(raw["transition_probs"])
+            set_(self, "transition_probs", sparse)
+            set_(self, "router", AliasTable(sparse))
+        else:
+            set_(self, "transition_probs", None)
+            set_(self, "router", None)
+
+    def _service_means(self, overrides):
+        means = [
+            (CONSULTA_MEAN_TIME if code == self.doctor_sector else SECTOR_MEAN_TIME) * self.service_factor
+            for code in range(self.num_sectors)
+        ]
+        if isinstance(overrides, Mapping):
+            for sector, mean in overrides.items():
+                if sector not in self.sector_codes:
+                    raise ValueError(f"'service_means' refere um setor desconhecido: {sector}")
+                means[self.sector_codes[sector]] = float(mean)
+        elif overrides is not None:
+            if len(overrides) != self.num_sectors:
+                raise ValueError(f"'service_means' deve ter {self.num_sectors} valores.")
+            means = [float(mean) for mean in overrides]
+        return means
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompiledConfig é imutável; use replace() ou with_transitions().")
+
+    def __getitem__(self, key):
+        return copy.deepcopy(self._raw[key])
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __eq__(self, other):
+        if isinstance(other, CompiledConfig):
+            return self.digest == other.digest
+        return NotImplemented
+
+    def __repr__(self):
+        return f"CompiledConfig({self.digest}, setores={list(self.sectors)})"
+
+    def to_dict(self):
+        """Dicionário simples (serializável em JSON) equivalente."""
+        return copy.deepcopy(self._raw)
+
+    def copy(self):
+        """Cópia mutável em dicionário, como `dict.copy()` (as páginas alteram-na)."""
+        return self.to_dict()
+
+    def replace(self, **changes):
+        """Nova configuração compilada com as chaves alteradas."""
+        raw = self.to_dict()
+        raw.update(changes)
+        return CompiledConfig(raw)
+
+    def with_transitions(self, transition_probs, exit_probs=None):
+        """Nova configuração com as probabilidades normalizadas de uma execução."""
+        changes = {"transition_probs": transition_probs}
+        if exit_probs is not None:
+            changes["exit_probs"] = np.asarray(exit_probs, dtype=float).tolist()
+        return self.replace(**changes)
+
+
+def compile_config(config):
+    """Compila um dicionário (uma configuração já compilada é devolvida tal como está)."""
+    if isinstance(config, CompiledConfig):
+        return config
+    return CompiledConfig(config)
@@ -0,0 +1,193 @@
+# event_kernel.py: Núcleo de eventos discretos com heap binário (alternativa ao SimPy)
+import heapq
+import logging
+import math
+
+from models.sampling import EXIT
+
+logger = logging.getLogger(__name__)
+
+# Ordem dos eventos no mesmo instante: chegadas externas antes dos fins de atendimento
+ARRIVAL, SERVICE_END = 0, 1
+
+
+class HeapEventKernel:
+    def __init__(self, simulator, max_steps=100):
+        """Executa o modelo do `HospitalSimulator` sem processos SimPy.
+
+        O calendário é um heap de eventos (tempo, tipo, chave, paciente); o
+        estado dos pacientes fica em listas indexadas pelo id e os médicos e
+        setores são pools com fila de espera em heap ordenada por
+        (prioridade, ordem de chegada). Percursos e tempos de atendimento vêm
+        do `routing` do simulador (sorteados ou reproduzidos de um traço).
+
+        `run` simula tudo de uma vez. O núcleo também pode ser avançado por
+        janelas (`advance`) e receber pacientes de fora (`add_arrival`), como
+        na rede regional (models.network); `on_finish(paciente, resultado,
+        saiu)` é chamado para cada paciente que termina.
+        """
+        self.simulator = simulator
+        self.max_steps = max_steps
+        config = simulator.config
+        self.sectors = config.sectors
+        num_sectors = len(self.sectors)
+        self.routing = simulator.routing
+        _, self.doctor_sector = simulator.service_means()
+
+        # Pool 0: médicos (Consulta); pool s + 1: servidor único de cada setor
+        self.capacity = [config.medicos] + [1] * num_sectors
+        self.busy = [0] * len(self.capacity)
+        self.waiting = [[] for _ in self.capacity]
+        self.pool_of = [0 if s == self.doctor_sector else s + 1 for s in range(num_sectors)]
+
+        self.current, self.priorities, self.steps, self.totals = [], [], [], []
+        self.service, self.paths, self.durations, self.arrivals = [], [], [], []
+        self.extra = {}
+        self.sector_time = [0.0] * num_sectors
+        self.sector_visits = [0] * num_sectors
+        self.doctor_usage = simulator.stats["doctor_usage"]
+        self.results = simulator.results
+        self.on_finish = None
+        self.calendar = []
+        self.seq = 0
+        self.now = 0.0
+        self.started = False
+
+    def _admit(self, sector, priority, arrival=0.0):
+        self.current.append(sector)
+        self.priorities.append(priority)
+        self.steps.append(0)
+        self.totals.append(0.0)
+        self.service.append(0.0)
+        self.paths.append([])
+        self.durations.append([])
+        self.arrivals.append(arrival)
+        return len(self.current) - 1
+
+    def _start_service(self, patient):
+        sector = self.current[patient]
+        duration = self.routing.service_time(patient, sector)
+        self.service[patient] = duration
+        if sector == self.doctor_sector:
+            self.doctor_usage.append((self.now, 1))
+        self.seq += 1
+        heapq.heappush(self.calendar, (self.now + duration, SERVICE_END, self.seq, patient))
+
+    def _request(self, patient):
+        sector = self.current[patient]
+        self.paths[patient].append(self.sectors[sector])
+        self.sector_visits[sector] += 1
+        pool = self.pool_of[sector]
+        if self.busy[pool] < self.capacity[pool]:
+            self.busy[pool] += 1
+            self._start_service(patient)
+        else:
+            self.seq += 1
+            heapq.heappush(self.waiting[pool], (self.priorities[patient], self.seq, patient))
+
+    def _finish(self, patient, exited):
+        result = {
+            "patient_id": self.routing.patient_id(patient),
+            "total_waiting_time": self.totals[patient],
+            "sectors_visited": self.paths[patient],
+            "service_times": self.durations[patient],
+            "priority": "Alta" if self.priorities[patient] == -1 else "Normal",
+            "arrival_time": self.arrivals[patient],
+            "departure_time": self.now
+        }
+        if self.on_finish is not None:
+            self.on_finish(patient, result, exited)
+        self.results.append(result)
+
+    def start(self):
+        """Admite os pacientes do `routing` (todos em t = 0), uma única vez."""
+        if self.started:
+            return
+        self.started = True
+        routing = self.routing
+        patients = [self._admit(routing.start_sector(p), routing.priority(p)) for p in range(routing.num_patients)]
+        for patient in patients:
+            self._request(patient)
+
+    def add_arrival(self, time, key, sector, priority, extra=None):
+        """Agenda a chegada de um paciente de fora no setor `sector`.
+
+        `key` (comparável, p. ex. (origem, sequência)) ordena as chegadas no
+        mesmo instante; `extra` fica em `self.extra[paciente]` para `on_finish`.
+        """
+        heapq.heappush(self.calendar, (time, ARRIVAL, key, (sector, priority, extra)))
+
+    def next_time(self):
+        """Instante do próximo evento do calendário (inf se não houver)."""
+        self.start()
+        return self.calendar[0][0] if self.calendar else math.inf
+
+    def advance(self, until=math.inf):
+        """Processa os eventos anteriores a `until`; devolve o instante do último evento."""
+        self.start()
+        calendar = self.calendar
+        heappop = heapq.heappop
+        next_sector = self.routing.next_sector
+        current, steps, service = self.current, self.steps, self.service
+        totals, durations, paths = self.totals, self.durations, self.paths
+        sector_time, pool_of, waiting, busy = self.sector_time, self.pool_of, self.waiting, self.busy
+        doctor_sector, doctor_usage, max_steps = self.doctor_sector, self.doctor_usage, self.max_steps
+        start_service, request, finish = self._start_service, self._request, self._finish
+
+        while calendar and calendar[0][0] < until:
+            now, kind, _, payload = heappop(calendar)
+            self.now = now
+            if kind == ARRIVAL:
+                sector, priority, extra = payload
+                patient = self._admit(sector, priority, now)
+                if extra is not None:
+                    self.extra[patient] = extra
+                request(patient)
+                continue
+
+            patient = payload
+            sector = current[patient]
+            if sector == doctor_sector:
+                doctor_usage.append((now, -1))
+
+            # Libertar o servidor e passar ao próximo da fila, se houver
+            pool = pool_of[sector]
+            if waiting[pool]:
+                start_service(heappop(waiting[pool])[2])
+            else:
+                busy[pool] -= 1
+
+            duration = service[patient]
+            totals[patient] += duration
+            durations[patient].append(duration)
+            sector_time[sector] += duration
+
+            following = next_sector(patient, sector)
+            if following < 0:
+                if following == EXIT:
+                    paths[patient].append("Saída")
+                finish(patient, following == EXIT)
+                continue
+            current[patient] = following
+            steps[patient] += 1
+            if steps[patient] >= max_steps:
+                logger.warning(f"Paciente {patient} atingiu o limite de passos ({max_steps})")
+                finish(patient, False)
+                continue
+            request(patient)
+        return self.now
+
+    def record_stats(self):
+        """Acrescenta o tempo e as visitas por setor às estatísticas do simulador."""
+        stats = self.simulator.stats
+        for s, name in enumerate(self.sectors):
+            stats["avg_time_per_sector"][name] += self.sector_time[s]
+            stats["sector_visits"][name] += self.sector_visits[s]
+
+    def run(self, max_steps=None):
+        """Simula todos os pacientes; devolve o instante do último evento."""
+        if max_steps is not None:
+            self.max_steps = max_steps
+        now = self.advance()
+        self.record_stats()
+        return now
@@ -0,0 +1,213 @@
+# experiments.py: Planos de experiências (fatoriais e hipercubo latino) executados em paralelo
+import copy
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from models.batch_runner import config_hash, run_replication, summarize
+from models.markov_model import MarkovHospitalModel
+
+logger = logging.getLogger(__name__)
+
+DESIGNS = ("full", "fractional", "lhs", "points")
+# Chaves cujo valor é inteiro (níveis contínuos do hipercubo latino são arredondados)
+INTEGER_KEYS = ("num_patients", "medicos_disponiveis")
+# Chaves da configuração de cada ponto copiadas para as linhas (mesmo as que não são fatores)
+POINT_KEYS = ("num_patients", "medicos_disponiveis", "turno", "gravidade", "prioridade_ativa")
+METRIC_COLUMNS = (
+    "Pacientes", "Tempo Médio (min)", "Tempo P90 (min)", "Tempo no Sistema (min)", "Espera Média (min)",
+    "Ocupação Médicos (%)", "Setor Mais Congestionado"
+)
+
+
+def full_factorial(levels):
+    """Todas as combinações dos níveis (lista de listas) como índices."""
+    return list(itertools.product(*[range(len(values)) for values in levels]))
+
+
+def fractional_factorial(num_factors, fraction):
+    """Plano 2^(k-p): `fraction` = p fatores gerados por interações dos restantes.
+
+    Os k-p fatores base formam um fatorial completo em ±1; cada fator extra é
+    o produto de um conjunto de colunas base, escolhendo primeiro as
+    interações de ordem mais alta (maior resolução). Devolve índices 0/1.
+    """
+    base = num_factors - fraction
+    if fraction < 0 or base < 1:
+        raise ValueError(f"Fração inválida: 2^({num_factors}-{fraction}).")
+    generators = [
+        combo
+        for size in range(base, 1, -1)
+        for combo in itertools.combinations(range(base), size)
+    ]
+    if fraction > len(generators):
+        raise ValueError(f"Não há geradores suficientes para 2^({num_factors}-{fraction}).")
+    signs = np.array(list(itertools.product([-1, 1], repeat=base)))
+    columns = [signs[:, j] for j in range(base)]
+    columns += [np.prod(signs[:, list(combo)], axis=1) for combo in generators[:fraction]]
+    return [tuple(int(v > 0) for v in row) for row in np.column_stack(columns)]
+
+
+def latin_hypercube(num_samples, num_factors, rng):
+    """Amostra estratificada em [0, 1): cada fator cobre os `num_samples` estratos uma vez."""
+    strata = np.column_stack([rng.permutation(num_samples) for _ in range(num_factors)])
+    return (strata + rng.random((num_samples, num_factors))) / num_samples
+
+
+class ExperimentPlan:
+    def __init__(self, base_config, factors, design="full", replications=1, base_seed=0,
+                 fraction=1, samples=10, seed=None):
+        """Plano declarativo sobre chaves da configuração.
+
+        `factors` é {chave: níveis}, com níveis numa lista (valores discretos) ou,
+        só no hipercubo latino, num tuplo (mínimo, máximo) para um intervalo
+        contínuo. O fatorial fracionário exige exatamente dois níveis por fator.
+        Pontos que resultam na mesma configuração são executados uma única vez.
+        """
+        if design not in DESIGNS:
+            raise ValueError(f"Plano desconhecido: {design}. Use um de {DESIGNS}.")
+        if not factors:
+            raise ValueError("O plano precisa de pelo menos um fator.")
+        self.base_config = base_config
+        self.factors = dict(factors)
+        self.design = design
+        self.replications = replications
+        self.base_seed = base_seed
+        self.points = self._build_points(fraction, samples, seed) if design != "points" else []
+
+    @classmethod
+    def from_points(cls, base_config, points, replications=1, base_seed=0):
+        """Plano com pontos explícitos (lista de {chave: valor}), p. ex. escolhidos por um modelo."""
+        if not points:
+            raise ValueError("O plano precisa de pelo menos um ponto.")
+        plan = cls(base_config, {key: [] for key in points[0]}, design="points",
+                   replications=replications, base_seed=base_seed)
+        plan.points = [dict(point) for point in points]
+        return plan
+
+    def _build_points(self, fraction, samples, seed):
+        keys = list(self.factors)
+        levels = [self.factors[key] for key in keys]
+        if self.design != "lhs" and any(isinstance(values, tuple) for values in levels):
+            raise ValueError("Intervalos (mínimo, máximo) só são aceites no hipercubo latino.")
+        if self.design == "full":
+            rows = full_factorial(levels)
+            values = [[levels[j][i] for j, i in enumerate(row)] for row in rows]
+        elif self.design == "fractional":
+            if any(len(values) != 2 for values in levels):
+                raise ValueError("O fatorial fracionário exige exatamente 2 níveis por fator.")
+            rows = fractional_factorial(len(keys), fraction)
+            values = [[levels[j][i] for j, i in enumerate(row)] for row in rows]
+        else:
+            unit = latin_hypercube(samples, len(keys), np.random.default_rng(seed))
+            values = [[self._scale(key, levels[j], u[j]) for j, key in enumerate(keys)] for u in unit]
+        return [dict(zip(keys, point)) for point in values]
+
+    @staticmethod
+    def _scale(key, levels, u):
+        if isinstance(levels, tuple):
+            low, high = levels
+            value = low + u * (high - low)
+            return int(round(value)) if key in INTEGER_KEYS else float(value)
+        return levels[min(int(u * len(levels)), len(levels) - 1)]
+
+    def config_for(self, point):
+        config = copy.deepcopy(dict(self.base_config))
+        config.update(point)
+        # A matriz da base não vale para outro turno ou gravidade (ver `add_transitions`)
+        config.pop("transition_probs", None)
+        return config
+
+    def add_transitions(self, configs):
+        """Acrescenta às configurações a matriz normalizada do seu (turno, gravidade).
+
+        Médicos e pacientes não alteram a matriz: cada par (turno, gravidade)
+        de uma mesma matriz base é calculado uma única vez, num lote de
+        `compute_transitions_batch` com a semente `base_seed`.
+        """
+        groups = {}
+        for config in configs:
+            base = config_hash({key: config[key] for key in ("transition_base", "exit_probs")})
+            groups.setdefault(base, []).append(config)
+        for members in groups.values():
+            combos = list(dict.fromkeys((config["turno"], config["gravidade"]) for config in members))
+            transitions, exits = MarkovHospitalModel(members[0]).compute_transitions_batch(combos, seed=self.base_seed)
+            index = {combo: i for i, combo in enumerate(combos)}
+            for config in members:
+                i = index[(config["turno"], config["gravidade"])]
+                config["transition_probs"] = transitions[i].tolist()
+                config["exit_probs"] = exits[i].tolist()
+        return configs
+
+    def unique_points(self):
+        """{hash da configuração: (configuração, [índices dos pontos])}."""
+        unique = {}
+        configs = self.add_transitions([self.config_for(point) for point in self.points])
+        for idx, config in enumerate(configs):
+            digest = config_hash(config)
+            unique.setdefault(digest, (config, []))[1].append(idx)
+        return unique
+
+    def tasks(self, unique=None):
+        """Unidades de execução (hash, configuração, replicação, semente), sem repetidos.
+
+        `unique` reutiliza o resultado de `unique_points` (e as suas matrizes).
+        """
+        unique = self.unique_points() if unique is None else unique
+        return [
+            (digest, config, replication, self.base_seed + replication)
+            for digest, (config, _) in unique.items()
+            for replication in range(self.replications)
+        ]
+
+
+def _run_point(digest, config, replication, seed, engine):
+    session = run_replication(config, seed, engine)
+    return digest, replication, summarize(digest, replication, seed, session)
+
+
+def run_plan(plan, workers=None, engine="simpy", pool=None):
+    """Executa o plano e devolve as linhas da tabela à medida que terminam.
+
+    Cada linha tem o índice do ponto, os valores dos fatores e das chaves de
+    `POINT_KEYS` na configuração executada, a replicação, a semente e as
+    métricas de `summarize`. Pontos repetidos partilham a mesma
+    execução. A replicação r usa a semente `base_seed + r` em todos os pontos.
+    Com `pool` (models.worker_pool.SimulationPool) as execuções vão para o pool
+    partilhado, onde se juntam a pedidos iguais de outras sessões.
+    """
+    unique = plan.unique_points()
+    tasks = plan.tasks(unique)
+    workers = workers or os.cpu_count() or 1
+    logger.info(f"Plano {plan.design}: {len(plan.points)} pontos, {len(unique)} distintos, {len(tasks)} execuções")
+
+    def rows_for(digest, replication, summary):
+        config, indices = unique[digest]
+        for idx in indices:
+            row = {"Ponto": idx}
+            row.update({key: config[key] for key in POINT_KEYS if key in config})
+            row.update(plan.points[idx])
+            row["Replicação"] = replication
+            row["Semente"] = summary["Semente"]
+            row.update({column: summary[column] for column in METRIC_COLUMNS})
+            yield row
+
+    if pool is not None:
+        futures = {
+            pool.submit(config, seed, engine): (digest, replication, seed)
+            for digest, config, replication, seed in tasks
+        }
+        for future in as_completed(futures):
+            digest, replication, seed = futures[future]
+            yield from rows_for(digest, replication, summarize(digest, replication, seed, future.result()))
+    elif workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            futures = [executor.submit(_run_point, *task, engine) for task in tasks]
+            for future in as_completed(futures):
+                yield from rows_for(*future.result())
+    else:
+        for task in tasks:
+            yield from rows_for(*_run_point(*task, engine))
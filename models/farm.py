@@ -0,0 +1,261 @@
+# farm.py: Distribuição de replicações por várias máquinas (coordenador + trabalhadores HTTP)
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from models.batch_runner import config_hash, run_replication, summarize
+
+logger = logging.getLogger(__name__)
+
+
+class FarmCoordinator:
+    def __init__(self, configs, seeds, engine="simpy", lease_seconds=600.0, max_attempts=3):
+        """Divide uma experiência (configurações x sementes) em unidades de trabalho.
+
+        Cada unidade é identificada por (hash da configuração, semente); pares
+        repetidos são executados uma única vez, mas cada (nome, replicação)
+        que lhes corresponde recebe a sua linha no resumo. Uma unidade cedida a um
+        trabalhador volta à fila se o prazo `lease_seconds` expirar ou se o
+        trabalhador reportar erro, até `max_attempts` tentativas.
+        """
+        self.engine = engine
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.units = {}
+        self.pending = deque()
+        self.results = {}
+        self.failed = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        for name, config in configs.items():
+            digest = config_hash(config)
+            for replication, seed in enumerate(seeds):
+                unit_id = f"{digest}:{seed}"
+                if unit_id in self.units:
+                    self.units[unit_id]["targets"].append((name, replication))
+                    continue
+                self.units[unit_id] = {
+                    "unit_id": unit_id,
+                    "name": name,
+                    "replication": replication,
+                    "config": config,
+                    "config_hash": digest,
+                    "seed": seed,
+                    "engine": engine,
+                    "targets": [(name, replication)],
+                    "attempts": 0,
+                    "leased_until": None,
+                    "worker": None
+                }
+                self.pending.append(unit_id)
+        if not self.units:
+            self._done.set()
+
+    def _requeue_expired(self, now):
+        for unit in self.units.values():
+            if unit["leased_until"] is not None and unit["leased_until"] < now:
+                logger.warning(f"Prazo expirado para {unit['unit_id']} ({unit['worker']}); a repetir.")
+                self._retry(unit, "prazo expirado")
+
+    def _retry(self, unit, error):
+        unit["leased_until"] = None
+        if unit["attempts"] >= self.max_attempts:
+            self.failed[unit["unit_id"]] = error
+            self._check_done()
+        else:
+            self.pending.append(unit["unit_id"])
+
+    def _check_done(self):
+        if len(self.results) + len(self.failed) >= len(self.units):
+            self._done.set()
+
+    def lease(self, worker):
+        """Cede a próxima unidade pendente ao trabalhador (ou None)."""
+        with self._lock:
+            now = time.monotonic()
+            self._requeue_expired(now)
+            while self.pending:
+                unit = self.units[self.pending.popleft()]
+                if unit["unit_id"] in self.results or unit["unit_id"] in self.failed:
+                    continue
+                unit["attempts"] += 1
+                unit["leased_until"] = now + self.lease_seconds
+                unit["worker"] = worker
+                return {key: unit[key] for key in ("unit_id", "name", "replication", "config", "seed", "engine")}
+            return None
+
+    def complete(self, unit_id, summary):
+        """Regista o resumo de uma unidade; resultados repetidos são ignorados."""
+        with self._lock:
+            unit = self.units.get(unit_id)
+            if unit is None or unit_id in self.results:
+                return False
+            unit["leased_until"] = None
+            self.failed.pop(unit_id, None)
+            self.results[unit_id] = summary
+            self._check_done()
+            return True
+
+    def fail(self, unit_id, error):
+        with self._lock:
+            unit = self.units.get(unit_id)
+            if unit is None or unit_id in self.results:
+                return
+            logger.warning(f"Unidade {unit_id} falhou em {unit['worker']}: {error}")
+            self._retry(unit, error)
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def status(self):
+        with self._lock:
+            leased = sum(1 for unit in self.units.values() if unit["leased_until"] is not None)
+            return {
+                "units": len(self.units),
+                "pending": len(self.pending),
+                "leased": leased,
+                "completed": len(self.results),
+                "failed": len(self.failed),
+                "done": self.done
+            }
+
+    def rows(self):
+        """Resumos recebidos (um por nome e replicação), ordenados por configuração e replicação."""
+        with self._lock:
+            rows = [
+                dict(summary, Config=name, Replicação=replication)
+                for unit_id, summary in self.results.items()
+                for name, replication in self.units[unit_id]["targets"]
+            ]
+        return sorted(rows, key=lambda row: (row["Config"], row["Replicação"]))
+
+    def serve(self, host="0.0.0.0", port=8765, poll_interval=0.5):
+        """Serve as unidades por HTTP até todas terminarem; devolve os resumos."""
+        server = self.make_server(host, port)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        logger.info(f"Coordenador à escuta em http://{host}:{server.server_address[1]}")
+        try:
+            while not self._done.wait(poll_interval):
+                with self._lock:
+                    self._requeue_expired(time.monotonic())
+        finally:
+            # Dar tempo aos trabalhadores para receberem a indicação de fim
+            time.sleep(poll_interval)
+            server.shutdown()
+            server.server_close()
+        return self.rows()
+
+    def make_server(self, host, port):
+        coordinator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, code, payload=None):
+                body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def do_GET(self):
+                if self.path.startswith("/lease"):
+                    worker = self.headers.get("X-Worker", self.client_address[0])
+                    unit = coordinator.lease(worker)
+                    if unit is not None:
+                        self._reply(200, unit)
+                    elif coordinator.done:
+                        self._reply(410, {"done": True})
+                    else:
+                        self._reply(204)
+                elif self.path.startswith("/status"):
+                    self._reply(200, coordinator.status())
+                else:
+                    self._reply(404, {"error": "rota desconhecida"})
+
+            def do_POST(self):
+                data = self._body()
+                if self.path.startswith("/result"):
+                    accepted = coordinator.complete(data["unit_id"], data["summary"])
+                    self._reply(200, {"accepted": accepted})
+                elif self.path.startswith("/fail"):
+                    coordinator.fail(data["unit_id"], data.get("error", ""))
+                    self._reply(200, {"accepted": True})
+                else:
+                    self._reply(404, {"error": "rota desconhecida"})
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return ThreadingHTTPServer((host, port), Handler)
+
+
+def _request(url, data=None, worker=None, timeout=30):
+    body = json.dumps(data).encode("utf-8") if data is not None else None
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json", "X-Worker": worker or ""})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        payload = response.read()
+        return response.status, json.loads(payload) if payload else None
+
+
+def run_unit(unit):
+    """Executa uma unidade e devolve o resumo compacto enviado ao coordenador."""
+    start = time.perf_counter()
+    session = run_replication(unit["config"], unit["seed"], unit.get("engine", "simpy"))
+    summary = summarize(unit["name"], unit["replication"], unit["seed"], session)
+    summary["config_hash"] = unit["unit_id"].split(":")[0]
+    summary["Duração (s)"] = time.perf_counter() - start
+    return summary
+
+
+def run_worker(url, worker=None, poll_interval=1.0, max_idle=60.0):
+    """Pede unidades ao coordenador em `url` até este indicar que terminou.
+
+    Devolve o número de unidades executadas. O trabalhador desiste se o
+    coordenador ficar `max_idle` segundos sem responder (None = nunca).
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    url = url.rstrip("/")
+    completed = 0
+    idle_since = time.monotonic()
+    while True:
+        try:
+            status, unit = _request(f"{url}/lease", worker=worker)
+        except urllib.error.HTTPError as e:
+            if e.code == 410:
+                return completed
+            raise
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            if max_idle is not None and time.monotonic() - idle_since > max_idle:
+                return completed
+            time.sleep(poll_interval)
+            continue
+        idle_since = time.monotonic()
+        if status == 204 or unit is None:
+            time.sleep(poll_interval)
+            continue
+        try:
+            summary = run_unit(unit)
+        except Exception as e:
+            logger.error(f"Erro ao executar {unit['unit_id']}: {e}")
+            report = ("fail", {"unit_id": unit["unit_id"], "error": str(e)})
+        else:
+            report = ("result", {"unit_id": unit["unit_id"], "summary": summary})
+            completed += 1
+        try:
+            _request(f"{url}/{report[0]}", report[1], worker)
+        except (urllib.error.URLError, ConnectionError, socket.timeout) as e:
+            # O coordenador volta a ceder a unidade quando o prazo expirar
+            logger.warning(f"Não foi possível enviar {unit['unit_id']} ao coordenador: {e}")
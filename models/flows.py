@@ -0,0 +1,22 @@
+# flows.py: Agregação dos fluxos de pacientes entre setores
+import numpy as np
+
+
+def flow_matrix(results, sectors):
+    """Conta as transições origem -> destino entre setores.
+
+    Devolve a matriz de fluxos (setores x setores) e o total de transições
+    válidas; passagens para "Saída" ou para setores desconhecidos são ignoradas.
+    """
+    sector_index = {sector: idx for idx, sector in enumerate(sectors)}
+    flows = np.zeros((len(sectors), len(sectors)))
+    valid_transitions = 0
+    for r in results:
+        path = r.get("sectors_visited", [])
+        for source, target in zip(path, path[1:]):
+            source_idx = sector_index.get(source)
+            target_idx = sector_index.get(target)
+            if source_idx is not None and target_idx is not None:
+                flows[source_idx, target_idx] += 1
+                valid_transitions += 1
+    return flows, valid_transitions
@@ -1,121 +1,291 @@
 import simpy
 import numpy as np
 import logging
+from contextlib import nullcontext
+from models.sampling import (
+    SparseTransitions, AliasTable, SampledRouting, uniform_block, exponential_block, EXIT, END
+)
+from models.compiled_config import compile_config
+from models.trace import PatientTrace, TraceRouting
+from models.schedule import ShiftSchedule, ScheduledRouting, busy_minutes
+from models.markov_model import MarkovHospitalModel
+from models.event_kernel import HeapEventKernel
+from models.resources import HeapPriorityResource
 
 # Configurar logging para depuração
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+ENGINES = ("simpy", "heap")
+
 class HospitalSimulator:
-    def __init__(self, config, transition_probs):
-        """Inicializa a simulação com configurações e probabilidades."""
+    def __init__(self, config, transition_probs=None, seed=None, engine="simpy", trace=None):
+        """Inicializa a simulação com configurações e probabilidades.
+
+        `config` pode ser um dicionário ou uma CompiledConfig
+        (models.compiled_config); os dicionários são compilados aqui, uma vez.
+        `transition_probs` pode ser uma matriz densa ou esparsa (SparseTransitions
+        ou dicionário CSR com indptr/indices/data). Sem `seed`, a semente é tirada
+        de `np.random`, para que `np.random.seed` continue a tornar a execução
+        reprodutível. `engine="heap"` usa o núcleo de eventos próprio
+        (models.event_kernel), estatisticamente equivalente e muito mais rápido.
+
+        Com `trace` (PatientTrace, dicionário de sessão ou caminho .json/.npz) a
+        simulação reproduz os percursos e tempos de atendimento gravados e só a
+        contenção por médicos e setores é recalculada com a nova configuração;
+        `transition_probs` e `exit_probs` não são usados.
+
+        Com `config["schedule"]` (ver models.schedule.ShiftSchedule) os turnos
+        correm numa única execução contínua: as chegadas distribuem-se pelos
+        turnos, as capacidades e a matriz mudam em cada turno e as filas passam
+        de um turno para o seguinte. As métricas por turno ficam em
+        `stats["shifts"]`.
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Motor desconhecido: {engine}. Use um de {ENGINES}.")
+        config = compile_config(config)
         self.config = config
-        # Usar transition_probs normalizadas do config, se disponíveis
-        self.transition_probs = np.array(config.get("transition_probs", transition_probs), dtype=float)
-        self.env = simpy.Environment()
+        self.engine = engine
         self.results = []
-        self.medicos = simpy.PriorityResource(self.env, capacity=config["medicos_disponiveis"])
-        self.sector_queues = {sector: simpy.PriorityResource(self.env, capacity=1) for sector in config["sectors"]}
+        self.env = simpy.Environment()
+        self.medicos = HeapPriorityResource(self.env, capacity=config.medicos)
+        self.sector_queues = {sector: HeapPriorityResource(self.env, capacity=1) for sector in config.sectors}
+        # Recurso de cada setor pelo código (o setor dos médicos usa o pool de médicos)
+        self.resources = [
+            self.medicos if code == config.doctor_sector else self.sector_queues[sector]
+            for code, sector in enumerate(config.sectors)
+        ]
         self.stats = {
-            "avg_time_per_sector": {sector: 0.0 for sector in config["sectors"]},
-            "sector_visits": {sector: 0 for sector in config["sectors"]},
+            "avg_time_per_sector": {sector: 0.0 for sector in config.sectors},
+            "sector_visits": {sector: 0 for sector in config.sectors},
             "doctor_usage": [],
             "doctor_occupation": 0.0
         }
+        self._sector_time = [0.0] * config.num_sectors
+        self._sector_visits = [0] * config.num_sectors
+        self.schedule = ShiftSchedule.from_config(config) if config.get("schedule") else None
+        if self.schedule is not None:
+            if engine != "simpy" or trace is not None:
+                raise ValueError("Escalas por turno só são suportadas pelo motor simpy e sem traço.")
+            self._init_schedule(seed)
+            return
+        if trace is not None:
+            self.routing = TraceRouting(self._load_trace(trace), config.sectors)
+            return
+
+        # Usar transition_probs normalizadas (e a tabela de alias) do config, se disponíveis
+        if config.router is not None:
+            self.transition_probs = config.transition_probs
+            self.router = config.router
+        else:
+            self.transition_probs = SparseTransitions.from_any(transition_probs)
+            self.router = AliasTable(self.transition_probs)
+        for row in self.router.uniform_rows:
+            logger.warning(f"Probabilidades inválidas para setor {row}: soma zero. Usando uniforme.")
+        self.exit_probs = config.exit_probs.tolist()
+        rng = np.random.default_rng(seed if seed is not None else np.random.randint(0, 2**31))
+        self.uniforms = uniform_block(rng)
+        self.exponentials = exponential_block(rng)
+        self.routing = SampledRouting(
+            self.router, self.exit_probs, self.service_means()[0], self.patient_priority(),
+            self.uniforms, self.exponentials, config.num_patients
+        )
+
+    def _init_schedule(self, seed):
+        """Capacidades do primeiro turno, matrizes de cada turno e instantes de chegada.
+
+        As matrizes vêm de `config["schedule"]["transition_probs"]` /
+        `["exit_probs"]` ({turno: valores}) ou são calculadas num único lote
+        pelo modelo de Markov (uma por turno, com a gravidade da configuração),
+        com o ruído tirado da semente da simulação.
+        """
+        config = self.config
+        schedule = self.schedule
+        self.medicos.set_capacity(schedule.medicos[schedule.turno_of(0)])
+        for sector, resource in self.sector_queues.items():
+            resource.set_capacity(schedule.capacity(sector, 0))
 
-    def patient_process(self, patient_id, start_sector):
+        seed = seed if seed is not None else np.random.randint(0, 2**31)
+        schedule_config = config["schedule"]
+        if "transition_probs" in schedule_config:
+            transitions = [schedule_config["transition_probs"][turno] for turno in schedule.turnos]
+            exits = [schedule_config["exit_probs"][turno] for turno in schedule.turnos]
+        else:
+            # Ruído das matrizes com uma sequência própria derivada da semente,
+            # independente da dos sorteios da simulação
+            transitions, exits = MarkovHospitalModel(config).compute_transitions_batch(
+                [(turno, config.gravidade) for turno in schedule.turnos], seed=(int(seed), 1)
+            )
+        routers = [AliasTable(SparseTransitions.from_any(t)) for t in transitions]
+        exit_probs = [[float(p) for p in e] for e in exits]
+        self.router = routers[0]
+        self.exit_probs = exit_probs[0]
+        rng = np.random.default_rng(seed)
+        self.uniforms = uniform_block(rng)
+        self.exponentials = exponential_block(rng)
+        self.routing = ScheduledRouting(
+            routers, exit_probs, self.service_means()[0], self.patient_priority(),
+            self.uniforms, self.exponentials, schedule.arrivals(rng).tolist(), schedule,
+            lambda: self.env.now
+        )
+
+    def _load_trace(self, trace):
+        """Converte sessão (dicionário ou ficheiro) em PatientTrace."""
+        if isinstance(trace, PatientTrace):
+            return trace
+        means, _ = self.service_means()
+        service_means = dict(zip(self.config.sectors, means))
+        if isinstance(trace, dict) and "results" in trace:
+            return PatientTrace.from_session(trace, service_means)
+        if isinstance(trace, dict):
+            return PatientTrace.from_columnar(trace)
+        return PatientTrace.load(trace, service_means)
+
+    def service_means(self):
+        """Tempo médio de atendimento por setor e índice do setor atendido pelos médicos."""
+        return self.config.service_means.tolist(), self.config.doctor_sector
+
+    def patient_priority(self):
+        """Prioridade dos pacientes na fila (-1 = alta, atendida primeiro)."""
+        return self.config.priority
+
+    def queue_stats(self):
+        """Contadores de fila e espera dos médicos e de cada setor (motor SimPy)."""
+        queues = {"Médicos": self.medicos.counters()}
+        queues.update({sector: resource.counters() for sector, resource in self.sector_queues.items()})
+        return queues
+
+    def patient_process(self, patient):
         """Processo de atendimento para um paciente."""
-        current_sector = start_sector
+        routing = self.routing
+        patient_id = routing.patient_id(patient)
+        arrival_time = self.env.now
+        current_sector = routing.start_sector(patient)
         total_waiting_time = 0
         sectors_visited = []
-        gravidade_factor = {"baixa": 1.2, "média": 1.0, "alta": 0.8}.get(self.config["gravidade"], 1.0)
-        priority = -1 if self.config["prioridade_ativa"] and self.config["gravidade"] == "alta" else 0
+        service_times = []
+        priority = routing.priority(patient)
+        sectors = self.config.sectors
+        doctor_sector = self.config.doctor_sector
+        resources = self.resources
+        sector_visits = self._sector_visits
+        sector_time = self._sector_time
+        doctor_usage = self.stats["doctor_usage"]
         max_steps = 100
-        
+
         step = 0
         while step < max_steps:
-            sectors_visited.append(self.config["sectors"][current_sector])
-            self.stats["sector_visits"][self.config["sectors"][current_sector]] += 1
-            
+            sector = sectors[current_sector]
+            sectors_visited.append(sector)
+            sector_visits[current_sector] += 1
+
             try:
-                if self.config["sectors"][current_sector] == "Consulta":
-                    with self.medicos.request(priority=priority) as req:
-                        yield req
-                        self.stats["doctor_usage"].append((self.env.now, 1))
-                        waiting_time = np.random.exponential(15.0 * gravidade_factor)
-                        yield self.env.timeout(waiting_time)
-                        self.stats["doctor_usage"].append((self.env.now, -1))
-                else:
-                    with self.sector_queues[self.config["sectors"][current_sector]].request(priority=priority) as req:
-                        yield req
-                        waiting_time = np.random.exponential(10.0 * gravidade_factor)
-                        yield self.env.timeout(waiting_time)
+                with resources[current_sector].request(priority=priority) as req:
+                    yield req
+                    if current_sector == doctor_sector:
+                        doctor_usage.append((self.env.now, 1))
+                    waiting_time = routing.service_time(patient, current_sector)
+                    yield self.env.timeout(waiting_time)
+                    if current_sector == doctor_sector:
+                        doctor_usage.append((self.env.now, -1))
             except Exception as e:
-                logger.error(f"Erro no atendimento do paciente {patient_id} no setor {self.config['sectors'][current_sector]}: {e}")
+                logger.error(f"Erro no atendimento do paciente {patient_id} no setor {sector}: {e}")
                 break
-            
+
             total_waiting_time += waiting_time
-            self.stats["avg_time_per_sector"][self.config["sectors"][current_sector]] += waiting_time
-            
-            exit_prob = self.config["exit_probs"][current_sector]
-            logger.debug(f"Paciente {patient_id}, Setor {self.config['sectors'][current_sector]}, Exit Prob: {exit_prob}")
-            if np.random.random() < exit_prob:
+            service_times.append(waiting_time)
+            sector_time[current_sector] += waiting_time
+
+            current_sector = routing.next_sector(patient, current_sector)
+            if current_sector == EXIT:
                 sectors_visited.append("Saída")
                 break
-            
-            trans_probs = self.transition_probs[current_sector]
-            prob_sum = sum(trans_probs)
-            if not (0.999 <= prob_sum <= 1.001):
-                logger.warning(f"Probabilidades inválidas para setor {current_sector}: {trans_probs}, soma: {prob_sum}. Usando uniforme.")
-                trans_probs = np.ones(len(self.config["sectors"])) / len(self.config["sectors"])
-            
-            try:
-                logger.debug(f"Probabilidades para setor {current_sector}: {trans_probs}")
-                current_sector = np.random.choice(
-                    len(self.config["sectors"]),
-                    p=trans_probs / sum(trans_probs)
-                )
-            except ValueError as e:
-                logger.error(f"Erro ao escolher próximo setor para paciente {patient_id}: {e}")
+            if current_sector == END:
                 break
-            
             step += 1
-        
+
         if step >= max_steps:
             logger.warning(f"Paciente {patient_id} atingiu o limite de passos ({max_steps})")
-        
-        self.results.append({
+
+        result = {
             "patient_id": patient_id,
             "total_waiting_time": total_waiting_time,
             "sectors_visited": sectors_visited,
-            "priority": "Alta" if priority == -1 else "Normal"
-        })
-
-    def run_simulation(self):
-        """Executa a simulação completa."""
-        for i in range(self.config["num_patients"]):
-            self.env.process(self.patient_process(i, start_sector=0))
-        
-        try:
-            self.env.run()
-        except Exception as e:
-            logger.error(f"Erro durante a simulação: {e}")
-            raise
-        
-        for sector in self.stats["avg_time_per_sector"]:
-            visits = self.stats["sector_visits"][sector]
-            self.stats["avg_time_per_sector"][sector] = (
-                self.stats["avg_time_per_sector"][sector] / visits if visits > 0 else 0.0
-            )
-        
-        total_time = self.env.now
-        if total_time > 0:
-            occupied_time = sum(
-                (end - start) for start, end in zip(
-                    [t for t, _ in self.stats["doctor_usage"][::2]],
-                    [t for t, _ in self.stats["doctor_usage"][1::2]]
+            "service_times": service_times,
+            "priority": "Alta" if priority == -1 else "Normal",
+            "arrival_time": arrival_time,
+            "departure_time": self.env.now
+        }
+        if self.schedule is not None:
+            result["turno"] = self.schedule.turno_of(self.schedule.shift_at(arrival_time))
+        self.results.append(result)
+
+    def scheduled_patient(self, patient):
+        """Paciente que chega no instante sorteado pela escala."""
+        yield self.env.timeout(self.routing.arrival_times[patient])
+        yield from self.patient_process(patient)
+
+    def shift_changes(self):
+        """Aplica as capacidades de cada turno enquanto houver pacientes por atender."""
+        schedule = self.schedule
+        shift = 0
+        while len(self.results) < self.routing.num_patients:
+            yield self.env.timeout(schedule.shift_minutes)
+            shift += 1
+            self.medicos.set_capacity(schedule.medicos[schedule.turno_of(shift)])
+            for sector, resource in self.sector_queues.items():
+                resource.set_capacity(schedule.capacity(sector, shift))
+
+    def run_simulation(self, profiler=None, profile_engine=False):
+        """Executa a simulação completa.
+
+        Com `profiler` (models.profiler.PhaseProfiler) o motor e a agregação
+        das estatísticas são medidos como fases separadas; `profile_engine`
+        liga o cProfile no motor.
+        """
+        def phase(name, profile=False):
+            return profiler.phase(name, profile) if profiler is not None else nullcontext()
+
+        with phase("Simulação (motor)", profile_engine):
+            if self.engine == "heap":
+                total_time = HeapEventKernel(self).run()
+            else:
+                for patient in range(self.routing.num_patients):
+                    if self.schedule is not None:
+                        self.env.process(self.scheduled_patient(patient))
+                    else:
+                        self.env.process(self.patient_process(patient))
+                if self.schedule is not None:
+                    self.env.process(self.shift_changes())
+
+                try:
+                    self.env.run()
+                except Exception as e:
+                    logger.error(f"Erro durante a simulação: {e}")
+                    raise
+                total_time = self.env.now
+                for code, sector in enumerate(self.config.sectors):
+                    self.stats["avg_time_per_sector"][sector] += self._sector_time[code]
+                    self.stats["sector_visits"][sector] += self._sector_visits[code]
+                if self.schedule is not None:
+                    # O processo da escala acorda na mudança de turno seguinte ao último paciente
+                    total_time = max((r["departure_time"] for r in self.results), default=0.0)
+
+        with phase("Agregação de estatísticas"):
+            for sector in self.stats["avg_time_per_sector"]:
+                visits = self.stats["sector_visits"][sector]
+                self.stats["avg_time_per_sector"][sector] = (
+                    self.stats["avg_time_per_sector"][sector] / visits if visits > 0 else 0.0
                 )
-            )
-            self.stats["doctor_occupation"] = occupied_time / total_time
-        
-        return self.results, self.stats
\ No newline at end of file
+
+            if total_time > 0:
+                # Tempo-médico ocupado sobre o disponível (com escala, a capacidade muda por turno)
+                capacity = (
+                    self.schedule.doctor_minutes(total_time) if self.schedule is not None
+                    else self.config.medicos * total_time
+                )
+                self.stats["doctor_occupation"] = float(busy_minutes(self.stats["doctor_usage"], 0.0, total_time)) / capacity
+            if self.schedule is not None:
+                self.stats["shifts"] = self.schedule.shift_metrics(self.results, self.stats["doctor_usage"])
+
+        return self.results, self.stats
@@ -0,0 +1,183 @@
+# jit_kernel.py: Amostragem de percursos e tempos em lote (Numba opcional, NumPy como alternativa)
+import logging
+from collections import namedtuple
+
+import numpy as np
+
+from models.compiled_config import compile_config
+from models.markov_model import MarkovHospitalModel
+from models.trace import PatientTrace
+
+try:
+    import numba
+except ImportError:  # Sem compilador: usa-se a versão NumPy
+    numba = None
+
+logger = logging.getLogger(__name__)
+
+HAS_NUMBA = numba is not None
+BACKENDS = ("auto", "numba", "numpy", "python")
+# Pacientes por bloco de sorteios (limita a memória das matrizes pacientes x passos)
+CHUNK_SIZE = 4096
+MAX_STEPS = 100
+
+SampledPaths = namedtuple("SampledPaths", ["trace", "totals", "sector_time", "sector_visits"])
+
+
+def sample_chunk_loop(exponentials, exit_draws, route_draws, means, exit_probs, starts, cutoffs,
+                      targets, aliases, start_sector, sectors_out, times_out, lengths, exited,
+                      totals, sector_time, sector_visits):
+    """Percorre os pacientes do bloco um a um (compilada pelo Numba quando existe).
+
+    Cada linha das matrizes de sorteios pertence a um paciente e cada coluna a
+    um passo: tempo = exponencial x média do setor; sai se o uniforme de saída
+    for menor que a probabilidade do setor; senão o próximo setor vem da tabela
+    de alias (mesma regra de `AliasTable.sample`). Os acumuladores por setor
+    somam paciente a paciente, pela ordem das visitas.
+    """
+    num_patients, max_steps = exponentials.shape
+    for p in range(num_patients):
+        current = start_sector
+        total = 0.0
+        count = 0
+        left = False
+        for step in range(max_steps):
+            duration = exponentials[p, step] * means[current]
+            sectors_out[p, step] = current
+            times_out[p, step] = duration
+            total += duration
+            sector_time[current] += duration
+            sector_visits[current] += 1
+            count += 1
+            if exit_draws[p, step] < exit_probs[current]:
+                left = True
+                break
+            start = starts[current]
+            k = starts[current + 1] - start
+            x = route_draws[p, step] * k
+            j = int(x)
+            if j == k:
+                j -= 1
+            if x - j < cutoffs[start + j]:
+                current = targets[start + j]
+            else:
+                current = aliases[start + j]
+        lengths[p] = count
+        exited[p] = left
+        totals[p] = total
+
+
+_compiled_loop = numba.njit(cache=True, nogil=True)(sample_chunk_loop) if HAS_NUMBA else None
+
+
+def sample_chunk_numpy(exponentials, exit_draws, route_draws, means, exit_probs, starts, cutoffs,
+                       targets, aliases, start_sector, sectors_out, times_out, lengths, exited,
+                       totals, sector_time, sector_visits):
+    """Mesmo cálculo que `sample_chunk_loop`, vetorizado por passo sobre os pacientes ativos.
+
+    Os totais somam passo a passo e os acumuladores por setor usam
+    `np.add.at` pela ordem paciente a paciente, para que os arredondamentos
+    sejam os mesmos da versão em ciclo (resultados idênticos bit a bit).
+    """
+    num_patients, max_steps = exponentials.shape
+    active = np.arange(num_patients)
+    current = np.full(num_patients, start_sector, dtype=np.int64)
+    for step in range(max_steps):
+        if not len(active):
+            break
+        sector = current[active]
+        duration = exponentials[active, step] * means[sector]
+        sectors_out[active, step] = sector
+        times_out[active, step] = duration
+        totals[active] += duration
+        lengths[active] += 1
+        leave = exit_draws[active, step] < exit_probs[sector]
+        exited[active[leave]] = True
+        active, sector = active[~leave], sector[~leave]
+        start = starts[sector]
+        k = starts[sector + 1] - start
+        x = route_draws[active, step] * k
+        j = x.astype(np.int64)
+        j = np.where(j == k, j - 1, j)
+        slot = start + j
+        current[active] = np.where(x - j < cutoffs[slot], targets[slot], aliases[slot])
+
+    valid = np.arange(max_steps)[None, :] < lengths[:, None]
+    visited = sectors_out[valid]
+    np.add.at(sector_time, visited, times_out[valid])
+    sector_visits += np.bincount(visited, minlength=len(sector_visits))
+
+
+class PathSampler:
+    def __init__(self, config, backend="auto", chunk_size=CHUNK_SIZE, max_steps=MAX_STEPS):
+        """Amostra os percursos sem contenção (setores, tempos e acumulados por setor).
+
+        `backend`: "numba" (exige o Numba), "numpy", "python" (o ciclo de
+        referência sem compilar) ou "auto" (Numba quando instalado). Os
+        sorteios são gerados antes, por blocos de `chunk_size` pacientes, e
+        passados ao núcleo; com a mesma semente, todos os núcleos produzem
+        resultados idênticos. Sem `config["transition_probs"]` a matriz é
+        calculada pelo modelo de Markov.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Núcleo desconhecido: {backend}. Use um de {BACKENDS}.")
+        if backend == "numba" and not HAS_NUMBA:
+            raise ValueError("O Numba não está instalado; use backend='numpy'.")
+        if backend == "auto":
+            backend = "numba" if HAS_NUMBA else "numpy"
+        self.backend = backend
+        self.kernel = {"numba": _compiled_loop, "numpy": sample_chunk_numpy, "python": sample_chunk_loop}[backend]
+        self.chunk_size = chunk_size
+        self.max_steps = max_steps
+
+        config = compile_config(config)
+        if config.router is None:
+            markov_model = MarkovHospitalModel(config)
+            config = config.with_transitions(markov_model.compute_transitions(), markov_model.normalized_exit_probs)
+        self.config = config
+        router = config.router
+        self.means = np.array(config.service_means, dtype=float)
+        self.exit_probs = np.array(config.exit_probs, dtype=float)
+        self.starts = np.array(router.starts, dtype=np.int64)
+        self.cutoffs = np.array(router.cutoffs, dtype=float)
+        self.targets = np.array(router.targets, dtype=np.int64)
+        self.aliases = np.array(router.aliases, dtype=np.int64)
+
+    def sample(self, num_patients=None, seed=None):
+        """Amostra `num_patients` percursos (os da configuração por omissão)."""
+        config = self.config
+        num_patients = config.num_patients if num_patients is None else num_patients
+        rng = np.random.default_rng(seed)
+        num_sectors = config.num_sectors
+        sector_time = np.zeros(num_sectors)
+        sector_visits = np.zeros(num_sectors, dtype=np.int64)
+        lengths = np.zeros(num_patients, dtype=np.int64)
+        exited = np.zeros(num_patients, dtype=bool)
+        totals = np.zeros(num_patients)
+        sectors, times = [], []
+        for first in range(0, num_patients, self.chunk_size):
+            size = min(self.chunk_size, num_patients - first)
+            shape = (size, self.max_steps)
+            exponentials = rng.standard_exponential(shape)
+            exit_draws = rng.random(shape)
+            route_draws = rng.random(shape)
+            sectors_out = np.zeros(shape, dtype=np.int64)
+            times_out = np.zeros(shape)
+            chunk = slice(first, first + size)
+            self.kernel(
+                exponentials, exit_draws, route_draws, self.means, self.exit_probs, self.starts,
+                self.cutoffs, self.targets, self.aliases, 0, sectors_out, times_out,
+                lengths[chunk], exited[chunk], totals[chunk], sector_time, sector_visits
+            )
+            valid = np.arange(self.max_steps)[None, :] < lengths[chunk, None]
+            sectors.append(sectors_out[valid])
+            times.append(times_out[valid])
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        trace = PatientTrace(
+            np.arange(num_patients), np.full(num_patients, config.priority), offsets,
+            np.concatenate(sectors) if sectors else np.zeros(0, dtype=np.int64),
+            np.concatenate(times) if times else np.zeros(0),
+            exited, config.sectors
+        )
+        logger.info(f"{num_patients} percursos amostrados com o núcleo {self.backend}")
+        return SampledPaths(trace, totals, sector_time, sector_visits)
@@ -0,0 +1,279 @@
+# markov_analytics.py: Análise analítica da cadeia de Markov absorvente (Saída)
+import numpy as np
+
+from models.compiled_config import CONSULTA_MEAN_TIME, SECTOR_MEAN_TIME
+from models.markov_model import normalize_transitions
+
+
+def routing_matrix(transition_probs, exit_probs):
+    """Matriz Q entre setores transitórios, como a simulação a percorre.
+
+    Após cada atendimento o paciente sai com probabilidade `exit_probs[i]`;
+    caso contrário segue a linha `i` renormalizada. Aceita lotes (..., S, S).
+    """
+    transition_probs = np.asarray(transition_probs, dtype=float)
+    exit_probs = np.asarray(exit_probs, dtype=float)
+    num_sectors = transition_probs.shape[-1]
+    row_sums = transition_probs.sum(axis=-1, keepdims=True)
+    routing = np.where(
+        row_sums > 0,
+        transition_probs / np.where(row_sums > 0, row_sums, 1.0),
+        1.0 / num_sectors
+    )
+    return routing * (1.0 - exit_probs)[..., :, None]
+
+
+def fundamental_matrix(routing):
+    """N = (I - Q)^-1: visitas esperadas a cada setor a partir de cada origem."""
+    identity = np.eye(routing.shape[-1])
+    return np.linalg.inv(identity - routing)
+
+
+def expected_visits(routing, start_sector=0):
+    """Número esperado de visitas a cada setor para um paciente que entra em `start_sector`."""
+    routing = np.asarray(routing, dtype=float)
+    num_sectors = routing.shape[-1]
+    identity = np.eye(num_sectors)
+    start = np.zeros(routing.shape[:-1])
+    start[..., start_sector] = 1.0
+    # v^T (I - Q) = e_start^T  <=>  (I - Q)^T v = e_start
+    system = np.swapaxes(identity - routing, -1, -2)
+    return np.linalg.solve(system, start[..., None])[..., 0]
+
+
+def service_means(sectors, gravidade_factor=1.0):
+    """Tempo médio de atendimento de cada setor (Consulta usa os médicos)."""
+    means = np.array([CONSULTA_MEAN_TIME if s == "Consulta" else SECTOR_MEAN_TIME for s in sectors])
+    return means * np.asarray(gravidade_factor, dtype=float)[..., None]
+
+
+def expected_total_time(visits, means):
+    """Tempo total esperado de atendimento por paciente (`total_waiting_time`)."""
+    return (np.asarray(visits) * np.asarray(means)).sum(axis=-1)
+
+
+def generator_matrix(transition_probs, exit_probs, means):
+    """Gerador da cadeia em tempo contínuo de um paciente (sem filas).
+
+    No setor i o atendimento termina à taxa 1/means[i]; o paciente sai com
+    `exit_probs[i]` ou segue a linha renormalizada, como em `routing_matrix`.
+    O último estado (índice S) é a Saída, absorvente.
+    """
+    routing = routing_matrix(transition_probs, exit_probs)
+    rates = 1.0 / np.asarray(means, dtype=float)
+    num_sectors = routing.shape[-1]
+    generator = np.zeros((num_sectors + 1, num_sectors + 1))
+    generator[:num_sectors, :num_sectors] = rates[:, None] * routing
+    generator[:num_sectors, num_sectors] = rates * np.asarray(exit_probs, dtype=float)
+    generator[np.arange(num_sectors), np.arange(num_sectors)] -= rates
+    return generator
+
+
+def transient_occupancy(transition_probs, exit_probs, means, times, num_patients=1, start_sector=0, tol=1e-10):
+    """Número esperado de pacientes em cada setor nos instantes `times` (forma (T, S)).
+
+    Modelo de servidores infinitos: todos os pacientes entram em
+    `start_sector` no instante 0 e não esperam em fila, pelo que a ocupação é
+    `num_patients * p(t)`, com p(t) = p(0) exp(Gt). A exponencial é calculada
+    por uniformização: com Λ = maior taxa de saída e P = I + G/Λ,
+    p(t) = Σ_k Poisson(k; Λt) p(0) P^k. Os vetores p(0) P^k são calculados uma
+    vez e combinados com os pesos de Poisson de toda a grelha numa única
+    multiplicação; a série é cortada quando a cauda de Poisson fica abaixo de
+    `tol`.
+    """
+    generator = generator_matrix(transition_probs, exit_probs, means)
+    times = np.asarray(times, dtype=float)
+    num_sectors = generator.shape[0] - 1
+    uniform_rate = float(np.max(-np.diag(generator)))
+    if uniform_rate <= 0 or not len(times):
+        occupancy = np.zeros((len(times), num_sectors))
+        occupancy[:, start_sector] = num_patients
+        return occupancy
+    step = np.eye(num_sectors + 1) + generator / uniform_rate
+
+    # Termos necessários: média + folga de desvios-padrão da Poisson no maior instante
+    mean_jumps = uniform_rate * times.max()
+    terms = int(np.ceil(mean_jumps + 10.0 * np.sqrt(mean_jumps) - np.log(tol) + 10))
+    state = np.zeros(num_sectors + 1)
+    state[start_sector] = 1.0
+    powers = np.empty((terms + 1, num_sectors + 1))
+    for k in range(terms + 1):
+        powers[k] = state
+        state = state @ step
+
+    # Pesos de Poisson em escala logarítmica (estáveis para Λt grande)
+    k = np.arange(terms + 1)
+    log_factorial = np.concatenate([[0.0], np.cumsum(np.log(k[1:]))])
+    rate_times = uniform_rate * times[:, None]
+    log_rate_times = np.log(np.where(rate_times > 0, rate_times, 1.0))
+    log_weights = k[None, :] * log_rate_times - rate_times - log_factorial[None, :]
+    log_weights[times == 0] = np.where(k == 0, 0.0, -np.inf)
+    weights = np.exp(log_weights)
+    return num_patients * (weights @ powers)[:, :num_sectors]
+
+
+def simulated_occupancy(results, sectors, times):
+    """Pacientes em cada setor nos instantes `times`, reconstruídos dos resultados.
+
+    Os resultados guardam os tempos de atendimento (`service_times`) mas não as
+    esperas em fila, por isso as visitas são encadeadas sem espera a partir da
+    chegada (`arrival_time`, ou 0): é a mesma grandeza que
+    `transient_occupancy` calcula.
+    """
+    codes = {sector: idx for idx, sector in enumerate(sectors)}
+    times = np.asarray(times, dtype=float)
+    starts, ends, visit_codes = [], [], []
+    for r in results:
+        durations = r.get("service_times")
+        if durations is None:
+            continue
+        visits = [s for s in r["sectors_visited"] if s != "Saída"]
+        clock = np.concatenate([[0.0], np.cumsum(durations)]) + r.get("arrival_time", 0.0)
+        starts.extend(clock[:-1])
+        ends.extend(clock[1:])
+        visit_codes.extend(codes[s] for s in visits[:len(durations)])
+    occupancy = np.zeros((len(times), len(sectors)))
+    if not visit_codes:
+        return occupancy
+    starts, ends, visit_codes = np.array(starts), np.array(ends), np.array(visit_codes)
+    for code in range(len(sectors)):
+        members = visit_codes == code
+        entered = np.searchsorted(np.sort(starts[members]), times, side="right")
+        left = np.searchsorted(np.sort(ends[members]), times, side="right")
+        occupancy[:, code] = entered - left
+    return occupancy
+
+
+
+# Atualizações por Sherman–Morrison entre duas inversões completas (limita o erro acumulado)
+REFRESH_EVERY = 64
+# Denominador abaixo do qual a atualização de posto 1 é instável e se refaz a inversão
+SINGULAR_TOLERANCE = 1e-10
+
+
+class IncrementalMarkovAnalysis:
+    def __init__(self, transition_probs, exit_probs, means=None, start_sector=0):
+        """Análise da cadeia absorvente que acompanha a edição de uma linha de cada vez.
+
+        Guarda as probabilidades tal como editadas, as linhas normalizadas, a
+        matriz Q (`routing_matrix`) e N = (I - Q)^-1. `update_row` normaliza só
+        a linha alterada e corrige N com uma atualização de posto 1
+        (Sherman–Morrison) em vez de a inverter de novo. Os agregados
+        (visitas, tempos) ficam em cache e só são descartados os que dependem
+        do que mudou.
+        """
+        self.transition_probs = np.array(transition_probs, dtype=float)
+        self.exit_probs = np.array(exit_probs, dtype=float)
+        self.num_sectors = self.transition_probs.shape[0]
+        self.start_sector = start_sector
+        self.means = None if means is None else np.array(means, dtype=float)
+        self.normalized_transitions, self.normalized_exits = normalize_transitions(self.transition_probs, self.exit_probs)
+        self.row_totals = self.transition_probs.sum(axis=1) + self.exit_probs
+        self.counters = {"row_updates": 0, "rank_one": 0, "full_solves": 0, "cache_hits": 0, "cache_misses": 0}
+        self._cache = {}
+        self._refresh()
+
+    def _refresh(self):
+        """Recalcula Q e N de raiz (uma inversão completa)."""
+        self.routing = routing_matrix(self.transition_probs, self.exit_probs)
+        self.fundamental = fundamental_matrix(self.routing)
+        self._since_refresh = 0
+        self.counters["full_solves"] += 1
+        self._cache.clear()
+
+    def update_row(self, row, transition_row, exit_prob=None):
+        """Substitui a linha `row` (e, opcionalmente, a sua saída); devolve se algo mudou.
+
+        Com Q' = Q + e_row d^T, (I - Q')^-1 = N + N[:, row] (d^T N) / (1 - d^T N[:, row]).
+        """
+        transition_row = np.asarray(transition_row, dtype=float)
+        exit_prob = self.exit_probs[row] if exit_prob is None else float(exit_prob)
+        if np.array_equal(transition_row, self.transition_probs[row]) and exit_prob == self.exit_probs[row]:
+            return False
+        self.transition_probs[row] = transition_row
+        self.exit_probs[row] = exit_prob
+        self.row_totals[row] = transition_row.sum() + exit_prob
+        normalized, normalized_exit = normalize_transitions(transition_row, np.float64(exit_prob))
+        self.normalized_transitions[row] = normalized
+        self.normalized_exits[row] = normalized_exit
+        self.counters["row_updates"] += 1
+
+        new_row = routing_matrix(transition_row[None, :], [exit_prob])[0]
+        delta = new_row - self.routing[row]
+        column = self.fundamental[:, row].copy()
+        reachable = column[self.start_sector] != 0
+        self.routing[row] = new_row
+        delta_n = delta @ self.fundamental
+        denominator = 1.0 - delta_n[row]
+        self._since_refresh += 1
+        if abs(denominator) < SINGULAR_TOLERANCE or self._since_refresh >= REFRESH_EVERY:
+            self._refresh()
+            return True
+        self.fundamental += np.outer(column, delta_n / denominator)
+        self.counters["rank_one"] += 1
+        # As visitas a partir da entrada só mudam se a linha editada for alcançável
+        self._invalidate("routing" if reachable else "absorption")
+        return True
+
+    def update(self, transition_probs, exit_probs):
+        """Aplica `update_row` às linhas que diferem; devolve os índices alterados."""
+        transition_probs = np.asarray(transition_probs, dtype=float)
+        exit_probs = np.asarray(exit_probs, dtype=float)
+        changed = np.flatnonzero(
+            np.any(transition_probs != self.transition_probs, axis=1) | (exit_probs != self.exit_probs)
+        )
+        for row in changed:
+            self.update_row(row, transition_probs[row], exit_probs[row])
+        return changed.tolist()
+
+    def set_means(self, means):
+        """Novos tempos médios: N e as visitas continuam válidos, só os tempos são descartados."""
+        means = np.asarray(means, dtype=float)
+        if self.means is not None and np.array_equal(means, self.means):
+            return False
+        self.means = means.copy()
+        self._invalidate("means")
+        return True
+
+    def _invalidate(self, change):
+        # Agregados afetados por cada tipo de alteração
+        dependents = {
+            "routing": ("visits", "sector_time", "total_time", "absorption_time"),
+            "absorption": ("absorption_time",),
+            "means": ("sector_time", "total_time", "absorption_time")
+        }[change]
+        for name in dependents:
+            self._cache.pop(name, None)
+
+    def _cached(self, name, compute):
+        if name in self._cache:
+            self.counters["cache_hits"] += 1
+        else:
+            self.counters["cache_misses"] += 1
+            self._cache[name] = compute()
+        return self._cache[name]
+
+    def visits(self):
+        """Visitas esperadas a cada setor para quem entra em `start_sector` (linha de N)."""
+        return self._cached("visits", lambda: self.fundamental[self.start_sector].copy())
+
+    def sector_time(self):
+        """Tempo esperado de atendimento em cada setor por paciente."""
+        return self._cached("sector_time", lambda: self.visits() * self._require_means())
+
+    def total_time(self):
+        """Tempo total esperado por paciente (`total_waiting_time`)."""
+        return self._cached("total_time", lambda: float(self.sector_time().sum()))
+
+    def absorption_time(self):
+        """Tempo esperado até à saída a partir de cada setor (N @ means)."""
+        return self._cached("absorption_time", lambda: self.fundamental @ self._require_means())
+
+    def _require_means(self):
+        if self.means is None:
+            raise ValueError("Defina os tempos médios com set_means antes de pedir tempos.")
+        return self.means
+
+    def invalid_rows(self, tol=0.01):
+        """Índices das linhas cujo total (transições + saída) se afasta de 1 mais de `tol`."""
+        return np.flatnonzero(np.abs(self.row_totals - 1.0) > tol).tolist()
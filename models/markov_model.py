@@ -1,10 +1,78 @@
 import numpy as np
 import logging
+from functools import lru_cache
 
 # Configurar logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Fatores de ajuste das probabilidades por turno e gravidade
+TURNO_FACTORS = {"manhã": 1.0, "tarde": 1.1, "noite": 1.3}
+GRAVIDADE_FACTORS = {"baixa": 0.9, "média": 1.0, "alta": 1.2}
+# Amplitude do ruído uniforme somado às probabilidades ajustadas
+NOISE_AMPLITUDE = 0.05
+
+def combo_factor(turno, gravidade):
+    """Fator multiplicativo de um par (turno, gravidade)."""
+    return TURNO_FACTORS.get(turno, 1.0) * GRAVIDADE_FACTORS.get(gravidade, 1.0)
+
+def normalize_transitions(transition_probs, exit_probs):
+    """Normaliza cada linha (transições + saída) para somar 1; aceita lotes (..., S, S).
+
+    Linhas com total zero passam a uma distribuição uniforme sobre os S setores
+    e a saída.
+    """
+    transition_probs = np.clip(transition_probs, 0, None)
+    exit_probs = np.clip(exit_probs, 0, None)
+    num_sectors = transition_probs.shape[-1]
+    totals = transition_probs.sum(axis=-1) + exit_probs
+    empty = totals <= 0
+    scale = 1.0 / np.where(empty, 1.0, totals)
+    transition_probs = np.where(empty[..., None], 1.0 / (num_sectors + 1), transition_probs * scale[..., None])
+    exit_probs = np.where(empty, 1.0 / (num_sectors + 1), exit_probs * scale)
+    return transition_probs, exit_probs
+
+def compute_transitions_batch(transition_base, exit_probs, combos, noise_draws=None, seed=None):
+    """Calcula as matrizes ajustadas para vários pares (turno, gravidade) de uma vez.
+
+    Devolve `(transitions, exits)` com formas (n_combos, S, S) e (n_combos, S),
+    ou (n_combos, noise_draws, S, S) e (n_combos, noise_draws, S) quando
+    `noise_draws` é indicado. Com `seed` o resultado é determinístico e fica em
+    cache por (matriz base, fatores, sorteios, semente); os arrays devolvidos
+    são então só de leitura.
+    """
+    transition_base = np.ascontiguousarray(transition_base, dtype=float)
+    exit_probs = np.ascontiguousarray(exit_probs, dtype=float)
+    factors = tuple(combo_factor(turno, gravidade) for turno, gravidade in combos)
+    if seed is None:
+        return _compute_batch(transition_base, exit_probs, factors, noise_draws, np.random)
+    return _cached_batch(
+        transition_base.tobytes(), transition_base.shape, exit_probs.tobytes(), factors, noise_draws, seed
+    )
+
+@lru_cache(maxsize=128)
+def _cached_batch(base_bytes, shape, exit_bytes, factors, noise_draws, seed):
+    transition_base = np.frombuffer(base_bytes, dtype=float).reshape(shape)
+    exit_probs = np.frombuffer(exit_bytes, dtype=float)
+    transitions, exits = _compute_batch(transition_base, exit_probs, factors, noise_draws, np.random.default_rng(seed))
+    transitions.flags.writeable = False
+    exits.flags.writeable = False
+    return transitions, exits
+
+def _compute_batch(transition_base, exit_probs, factors, noise_draws, rng):
+    draws = 1 if noise_draws is None else noise_draws
+    factors = np.asarray(factors, dtype=float)
+    transitions = transition_base * factors[..., None, None]
+    exits = exit_probs * factors[..., None]
+    transitions = np.repeat(transitions[:, None], draws, axis=1)
+    exits = np.repeat(exits[:, None], draws, axis=1)
+    transitions += rng.uniform(0, NOISE_AMPLITUDE, transitions.shape)
+    exits += rng.uniform(0, NOISE_AMPLITUDE, exits.shape)
+    transitions, exits = normalize_transitions(transitions, exits)
+    if noise_draws is None:
+        return transitions[:, 0], exits[:, 0]
+    return transitions, exits
+
 class MarkovHospitalModel:
     def __init__(self, config):
         """Inicializa o modelo com configurações."""
@@ -14,56 +82,49 @@ class MarkovHospitalModel:
         self.gravidade = config["gravidade"]
         self.transition_base = config["transition_base"]
         self.exit_probs = config["exit_probs"]
-        
+
         # Validar probabilidades iniciais
-        for i, probs in enumerate(self.transition_base):
-            total = sum(probs) + self.exit_probs[i]
-            if abs(total - 1.0) > 0.1:
-                logger.warning(f"Probabilidades iniciais para {self.sectors[i]} somam {total:.2f}. Serão normalizadas.")
+        totals = np.sum(self.transition_base, axis=1) + np.asarray(self.exit_probs, dtype=float)
+        for i in np.flatnonzero(np.abs(totals - 1.0) > 0.1):
+            logger.warning(f"Probabilidades iniciais para {self.sectors[i]} somam {totals[i]:.2f}. Serão normalizadas.")
 
     def compute_transitions(self):
         """Calcula probabilidades de transição com ajustes."""
-        num_sectors = len(self.sectors)
         transition_probs = np.array(self.transition_base, dtype=float)
         exit_probs = np.array(self.exit_probs, dtype=float)
-        
+
         # Ajustar probabilidades com base no turno e gravidade
-        turno_factor = {"manhã": 1.0, "tarde": 1.1, "noite": 1.3}.get(self.turno, 1.0)
-        gravidade_factor = {"baixa": 0.9, "média": 1.0, "alta": 1.2}.get(self.gravidade, 1.0)
-        factor = turno_factor * gravidade_factor
-        
+        factor = combo_factor(self.turno, self.gravidade)
+
         # Aplicar fator e adicionar pequena aleatoriedade
         transition_probs *= factor
-        transition_probs += np.random.uniform(0, 0.05, transition_probs.shape)
+        transition_probs += np.random.uniform(0, NOISE_AMPLITUDE, transition_probs.shape)
         exit_probs *= factor
-        exit_probs += np.random.uniform(0, 0.05, exit_probs.shape)
-        
-        # Garantir valores não-negativos
-        transition_probs = np.clip(transition_probs, 0, None)
-        exit_probs = np.clip(exit_probs, 0, None)
-        
-        # Normalizar para soma exata de 1
-        for i in range(num_sectors):
-            total = sum(transition_probs[i]) + exit_probs[i]
-            if total > 0:
-                scale = 1.0 / total
-                transition_probs[i] *= scale
-                exit_probs[i] *= scale
-            else:
-                logger.warning(f"Total de probabilidades zero para setor {self.sectors[i]}. Usando distribuição uniforme.")
-                transition_probs[i] = np.ones(num_sectors) / (num_sectors + 1)
-                exit_probs[i] = 1.0 / (num_sectors + 1)
-        
+        exit_probs += np.random.uniform(0, NOISE_AMPLITUDE, exit_probs.shape)
+
+        # Normalizar para soma exata de 1 (valores negativos são cortados a zero)
+        empty = np.sum(np.clip(transition_probs, 0, None), axis=1) + np.clip(exit_probs, 0, None) <= 0
+        for i in np.flatnonzero(empty):
+            logger.warning(f"Total de probabilidades zero para setor {self.sectors[i]}. Usando distribuição uniforme.")
+        transition_probs, exit_probs = normalize_transitions(transition_probs, exit_probs)
+
         # Verificar normalização
-        for i in range(num_sectors):
-            total = sum(transition_probs[i]) + exit_probs[i]
-            if not (0.99999 <= total <= 1.00001):
-                logger.error(f"Normalização falhou para setor {self.sectors[i]}: soma = {total}")
-            else:
-                logger.debug(f"Setor {self.sectors[i]} normalizado: soma = {total}")
-        
-        # Atualizar config com probabilidades normalizadas
-        self.config["transition_probs"] = transition_probs.tolist()
-        self.config["exit_probs"] = exit_probs.tolist()
-        
-        return transition_probs
\ No newline at end of file
+        totals = transition_probs.sum(axis=1) + exit_probs
+        for i in np.flatnonzero(np.abs(totals - 1.0) > 1e-5):
+            logger.error(f"Normalização falhou para setor {self.sectors[i]}: soma = {totals[i]}")
+
+        # Atualizar config com probabilidades normalizadas (uma CompiledConfig é imutável:
+        # usar `config.with_transitions(transition_probs, self.normalized_exit_probs)`)
+        self.normalized_exit_probs = exit_probs
+        if isinstance(self.config, dict):
+            self.config["transition_probs"] = transition_probs.tolist()
+            self.config["exit_probs"] = exit_probs.tolist()
+
+        return transition_probs
+
+    def compute_transitions_batch(self, combos, noise_draws=None, seed=None):
+        """Versão em lote de `compute_transitions` para vários pares (turno, gravidade).
+
+        Não altera `self.config`; ver `compute_transitions_batch` (módulo).
+        """
+        return compute_transitions_batch(self.transition_base, self.exit_probs, combos, noise_draws, seed)
@@ -0,0 +1,323 @@
+# network.py: Rede regional de hospitais com transferências, cada hospital no seu processo
+import heapq
+import logging
+import math
+import multiprocessing
+
+import numpy as np
+
+from models.compiled_config import compile_config
+from models.event_kernel import HeapEventKernel
+from models.hospital_sim import HospitalSimulator
+from models.schedule import busy_minutes
+from models.markov_model import MarkovHospitalModel
+
+logger = logging.getLogger(__name__)
+
+def hospital_seed(seed, index):
+    """Semente do hospital `index` numa rede simulada com `seed` (independente da partição)."""
+    return int(np.random.SeedSequence([seed, index]).generate_state(1)[0] >> 1)
+
+
+def parse_network(network):
+    """Valida a descrição da rede e devolve (nomes, configurações, ligações por origem).
+
+    `network` tem `hospitals` ({nome: config}) e `transfers`, uma lista de
+    {from, to, probability, time, sector}: quem sai de `from` é transferido
+    para `to` com a probabilidade indicada, chegando `time` minutos depois ao
+    setor `sector` (por omissão o primeiro). As ligações ficam como
+    (destino, probabilidade, tempo, código do setor de entrada).
+    """
+    if not isinstance(network, dict) or not network.get("hospitals"):
+        raise ValueError("A rede deve ter pelo menos um hospital em 'hospitals'.")
+    names = list(network["hospitals"])
+    configs = [network["hospitals"][name] for name in names]
+    index = {name: i for i, name in enumerate(names)}
+    links = [[] for _ in names]
+    for transfer in network.get("transfers", []):
+        origin, destination = transfer.get("from"), transfer.get("to")
+        if origin not in index or destination not in index:
+            raise ValueError(f"Transferência entre hospitais desconhecidos: {origin} -> {destination}.")
+        if origin == destination:
+            raise ValueError(f"Transferência de {origin} para si próprio.")
+        probability = float(transfer.get("probability", 0.0))
+        time = float(transfer.get("time", 0.0))
+        if not 0.0 <= probability <= 1.0:
+            raise ValueError(f"Probabilidade inválida em {origin} -> {destination}: {probability}.")
+        if time <= 0:
+            raise ValueError(f"O tempo de transferência {origin} -> {destination} deve ser positivo (é o lookahead).")
+        sectors = list(configs[index[destination]]["sectors"])
+        sector = transfer.get("sector", sectors[0])
+        if sector not in sectors:
+            raise ValueError(f"Setor '{sector}' não existe em {destination}.")
+        links[index[origin]].append((index[destination], probability, time, sectors.index(sector)))
+    for name, origin_links in zip(names, links):
+        if sum(link[1] for link in origin_links) > 1.0 + 1e-9:
+            raise ValueError(f"As probabilidades de transferência de {name} somam mais de 1.")
+    return names, configs, links
+
+
+def safe_times(links, earliest):
+    """Instante até ao qual cada hospital pode avançar sem receber transferências no passado.
+
+    `earliest[i]` é o próximo evento conhecido do hospital i (calendário ou
+    mensagem por entregar). Nenhum evento futuro de i acontece antes de
+    `bound[i]`, o caminho mais curto na rede de ligações a partir desses
+    instantes (cada ligação soma o seu tempo de transferência, o lookahead);
+    i pode então processar tudo o que for anterior ao menor
+    `bound[j] + tempo(j -> i)` das suas origens. Hospitais sem origens
+    avançam até ao fim.
+    """
+    bound = list(earliest)
+    heap = [(time, i) for i, time in enumerate(bound) if time < math.inf]
+    heapq.heapify(heap)
+    while heap:
+        time, origin = heapq.heappop(heap)
+        if time > bound[origin]:
+            continue
+        for destination, _, transfer_time, _ in links[origin]:
+            if time + transfer_time < bound[destination]:
+                bound[destination] = time + transfer_time
+                heapq.heappush(heap, (bound[destination], destination))
+    safe = [math.inf] * len(links)
+    for origin, origin_links in enumerate(links):
+        for destination, _, transfer_time, _ in origin_links:
+            safe[destination] = min(safe[destination], bound[origin] + transfer_time)
+    return safe
+
+
+class HospitalProcess:
+    def __init__(self, name, index, config, links, seed):
+        """Processo lógico de um hospital: o `HeapEventKernel`, avançado por janelas.
+
+        O núcleo avança só até ao fim da janela pedida (`advance`) e recebe
+        os pacientes transferidos de outros hospitais como chegadas externas.
+        À saída, um sorteio próprio do hospital decide se o paciente é
+        transferido; a mensagem (destino, instante de chegada, origem, número
+        de sequência, dados do paciente) é devolvida ao coordenador. Um
+        hospital sem ligações dá o mesmo resultado que
+        `run_replication(config, seed, "heap")`.
+        """
+        self.name = name
+        self.index = index
+        self.links = links
+        np.random.seed(seed)
+        config = compile_config(config)
+        markov_model = MarkovHospitalModel(config)
+        transition_probs = markov_model.compute_transitions()
+        self.config = config.with_transitions(transition_probs, markov_model.normalized_exit_probs)
+        self.simulator = HospitalSimulator(self.config, engine="heap")
+        self.kernel = HeapEventKernel(self.simulator)
+        self.kernel.on_finish = self._on_finish
+        self.transfer_rng = np.random.default_rng([seed, index])
+        self.message_seq = 0
+        self.outbox = []
+        self.transfers_out = {}
+        self.transfers_in = {}
+
+    def _on_finish(self, patient, result, exited):
+        origin = self.kernel.extra.get(patient)
+        if origin is not None:
+            result["origin"], result["origin_patient_id"] = origin
+        if exited and self.links:
+            u = self.transfer_rng.random()
+            for destination, probability, time, sector in self.links:
+                if u < probability:
+                    self.message_seq += 1
+                    self.outbox.append((destination, self.kernel.now + time, self.index, self.message_seq,
+                                        (sector, self.kernel.priorities[patient], self.name, result["patient_id"])))
+                    self.transfers_out[destination] = self.transfers_out.get(destination, 0) + 1
+                    result["transferred_to"] = destination
+                    break
+                u -= probability
+
+    def next_time(self):
+        return self.kernel.next_time()
+
+    def advance(self, until, messages=()):
+        """Recebe as transferências e processa os eventos anteriores a `until`.
+
+        Devolve as mensagens emitidas, como (destino, instante, origem,
+        sequência, dados do paciente).
+        """
+        for _, time, origin, message_seq, (sector, priority, origin_name, origin_patient) in messages:
+            self.kernel.add_arrival(time, (origin, message_seq), sector, priority, (origin_name, origin_patient))
+            self.transfers_in[origin_name] = self.transfers_in.get(origin_name, 0) + 1
+        self.outbox = []
+        self.kernel.advance(until)
+        return self.outbox
+
+    def session(self, names):
+        """Sessão do hospital ({config, results, stats}), no formato de `run_replication`."""
+        kernel = self.kernel
+        stats = self.simulator.stats
+        kernel.record_stats()
+        for sector in self.config.sectors:
+            visits = stats["sector_visits"][sector]
+            stats["avg_time_per_sector"][sector] = stats["avg_time_per_sector"][sector] / visits if visits > 0 else 0.0
+        if kernel.now > 0:
+            occupied_time = float(busy_minutes(stats["doctor_usage"], 0.0, kernel.now))
+            stats["doctor_occupation"] = occupied_time / (self.config.medicos * kernel.now)
+        for result in self.simulator.results:
+            if isinstance(result.get("transferred_to"), int):
+                result["transferred_to"] = names[result["transferred_to"]]
+        stats["transfers_out"] = {names[d]: n for d, n in sorted(self.transfers_out.items())}
+        stats["transfers_in"] = dict(sorted(self.transfers_in.items()))
+        return {"config": self.config.to_dict(), "results": self.simulator.results, "stats": stats}
+
+
+class HospitalGroup:
+    def __init__(self, specs):
+        """Hospitais atribuídos a um mesmo processo; `specs` = [(nome, índice, config, ligações, semente)]."""
+        self.processes = {spec[1]: HospitalProcess(*spec) for spec in specs}
+
+    def next_times(self):
+        return {index: process.next_time() for index, process in self.processes.items()}
+
+    def advance(self, untils, inbox):
+        outbox = []
+        for index, process in self.processes.items():
+            if index in untils or index in inbox:
+                # Sem instante seguro, as mensagens só entram no calendário
+                outbox.extend(process.advance(untils.get(index, -math.inf), inbox.get(index, ())))
+        return outbox, self.next_times()
+
+    def sessions(self, names):
+        return {index: process.session(names) for index, process in self.processes.items()}
+
+
+def _serve_group(connection, specs):
+    """Ciclo de um processo de trabalho: responde a pedidos do coordenador até 'sessions'."""
+    try:
+        group = HospitalGroup(specs)
+        connection.send(group.next_times())
+        while True:
+            command, *args = connection.recv()
+            if command == "advance":
+                connection.send(group.advance(*args))
+            else:
+                connection.send(group.sessions(*args))
+                return
+    except Exception as e:
+        logger.error(f"Erro no processo de hospitais: {e}")
+        connection.send(e)
+    finally:
+        connection.close()
+
+
+class _RemoteGroup:
+    """Grupo de hospitais noutro processo, com a mesma interface de HospitalGroup."""
+
+    def __init__(self, context, specs):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_serve_group, args=(child, specs), daemon=True)
+        self.process.start()
+        child.close()
+
+    def send(self, *message):
+        self.connection.send(message)
+
+    def receive(self):
+        reply = self.connection.recv()
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    def close(self):
+        self.connection.close()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+def run_network(network, seed=0, workers=None, max_window=None):
+    """Simula a rede com sincronização conservadora por janelas.
+
+    Em cada ronda o coordenador entrega as transferências pendentes e calcula
+    para cada hospital o instante seguro (`safe_times`, com lookahead igual
+    ao tempo de cada transferência); os hospitais processam em paralelo os
+    eventos anteriores a esse instante e devolvem as transferências que
+    emitiram. `max_window` limita ainda cada janela a esse número de minutos
+    depois do próximo evento da rede. As mensagens são ordenadas por
+    (instante, origem, sequência), pelo que o resultado não depende de
+    `workers` nem das janelas: com `workers=1` tudo corre neste processo
+    (execução sequencial).
+
+    Devolve {"hospitals": {nome: sessão}, "windows": n, "transfers": n}.
+    """
+    names, configs, links = parse_network(network)
+    if max_window is not None and max_window <= 0:
+        raise ValueError("max_window deve ser positivo.")
+    specs = [(name, index, config, links[index], hospital_seed(seed, index))
+             for index, (name, config) in enumerate(zip(names, configs))]
+    workers = min(workers or len(specs), len(specs))
+    partition = [specs[i::workers] for i in range(workers)]
+    owner = {spec[1]: group for group, members in enumerate(partition) for spec in members}
+
+    remote = workers > 1
+    groups = []
+    try:
+        if remote:
+            context = multiprocessing.get_context()
+            groups = [_RemoteGroup(context, members) for members in partition]
+            next_times = {}
+            for group in groups:
+                next_times.update(group.receive())
+        else:
+            groups = [HospitalGroup(members) for members in partition]
+            next_times = groups[0].next_times()
+
+        pending = []
+        windows = transfers = 0
+        while True:
+            earliest = [next_times[index] for index in range(len(names))]
+            for message in pending:
+                earliest[message[0]] = min(earliest[message[0]], message[1])
+            start = min(earliest)
+            if start == math.inf:
+                break
+            safe = safe_times(links, earliest)
+            if max_window is not None:
+                safe = [min(time, start + max_window) for time in safe]
+
+            pending.sort(key=lambda message: message[1:4])
+            inboxes = [{} for _ in groups]
+            for message in pending:
+                inboxes[owner[message[0]]].setdefault(message[0], []).append(message)
+            pending = []
+            # Só avançam os hospitais com eventos antes do seu instante seguro
+            untils = [{} for _ in groups]
+            for index, time in enumerate(earliest):
+                if time < safe[index]:
+                    untils[owner[index]][index] = safe[index]
+            active = [g for g in range(len(groups)) if untils[g] or inboxes[g]]
+            if remote:
+                for g in active:
+                    groups[g].send("advance", untils[g], inboxes[g])
+                replies = [groups[g].receive() for g in active]
+            else:
+                replies = [groups[g].advance(untils[g], inboxes[g]) for g in active]
+            for outbox, times in replies:
+                pending.extend(outbox)
+                next_times.update(times)
+                transfers += len(outbox)
+            windows += 1
+
+        sessions = {}
+        if remote:
+            for group in groups:
+                group.send("sessions", names)
+            for group in groups:
+                sessions.update(group.receive())
+        else:
+            sessions = groups[0].sessions(names)
+    finally:
+        if remote:
+            for group in groups:
+                group.close()
+    logger.info(f"Rede de {len(names)} hospitais: {windows} janelas, {transfers} transferências")
+    return {
+        "hospitals": {names[index]: sessions[index] for index in range(len(names))},
+        "windows": windows,
+        "transfers": transfers
+    }
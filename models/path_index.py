@@ -0,0 +1,103 @@
+# path_index.py: Índice de variantes de percurso (caminhos distintos) dos pacientes
+import numpy as np
+
+
+class PathIndex:
+    def __init__(self, results):
+        """Agrupa os pacientes por percurso idêntico (variante).
+
+        Cada percurso é codificado como tuplo e atribuído a uma variante por
+        hash; as estatísticas (contagem, média e percentis do tempo total) são
+        calculadas de forma vetorizada, com os membros de cada variante
+        contíguos em `order`. `row_of` dá a linha de um paciente em O(1).
+        """
+        self.results = results
+        variant_of = {}
+        self.paths = []
+        codes = np.empty(len(results), dtype=np.int64)
+        for row, r in enumerate(results):
+            key = tuple(r["sectors_visited"])
+            code = variant_of.get(key)
+            if code is None:
+                code = variant_of[key] = len(self.paths)
+                self.paths.append(key)
+            codes[row] = code
+        self.variant_codes = codes
+        self.row_of = {r["patient_id"]: row for row, r in enumerate(results)}
+
+        times = np.fromiter((r["total_waiting_time"] for r in results), dtype=float, count=len(results))
+        num_variants = len(self.paths)
+        self.counts = np.bincount(codes, minlength=num_variants)
+        self.mean_times = np.bincount(codes, weights=times, minlength=num_variants) / np.maximum(self.counts, 1)
+        # Membros ordenados por (variante, tempo): percentis por interpolação dentro de cada grupo
+        self.order = np.lexsort((times, codes))
+        self.starts = np.concatenate([[0], np.cumsum(self.counts)])
+        self._sorted_times = times[self.order]
+        self.p50_times = self._percentile(0.5)
+        self.p90_times = self._percentile(0.9)
+
+    def _percentile(self, q):
+        if not len(self.paths):
+            return np.zeros(0)
+        position = self.starts[:-1] + q * (self.counts - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, self.starts[1:] - 1)
+        weight = position - lower
+        return self._sorted_times[lower] * (1 - weight) + self._sorted_times[upper] * weight
+
+    def __len__(self):
+        return len(self.paths)
+
+    def top_k(self, k):
+        """Índices das `k` variantes mais frequentes, da maior para a menor."""
+        k = min(k, len(self.paths))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64)
+        top = np.argpartition(-self.counts, k - 1)[:k]
+        return top[np.lexsort((top, -self.counts[top]))]
+
+    def members(self, variant):
+        """Linhas de `results` dos pacientes da variante (por tempo crescente)."""
+        return self.order[self.starts[variant]:self.starts[variant + 1]]
+
+    def patient(self, patient_id):
+        """Resultado do paciente e a respetiva variante, ou (None, None)."""
+        row = self.row_of.get(patient_id)
+        if row is None:
+            return None, None
+        return self.results[row], int(self.variant_codes[row])
+
+    def step_times(self, variant):
+        """Tempo médio de atendimento em cada visita do percurso da variante.
+
+        Usa os `service_times` gravados; em sessões antigas o tempo total é
+        dividido igualmente pelas visitas.
+        """
+        visits = len([s for s in self.paths[variant] if s != "Saída"])
+        if visits == 0:
+            return np.zeros(0)
+        totals = np.zeros(visits)
+        for row in self.members(variant):
+            r = self.results[row]
+            service_times = r.get("service_times")
+            if service_times is not None and len(service_times) == visits:
+                totals += service_times
+            else:
+                totals += r["total_waiting_time"] / visits
+        return totals / self.counts[variant]
+
+    def summary(self, variants):
+        """Linhas da tabela de variantes (mesmas colunas mostradas na página)."""
+        total = max(len(self.results), 1)
+        return [
+            {
+                "Variante": int(v),
+                "Caminho": " -> ".join(self.paths[v]),
+                "Pacientes": int(self.counts[v]),
+                "Percentagem (%)": 100.0 * self.counts[v] / total,
+                "Tempo Médio (min)": float(self.mean_times[v]),
+                "Tempo P50 (min)": float(self.p50_times[v]),
+                "Tempo P90 (min)": float(self.p90_times[v])
+            }
+            for v in variants
+        ]
@@ -0,0 +1,94 @@
+# profiler.py: Medição de tempo e memória por fase de uma execução
+import cProfile
+import io
+import json
+import marshal
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Número de funções mostradas no resumo textual do cProfile
+PROFILE_TOP_FUNCTIONS = 30
+
+
+class PhaseProfiler:
+    def __init__(self, trace_memory=True):
+        """Regista tempo de relógio, tempo de CPU e pico de memória de cada fase.
+
+        As fases são sequenciais (não aninhadas): o pico do tracemalloc é
+        reposto no início de cada uma. Uma fase repetida substitui a medição
+        anterior, para que a página possa voltar a medir os gráficos em cada
+        atualização sem acumular linhas.
+        """
+        self.trace_memory = trace_memory
+        self.phases = {}
+        self.profiles = {}
+        self.raw_profiles = {}
+
+    @contextmanager
+    def phase(self, name, profile=False):
+        """Mede o bloco `with`; com `profile=True` também corre o cProfile."""
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            memory_start = tracemalloc.get_traced_memory()[0]
+        profiler = cProfile.Profile() if profile else None
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record = {
+                "wall_s": time.perf_counter() - wall_start,
+                "cpu_s": time.process_time() - cpu_start,
+                "peak_kib": None
+            }
+            if self.trace_memory:
+                record["peak_kib"] = max(tracemalloc.get_traced_memory()[1] - memory_start, 0) / 1024
+                if started_tracing:
+                    tracemalloc.stop()
+            self.phases[name] = record
+            if profiler is not None:
+                self._store_profile(name, profiler)
+
+    def _store_profile(self, name, profiler):
+        profiler.create_stats()
+        # Mesmo formato de `dump_stats`: abre-se com pstats.Stats ou snakeviz
+        self.raw_profiles[name] = marshal.dumps(profiler.stats)
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        self.profiles[name] = output.getvalue()
+
+    def rows(self):
+        """Linhas da tabela de desempenho, pela ordem em que as fases correram."""
+        return [
+            {
+                "Fase": name,
+                "Tempo (s)": record["wall_s"],
+                "CPU (s)": record["cpu_s"],
+                "Pico Memória (KiB)": record["peak_kib"]
+            }
+            for name, record in self.phases.items()
+        ]
+
+    def to_dict(self):
+        """Forma serializável, gravada com a sessão."""
+        return {"phases": self.phases, "profiles": self.profiles}
+
+    @classmethod
+    def from_dict(cls, data):
+        profiler = cls()
+        profiler.phases = dict(data.get("phases", {}))
+        profiler.profiles = dict(data.get("profiles", {}))
+        return profiler
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
@@ -0,0 +1,195 @@
+# rare_events.py: Probabilidades de espera longa por amostragem por importância (entropia cruzada)
+import logging
+from collections import namedtuple
+
+import numpy as np
+
+from models.compiled_config import compile_config
+from models.markov_model import MarkovHospitalModel
+
+logger = logging.getLogger(__name__)
+
+# Mesmo limite de passos por paciente que a simulação
+MAX_STEPS = 100
+# Fração de elite de cada nível da entropia cruzada
+ELITE_FRACTION = 0.1
+# Peso da distribuição nominal na mistura defensiva (evita pesos explosivos)
+DEFENSIVE_MIX = 0.1
+Z_SCORES = {0.90: 1.6449, 0.95: 1.96, 0.99: 2.5758}
+
+TailEstimate = namedtuple("TailEstimate", [
+    "threshold", "sector", "probability", "std_error", "ci_low", "ci_high",
+    "samples", "hits", "relative_error", "plain_runs", "levels"
+])
+TailEstimate.__doc__ = """Estimativa de P(tempo > limiar); `plain_runs` é o número de
+pacientes que a simulação direta precisaria para o mesmo erro relativo."""
+
+TiltParams = namedtuple("TiltParams", ["means", "exits", "routes"])
+
+
+class TailEstimator:
+    def __init__(self, config, seed=None):
+        """Estima probabilidades de cauda do tempo de um paciente.
+
+        Como `total_waiting_time` soma os tempos de atendimento, o percurso de
+        cada paciente é independente dos restantes e pode ser amostrado sozinho,
+        com a mesma dinâmica da simulação (setor 0, saída depois de cada
+        atendimento, linha renormalizada, limite de passos). Os tempos de
+        atendimento, as saídas e o encaminhamento são amostrados de uma
+        distribuição inclinada escolhida pelo método da entropia cruzada, e cada
+        percurso é pesado pela razão de verosimilhanças: a estimativa final é
+        não enviesada. Sem `config["transition_probs"]` a matriz é calculada
+        pelo modelo de Markov.
+        """
+        config = compile_config(config)
+        self.config = config
+        self.rng = np.random.default_rng(seed)
+        if config.transition_probs is not None:
+            transitions = config.transition_probs.to_dense()
+            exits = config.exit_probs
+        else:
+            markov_model = MarkovHospitalModel(config)
+            transitions = markov_model.compute_transitions()
+            exits = markov_model.normalized_exit_probs
+        row_sums = transitions.sum(axis=1, keepdims=True)
+        num_sectors = config.num_sectors
+        routes = np.where(row_sums > 0, transitions / np.where(row_sums > 0, row_sums, 1.0), 1.0 / num_sectors)
+        self.nominal = TiltParams(
+            np.array(config.service_means, dtype=float),
+            np.clip(np.array(exits, dtype=float), 0.0, 1.0),
+            routes
+        )
+
+    def sector_index(self, sector):
+        if sector is None:
+            return None
+        if sector not in self.config.sector_codes:
+            raise ValueError(f"Setor desconhecido: {sector}")
+        return self.config.sector_codes[sector]
+
+    def simulate(self, num_paths, params=None, collect=False):
+        """Amostra `num_paths` percursos com os parâmetros `params` (nominais por omissão).
+
+        Devolve `(tempos por setor (n, S), log da razão de verosimilhanças,
+        contagens)`; as contagens (visitas, saídas, transições e tempo por
+        setor) só são recolhidas com `collect`.
+        """
+        nominal = self.nominal
+        params = nominal if params is None else params
+        num_sectors = len(nominal.means)
+        cum_routes = np.cumsum(params.routes, axis=1)
+        cum_routes[:, -1] = 1.0
+        sector_time = np.zeros((num_paths, num_sectors))
+        log_ratio = np.zeros(num_paths)
+        visits = np.zeros((num_paths, num_sectors)) if collect else None
+        exits = np.zeros((num_paths, num_sectors)) if collect else None
+        moves = np.zeros((num_paths, num_sectors * num_sectors)) if collect else None
+        # Termos constantes da razão para cada setor e decisão
+        service_log = np.log(params.means / nominal.means)
+        service_rate = 1.0 / params.means - 1.0 / nominal.means
+        with np.errstate(divide="ignore", invalid="ignore"):
+            exit_log = np.log(np.where(nominal.exits > 0, nominal.exits / params.exits, 1.0))
+            stay_log = np.log(np.where(nominal.exits < 1, (1 - nominal.exits) / (1 - params.exits), 1.0))
+            route_log = np.log(np.where(nominal.routes > 0, nominal.routes / params.routes, 1.0))
+
+        active = np.arange(num_paths)
+        current = np.zeros(num_paths, dtype=np.int64)
+        for step in range(MAX_STEPS):
+            if not len(active):
+                break
+            sector = current[active]
+            service = self.rng.standard_exponential(len(active)) * params.means[sector]
+            sector_time[active, sector] += service
+            log_ratio[active] += service_log[sector] + service * service_rate[sector]
+            if collect:
+                visits[active, sector] += 1
+            leave = self.rng.random(len(active)) < params.exits[sector]
+            log_ratio[active] += np.where(leave, exit_log[sector], stay_log[sector])
+            if collect:
+                exits[active[leave], sector[leave]] += 1
+            active, sector = active[~leave], sector[~leave]
+            if step == MAX_STEPS - 1 or not len(active):
+                break
+            u = self.rng.random(len(active))
+            target = (u[:, None] > cum_routes[sector]).sum(axis=1)
+            target = np.minimum(target, num_sectors - 1)
+            log_ratio[active] += route_log[sector, target]
+            if collect:
+                moves[active, sector * num_sectors + target] += 1
+            current[active] = target
+        counts = (visits, exits, moves.reshape(num_paths, num_sectors, num_sectors)) if collect else None
+        return sector_time, log_ratio, counts
+
+    def _update(self, params, sector_time, weights, counts):
+        """Parâmetros da entropia cruzada pesados pela elite (com mistura defensiva)."""
+        nominal = self.nominal
+        visits, exits, moves = counts
+        w = weights[:, None]
+        visit_total = (w * visits).sum(axis=0)
+        seen = visit_total > 0
+        means = np.where(seen, (w * sector_time).sum(axis=0) / np.where(seen, visit_total, 1.0), params.means)
+        means = np.clip(means, 0.5 * nominal.means, 50.0 * nominal.means)
+        exit_rate = np.where(seen, (w * exits).sum(axis=0) / np.where(seen, visit_total, 1.0), params.exits)
+        move_total = (weights[:, None, None] * moves).sum(axis=0)
+        row_total = move_total.sum(axis=1, keepdims=True)
+        routes = np.where(row_total > 0, move_total / np.where(row_total > 0, row_total, 1.0), params.routes)
+        mix = DEFENSIVE_MIX
+        exits = (1 - mix) * exit_rate + mix * nominal.exits
+        exits = np.where(nominal.exits >= 1, 1.0, np.minimum(exits, 1 - 1e-6))
+        return TiltParams(means, exits, (1 - mix) * routes + mix * nominal.routes)
+
+    def tilt(self, threshold, sector=None, pilot=2000, max_levels=12):
+        """Parâmetros inclinados para o evento {tempo > threshold} (multinível por quantis).
+
+        Em cada nível o limiar intermédio é o quantil 1 - ELITE_FRACTION dos
+        tempos (nunca acima de `threshold`) e os parâmetros são reestimados a
+        partir dos percursos que o ultrapassam.
+        """
+        index = self.sector_index(sector)
+        params = self.nominal
+        levels = 0
+        for levels in range(1, max_levels + 1):
+            sector_time, log_ratio, counts = self.simulate(pilot, params, collect=True)
+            score = sector_time.sum(axis=1) if index is None else sector_time[:, index]
+            level = min(threshold, float(np.quantile(score, 1 - ELITE_FRACTION)))
+            elite = score >= level
+            weights = np.where(elite, np.exp(log_ratio - log_ratio[elite].max()), 0.0)
+            params = self._update(params, sector_time, weights, counts)
+            if level >= threshold:
+                break
+        return params, levels
+
+    def estimate(self, threshold, sector=None, samples=10000, pilot=2000, confidence=0.95, max_levels=12):
+        """P(tempo > threshold) com intervalo de confiança (aproximação normal).
+
+        `sector=None` usa o tempo total do paciente; com um nome de setor, o
+        tempo acumulado nesse setor. A fase piloto só escolhe a inclinação; a
+        estimativa vem de `samples` percursos novos.
+        """
+        if threshold <= 0:
+            raise ValueError("O limiar deve ser positivo.")
+        index = self.sector_index(sector)
+        params, levels = self.tilt(threshold, sector, pilot, max_levels)
+        sector_time, log_ratio, _ = self.simulate(samples, params)
+        score = sector_time.sum(axis=1) if index is None else sector_time[:, index]
+        values = np.where(score > threshold, np.exp(log_ratio), 0.0)
+        probability = float(values.mean())
+        std_error = float(values.std(ddof=1) / np.sqrt(samples))
+        z = Z_SCORES.get(confidence, 1.96)
+        relative_error = std_error / probability if probability > 0 else float("inf")
+        plain_runs = (
+            int(np.ceil((1 - probability) / (probability * relative_error ** 2)))
+            if probability > 0 and relative_error > 0 else 0
+        )
+        logger.info(
+            f"P(tempo > {threshold}) = {probability:.3e} ± {z * std_error:.1e} "
+            f"({samples} percursos, {levels} níveis; simulação direta: {plain_runs})"
+        )
+        return TailEstimate(
+            threshold, sector, probability, std_error,
+            max(0.0, probability - z * std_error), probability + z * std_error,
+            samples, int((score > threshold).sum()), relative_error, plain_runs, levels
+        )
+
+    def estimate_many(self, thresholds, sector=None, **kwargs):
+        return [self.estimate(threshold, sector, **kwargs) for threshold in thresholds]
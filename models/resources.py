@@ -0,0 +1,115 @@
+# resources.py: Recurso SimPy com fila de prioridade em heap
+import heapq
+
+import simpy
+
+
+class HeapQueue:
+    def __init__(self):
+        """Fila de pedidos ordenada por (prioridade, tempo do pedido, chegada).
+
+        Substitui a `SortedQueue` do SimPy (inserção O(n)) por um heap binário
+        com inserção e remoção O(log n). Pedidos cancelados são removidos de
+        forma preguiçosa, quando chegam ao topo.
+        """
+        self._heap = []
+        self._cancelled = set()
+        self._seq = 0
+
+    def append(self, request):
+        self._seq += 1
+        heapq.heappush(self._heap, (request.key, self._seq, request))
+
+    def _discard_cancelled(self):
+        while self._heap and self._heap[0][2] in self._cancelled:
+            self._cancelled.discard(heapq.heappop(self._heap)[2])
+
+    def __getitem__(self, idx):
+        # O SimPy só consulta o primeiro pedido (Resource._do_put nunca devolve True)
+        self._discard_cancelled()
+        if idx == 0 and self._heap:
+            return self._heap[0][2]
+        return list(self)[idx]
+
+    def pop(self, idx=0):
+        if idx != 0:
+            request = self[idx]
+            self.remove(request)
+            return request
+        self._discard_cancelled()
+        return heapq.heappop(self._heap)[2]
+
+    def remove(self, request):
+        if request in self._cancelled or not any(item[2] is request for item in self._heap):
+            raise ValueError("Pedido não está na fila.")
+        self._cancelled.add(request)
+
+    def __len__(self):
+        return len(self._heap) - len(self._cancelled)
+
+    def __iter__(self):
+        return (item[2] for item in sorted(self._heap) if item[2] not in self._cancelled)
+
+
+class HeapPriorityResource(simpy.PriorityResource):
+    PutQueue = HeapQueue
+
+    def __init__(self, env, capacity=1):
+        """`simpy.PriorityResource` com fila em heap e contadores de espera.
+
+        Usa-se da mesma forma (`with recurso.request(priority=...) as req`).
+        """
+        super().__init__(env, capacity)
+        self.grants = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.max_queue_length = 0
+
+    @property
+    def queue_length(self):
+        """Número de pedidos à espera neste momento."""
+        return len(self.put_queue)
+
+    @property
+    def mean_wait(self):
+        return self.total_wait / self.grants if self.grants else 0.0
+
+    def set_capacity(self, capacity):
+        """Altera o número de servidores a meio da simulação.
+
+        Um aumento atende de imediato os pedidos em espera; uma redução não
+        interrompe atendimentos em curso, apenas deixa de ceder vagas até o
+        número de utilizadores descer abaixo da nova capacidade.
+        """
+        if capacity <= 0:
+            raise ValueError("A capacidade deve ser positiva.")
+        self._capacity = capacity
+        # `_trigger_put` cede no máximo um pedido por chamada
+        while len(self.put_queue) and len(self.users) < capacity:
+            self._trigger_put(None)
+
+    def _do_put(self, event):
+        if len(self.users) < self.capacity:
+            now = self._env.now
+            self.users.append(event)
+            event.usage_since = now
+            event.succeed()
+            wait = now - event.time
+            self.grants += 1
+            self.total_wait += wait
+            if wait > self.max_wait:
+                self.max_wait = wait
+        elif len(self.put_queue) > self.max_queue_length:
+            self.max_queue_length = len(self.put_queue)
+
+    def counters(self):
+        """Contadores de fila e espera, serializáveis em JSON."""
+        return {
+            "capacity": self.capacity,
+            "grants": self.grants,
+            "queue_length": self.queue_length,
+            "max_queue_length": self.max_queue_length,
+            "total_wait": self.total_wait,
+            "mean_wait": self.mean_wait,
+            "max_wait": self.max_wait
+        }
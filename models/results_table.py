@@ -0,0 +1,69 @@
+# results_table.py: Tabela de resultados colunar com filtros vetorizados e paginação
+import numpy as np
+import pandas as pd
+
+# Bits por palavra da máscara de setores visitados
+MASK_BITS = 64
+
+
+class ResultsTable:
+    def __init__(self, results, sectors):
+        """Colunas numpy dos resultados, construídas uma única vez por simulação.
+
+        Cada paciente tem uma máscara de bits dos setores visitados (uma
+        palavra de 64 bits por cada 64 setores), o que torna o filtro por setor
+        uma operação vetorizada em vez de uma pesquisa de texto por linha. O
+        texto do percurso só é montado para as linhas da página mostrada.
+        """
+        self.results = results
+        self.sectors = list(sectors)
+        codes = {sector: idx for idx, sector in enumerate(self.sectors)}
+        num_words = max(1, -(-len(self.sectors) // MASK_BITS))
+        n = len(results)
+        self.patient_ids = np.fromiter((r["patient_id"] for r in results), dtype=np.int64, count=n)
+        self.total_times = np.fromiter((r["total_waiting_time"] for r in results), dtype=float, count=n)
+        self.high_priority = np.fromiter((r["priority"] == "Alta" for r in results), dtype=bool, count=n)
+        self.masks = np.zeros((n, num_words), dtype=np.uint64)
+        rows, bits = [], []
+        for row, r in enumerate(results):
+            for sector in set(r["sectors_visited"]):
+                code = codes.get(sector)
+                if code is not None:
+                    rows.append(row)
+                    bits.append(code)
+        rows = np.asarray(rows, dtype=np.int64)
+        bits = np.asarray(bits, dtype=np.int64)
+        values = np.left_shift(np.uint64(1), (bits % MASK_BITS).astype(np.uint64))
+        np.bitwise_or.at(self.masks, (rows, bits // MASK_BITS), values)
+
+    def __len__(self):
+        return len(self.results)
+
+    @property
+    def max_time(self):
+        return float(self.total_times.max()) if len(self.total_times) else 0.0
+
+    def filter(self, priority="Todos", sector="Todos", min_time=0.0):
+        """Índices das linhas que passam os filtros (mesmas opções da página)."""
+        keep = self.total_times >= min_time
+        if priority != "Todos":
+            keep &= self.high_priority == (priority == "Alta")
+        if sector != "Todos":
+            code = self.sectors.index(sector)
+            bit = np.uint64(1) << np.uint64(code % MASK_BITS)
+            keep &= (self.masks[:, code // MASK_BITS] & bit) != 0
+        return np.flatnonzero(keep)
+
+    def page(self, indices, page, page_size):
+        """DataFrame com as linhas `indices` da página `page` (a contar de 0)."""
+        rows = indices[page * page_size:(page + 1) * page_size]
+        return pd.DataFrame({
+            "Paciente": self.patient_ids[rows],
+            "Tempo Total (min)": self.total_times[rows],
+            "Setores Visitados": [" -> ".join(self.results[row]["sectors_visited"]) for row in rows],
+            "Prioridade": np.where(self.high_priority[rows], "Alta", "Normal")
+        })
+
+    @staticmethod
+    def num_pages(num_rows, page_size):
+        return max(1, -(-num_rows // page_size))
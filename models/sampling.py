@@ -0,0 +1,172 @@
+# sampling.py: Matrizes de transição esparsas e amostragem O(1) por tabelas de alias
+from collections import namedtuple
+
+import numpy as np
+
+# Tamanho dos blocos de números aleatórios gerados de uma só vez
+DEFAULT_BLOCK_SIZE = 8192
+# Resultados de `next_sector` que terminam o percurso: saída do hospital ou fim sem "Saída"
+EXIT = -1
+END = -2
+
+
+class SparseTransitions(namedtuple("SparseTransitions", ["indptr", "indices", "data", "num_sectors"])):
+    """Matriz de transição em formato CSR: a linha i ocupa data[indptr[i]:indptr[i+1]]."""
+
+    @classmethod
+    def from_dense(cls, transition_probs, threshold=0.0):
+        """Mantém apenas as entradas acima de `threshold`."""
+        dense = np.asarray(transition_probs, dtype=float)
+        mask = dense > threshold
+        indptr = np.concatenate([[0], np.cumsum(mask.sum(axis=1))])
+        rows, cols = np.nonzero(mask)
+        return cls(indptr, cols, dense[rows, cols], dense.shape[0])
+
+    @classmethod
+    def from_any(cls, transition_probs):
+        """Aceita uma matriz densa, um SparseTransitions ou um dicionário CSR (JSON)."""
+        if isinstance(transition_probs, cls):
+            return transition_probs
+        if isinstance(transition_probs, dict):
+            indptr = np.asarray(transition_probs["indptr"], dtype=np.int64)
+            return cls(
+                indptr,
+                np.asarray(transition_probs["indices"], dtype=np.int64),
+                np.asarray(transition_probs["data"], dtype=float),
+                len(indptr) - 1
+            )
+        return cls.from_dense(transition_probs)
+
+    def to_dense(self):
+        dense = np.zeros((self.num_sectors, self.num_sectors))
+        rows = np.repeat(np.arange(self.num_sectors), np.diff(self.indptr))
+        dense[rows, self.indices] = self.data
+        return dense
+
+    def to_dict(self):
+        """Forma serializável em JSON (mesmas chaves aceites por `from_any`)."""
+        return {"indptr": self.indptr.tolist(), "indices": self.indices.tolist(), "data": self.data.tolist()}
+
+
+class AliasTable:
+    def __init__(self, transitions):
+        """Pré-calcula as tabelas de alias (Vose) de todas as linhas.
+
+        Cada linha é renormalizada (a saída é decidida antes do sorteio do
+        próximo setor); linhas sem probabilidade usam a distribuição uniforme
+        sobre todos os setores.
+        """
+        transitions = SparseTransitions.from_any(transitions)
+        num_sectors = transitions.num_sectors
+        self.num_sectors = num_sectors
+        self.uniform_rows = []
+        starts, cutoffs, firsts, aliases = [], [], [], []
+        offset = 0
+        for row in range(num_sectors):
+            lo, hi = transitions.indptr[row], transitions.indptr[row + 1]
+            indices = transitions.indices[lo:hi]
+            weights = np.clip(transitions.data[lo:hi], 0, None)
+            if weights.sum() <= 0:
+                self.uniform_rows.append(row)
+                indices = np.arange(num_sectors)
+                weights = np.ones(num_sectors)
+            cutoff, alias = self._build_row(weights / weights.sum())
+            starts.append(offset)
+            cutoffs.append(cutoff)
+            firsts.append(indices)
+            aliases.append(indices[alias])
+            offset += len(indices)
+        self.starts = starts + [offset]
+        # Listas Python: o acesso elemento a elemento é mais rápido do que em arrays numpy
+        self.cutoffs = np.concatenate(cutoffs).tolist()
+        self.targets = np.concatenate(firsts).tolist()
+        self.aliases = np.concatenate(aliases).tolist()
+
+    @staticmethod
+    def _build_row(probs):
+        k = len(probs)
+        scaled = probs * k
+        cutoff = np.ones(k)
+        alias = np.arange(k)
+        small = [i for i in range(k) if scaled[i] < 1.0]
+        large = [i for i in range(k) if scaled[i] >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            cutoff[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        return cutoff, alias
+
+    def sample(self, row, u):
+        """Próximo setor a partir da linha `row`, usando um único uniforme u em [0, 1)."""
+        start = self.starts[row]
+        k = self.starts[row + 1] - start
+        x = u * k
+        j = int(x)
+        if j == k:  # arredondamento com u muito próximo de 1
+            j -= 1
+        if x - j < self.cutoffs[start + j]:
+            return self.targets[start + j]
+        return self.aliases[start + j]
+
+
+class RandomBlock:
+    def __init__(self, rng, draw, block_size=DEFAULT_BLOCK_SIZE):
+        """Entrega sorteios um a um a partir de blocos pré-gerados por `draw(rng, n)`."""
+        self.rng = rng
+        self.draw = draw
+        self.block_size = block_size
+        self._block = []
+        self._pos = 0
+
+    def next(self):
+        if self._pos >= len(self._block):
+            self._block = self.draw(self.rng, self.block_size).tolist()
+            self._pos = 0
+        value = self._block[self._pos]
+        self._pos += 1
+        return value
+
+
+def uniform_block(rng, block_size=DEFAULT_BLOCK_SIZE):
+    return RandomBlock(rng, lambda r, n: r.random(n), block_size)
+
+
+def exponential_block(rng, block_size=DEFAULT_BLOCK_SIZE):
+    """Exponenciais de média 1 (multiplicar pela média do atendimento)."""
+    return RandomBlock(rng, lambda r, n: r.standard_exponential(n), block_size)
+
+
+class SampledRouting:
+    def __init__(self, router, exit_probs, means, priority, uniforms, exponentials, num_patients):
+        """Decisões de encaminhamento e tempos de atendimento sorteados.
+
+        Todos os pacientes começam no setor 0 com a mesma prioridade. Os
+        sorteios seguem a ordem do modelo: tempo de atendimento, saída e, se o
+        paciente continuar, o próximo setor pela tabela de alias.
+        """
+        self.num_patients = num_patients
+        self._router = router
+        self._exit_probs = exit_probs
+        self._means = means
+        self._priority = priority
+        self._uniforms = uniforms
+        self._exponentials = exponentials
+
+    def patient_id(self, patient):
+        return patient
+
+    def priority(self, patient):
+        return self._priority
+
+    def start_sector(self, patient):
+        return 0
+
+    def service_time(self, patient, sector):
+        return self._exponentials.next() * self._means[sector]
+
+    def next_sector(self, patient, sector):
+        if self._uniforms.next() < self._exit_probs[sector]:
+            return EXIT
+        return self._router.sample(sector, self._uniforms.next())
@@ -0,0 +1,151 @@
+# schedule.py: Escalas por turno (capacidades, chegadas e matrizes) numa simulação contínua
+import numpy as np
+
+from models.sampling import EXIT, SampledRouting
+
+TURNOS = ("manhã", "tarde", "noite")
+SHIFT_MINUTES = 480.0
+
+
+def busy_minutes(doctor_usage, start, end):
+    """Tempo-médico ocupado entre `start` e `end` (escalares ou vetores).
+
+    É o integral da escada de médicos ocupados dada pelos eventos
+    (instante, +1/-1) de `doctor_usage`, qualquer que seja o número de médicos.
+    """
+    usage = np.array(doctor_usage, dtype=float).reshape(-1, 2)
+    start, end = np.asarray(start, dtype=float), np.asarray(end, dtype=float)
+    if not len(usage):
+        return np.zeros(np.broadcast(start, end).shape)
+    order = np.argsort(usage[:, 0], kind="stable")
+    times = usage[order, 0]
+    busy = np.cumsum(usage[order, 1])
+    area = np.concatenate([[0.0], np.cumsum(busy[:-1] * np.diff(times))])
+
+    def integral(t):
+        event = np.searchsorted(times, t, side="right") - 1
+        last = np.maximum(event, 0)
+        return np.where(event >= 0, area[last] + busy[last] * (t - times[last]), 0.0)
+
+    return integral(end) - integral(start)
+
+
+class ShiftSchedule:
+    def __init__(self, turnos=TURNOS, shift_minutes=SHIFT_MINUTES, days=1, medicos=None,
+                 capacities=None, patients=None):
+        """Sequência de turnos de `shift_minutes` repetida durante `days` dias.
+
+        `medicos` = {turno: médicos}, `capacities` = {setor: {turno: servidores}}
+        e `patients` = {turno: chegadas por turno}. Depois do último turno o
+        ciclo continua (os pacientes ainda no hospital são atendidos com a
+        escala do turno seguinte).
+        """
+        self.turnos = list(turnos)
+        self.shift_minutes = float(shift_minutes)
+        self.days = int(days)
+        self.medicos = dict(medicos or {})
+        self.capacities = dict(capacities or {})
+        self.patients = dict(patients or {})
+        for turno in list(self.medicos) + list(self.patients):
+            if turno not in self.turnos:
+                raise ValueError(f"Turno desconhecido na escala: {turno}")
+
+    @classmethod
+    def from_config(cls, config):
+        """Lê `config["schedule"]`; turnos sem valores usam os da configuração base."""
+        schedule = config["schedule"]
+        turnos = schedule.get("turnos", TURNOS)
+        medicos = {turno: config["medicos_disponiveis"] for turno in turnos}
+        medicos.update(schedule.get("medicos", {}))
+        patients = {turno: config["num_patients"] for turno in turnos}
+        patients.update(schedule.get("patients", {}))
+        return cls(
+            turnos,
+            schedule.get("shift_minutes", SHIFT_MINUTES),
+            schedule.get("days", 1),
+            medicos,
+            schedule.get("capacities", {}),
+            patients
+        )
+
+    @property
+    def num_shifts(self):
+        return len(self.turnos) * self.days
+
+    @property
+    def horizon(self):
+        return self.num_shifts * self.shift_minutes
+
+    def shift_at(self, time):
+        """Índice do turno (contado desde o início) em que cai o instante `time`."""
+        return int(time // self.shift_minutes)
+
+    def turno_of(self, shift):
+        return self.turnos[shift % len(self.turnos)]
+
+    def label(self, shift):
+        return f"Dia {shift // len(self.turnos) + 1} - {self.turno_of(shift)}"
+
+    def doctor_minutes(self, end):
+        """Tempo-médico disponível entre 0 e `end` (a escala repete-se depois do último turno)."""
+        shifts = np.arange(int(np.ceil(end / self.shift_minutes)))
+        medicos = np.array([self.medicos[self.turno_of(shift)] for shift in shifts], dtype=float)
+        return float(np.sum(medicos * (np.minimum(end, (shifts + 1) * self.shift_minutes) - shifts * self.shift_minutes)))
+
+    def capacity(self, sector, shift):
+        return self.capacities.get(sector, {}).get(self.turno_of(shift), 1)
+
+    def arrivals(self, rng):
+        """Instantes de chegada, uniformes dentro de cada turno e por ordem crescente."""
+        times = [
+            (shift + np.sort(rng.random(self.patients[self.turno_of(shift)]))) * self.shift_minutes
+            for shift in range(self.num_shifts)
+        ]
+        return np.concatenate(times) if times else np.zeros(0)
+
+    def shift_metrics(self, results, doctor_usage):
+        """Métricas de cada turno, tiradas de uma única execução contínua.
+
+        Os pacientes contam no turno de chegada; a ocupação dos médicos é o
+        tempo-médico ocupado dentro da janela do turno sobre a capacidade.
+        """
+        arrivals = np.array([r["arrival_time"] for r in results])
+        departures = np.array([r["departure_time"] for r in results])
+        service = np.array([r["total_waiting_time"] for r in results])
+        shifts = (arrivals // self.shift_minutes).astype(int) if len(results) else np.zeros(0, dtype=int)
+
+        starts = np.arange(self.num_shifts) * self.shift_minutes
+        busy = busy_minutes(doctor_usage, starts, starts + self.shift_minutes)
+
+        rows = []
+        for shift in range(self.num_shifts):
+            start = shift * self.shift_minutes
+            members = shifts == shift
+            medicos = self.medicos[self.turno_of(shift)]
+            rows.append({
+                "Turno": self.label(shift),
+                "Início (min)": start,
+                "Médicos": medicos,
+                "Chegadas": int(members.sum()),
+                "Tempo Médio no Sistema (min)": float(np.mean(departures[members] - arrivals[members])) if members.any() else 0.0,
+                "Tempo Médio de Atendimento (min)": float(np.mean(service[members])) if members.any() else 0.0,
+                "Ocupação Médicos (%)": 100.0 * float(busy[shift]) / (medicos * self.shift_minutes)
+            })
+        return rows
+
+
+class ScheduledRouting(SampledRouting):
+    def __init__(self, routers, exit_probs, means, priority, uniforms, exponentials, arrival_times, schedule, clock):
+        """Encaminhamento sorteado com a matriz do turno em vigor no instante `clock()`."""
+        super().__init__(routers[0], exit_probs[0], means, priority, uniforms, exponentials, len(arrival_times))
+        self._routers = routers
+        self._exit_probs_by_turno = exit_probs
+        self.arrival_times = arrival_times
+        self._schedule = schedule
+        self._clock = clock
+
+    def next_sector(self, patient, sector):
+        turno = self._schedule.shift_at(self._clock()) % len(self._routers)
+        if self._uniforms.next() < self._exit_probs_by_turno[turno][sector]:
+            return EXIT
+        return self._routers[turno].sample(sector, self._uniforms.next())
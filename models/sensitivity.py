@@ -0,0 +1,269 @@
+# sensitivity.py: Análise de sensibilidade global (Morris e Sobol)
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from models.compiled_config import GRAVIDADE_SERVICE_FACTORS
+from models.markov_analytics import routing_matrix, expected_visits, service_means, expected_total_time
+from models.batch_runner import run_replication, time_in_system
+
+GRAVIDADE_LEVELS = ["baixa", "média", "alta"]
+# Limites das probabilidades de saída: a cadeia precisa de ser absorvente
+MIN_EXIT_PROB = 1e-3
+MAX_EXIT_PROB = 0.99
+
+# `tempo_medio` é só a soma dos atendimentos (não depende dos médicos);
+# `tempo_no_sistema` inclui as filas e é a métrica por omissão
+ENGINE_METRICS = {
+    "analytic": ["tempo_no_sistema", "tempo_medio", "carga_por_medico", "makespan"],
+    "simulation": ["tempo_no_sistema", "tempo_medio", "ocupacao_medicos"]
+}
+
+
+class SensitivityProblem:
+    def __init__(self, config, spread=0.5):
+        """Define os fatores perturbados a partir de uma configuração.
+
+        Cada entrada de `transition_base` e `exit_probs` varia ±`spread`
+        (relativo, com largura mínima de 0.05); os médicos variam entre metade e
+        o dobro do valor atual e a gravidade percorre os três níveis.
+        """
+        self.config = config
+        self.sectors = list(config["sectors"])
+        num_sectors = len(self.sectors)
+        base = np.array(config["transition_base"], dtype=float)
+        exits = np.array(config["exit_probs"], dtype=float)
+
+        names, lower, upper = [], [], []
+        for i, origem in enumerate(self.sectors):
+            for j, destino in enumerate(self.sectors):
+                width = spread * max(base[i, j], 0.05)
+                names.append(f"{origem} → {destino}")
+                lower.append(max(0.0, base[i, j] - width))
+                upper.append(min(1.0, base[i, j] + width))
+        for i, setor in enumerate(self.sectors):
+            width = spread * max(exits[i], 0.05)
+            names.append(f"Saída após {setor}")
+            lower.append(max(MIN_EXIT_PROB, exits[i] - width))
+            upper.append(min(MAX_EXIT_PROB, exits[i] + width))
+        medicos = config["medicos_disponiveis"]
+        names += ["Médicos", "Gravidade"]
+        lower += [max(1, medicos // 2), 0.0]
+        upper += [max(2, 2 * medicos), float(len(GRAVIDADE_LEVELS))]
+
+        self.names = names
+        self.lower = np.array(lower)
+        self.upper = np.array(upper)
+        self.num_factors = len(names)
+        self._num_transition = num_sectors * num_sectors
+
+    def scale(self, unit):
+        """Converte amostras do hipercubo [0, 1)^k nos parâmetros do modelo."""
+        values = self.lower + np.asarray(unit) * (self.upper - self.lower)
+        num_sectors = len(self.sectors)
+        n_trans = self._num_transition
+        gravidade_idx = np.minimum(values[:, -1].astype(int), len(GRAVIDADE_LEVELS) - 1)
+        return {
+            "transition_base": values[:, :n_trans].reshape(-1, num_sectors, num_sectors),
+            "exit_probs": values[:, n_trans:n_trans + num_sectors],
+            "medicos": np.rint(values[:, -2]).astype(int),
+            "gravidade": [GRAVIDADE_LEVELS[g] for g in gravidade_idx]
+        }
+
+    def to_configs(self, unit):
+        """Gera uma configuração do simulador por ponto amostrado."""
+        params = self.scale(unit)
+        configs = []
+        for k in range(len(params["medicos"])):
+            config = dict(self.config)
+            config.pop("transition_probs", None)
+            config["transition_base"] = params["transition_base"][k].tolist()
+            config["exit_probs"] = params["exit_probs"][k].tolist()
+            config["medicos_disponiveis"] = int(params["medicos"][k])
+            config["gravidade"] = params["gravidade"][k]
+            configs.append(config)
+        return configs
+
+
+def evaluate_analytic(problem, unit):
+    """Avalia todos os pontos de uma vez pela cadeia de Markov absorvente.
+
+    `tempo_medio` é o valor esperado de `total_waiting_time` (só
+    atendimentos); `carga_por_medico` os minutos de consulta por médico e
+    `makespan` um limite inferior da duração do atendimento de todos os
+    pacientes (setor mais carregado). `tempo_no_sistema` aproxima o tempo
+    médio no hospital com as filas: como todos chegam em t = 0, as saídas
+    espalham-se entre o tempo de atendimento e o fim do setor mais carregado.
+    """
+    params = problem.scale(unit)
+    sectors = problem.sectors
+    num_patients = problem.config["num_patients"]
+    gravidade_factor = np.array([GRAVIDADE_SERVICE_FACTORS[g] for g in params["gravidade"]])
+
+    visits = expected_visits(routing_matrix(params["transition_base"], params["exit_probs"]))
+    means = service_means(sectors, gravidade_factor)
+    workload = num_patients * visits * means
+    capacity = np.ones_like(workload)
+    if "Consulta" in sectors:
+        consulta = sectors.index("Consulta")
+        capacity[:, consulta] = params["medicos"]
+        carga_por_medico = workload[:, consulta] / params["medicos"]
+    else:
+        carga_por_medico = np.zeros(len(workload))
+    tempo_medio = expected_total_time(visits, means)
+    makespan = (workload / capacity).max(axis=1)
+    return {
+        "tempo_no_sistema": (tempo_medio + np.maximum(makespan, tempo_medio)) / 2,
+        "tempo_medio": tempo_medio,
+        "carga_por_medico": carga_por_medico,
+        "makespan": makespan
+    }
+
+
+def _simulate_point(config, seed):
+    session = run_replication(config, seed)
+    results = session["results"]
+    if not results:
+        return 0.0, 0.0, session["stats"]["doctor_occupation"]
+    times = [r["total_waiting_time"] for r in results]
+    return float(np.mean(time_in_system(results))), float(np.mean(times)), session["stats"]["doctor_occupation"]
+
+
+def evaluate_simulation(problem, unit, workers=1, seed=0):
+    """Avalia cada ponto com uma simulação completa (em paralelo se `workers` > 1)."""
+    configs = problem.to_configs(unit)
+    seeds = [seed] * len(configs)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outputs = list(executor.map(_simulate_point, configs, seeds, chunksize=8))
+    else:
+        outputs = [_simulate_point(config, s) for config, s in zip(configs, seeds)]
+    outputs = np.array(outputs, dtype=float).reshape(-1, 3)
+    return {"tempo_no_sistema": outputs[:, 0], "tempo_medio": outputs[:, 1], "ocupacao_medicos": outputs[:, 2]}
+
+
+def morris_sample(num_factors, trajectories, levels=4, rng=None):
+    """Trajetórias de Morris (um fator alterado por passo) no hipercubo unitário."""
+    rng = rng or np.random.default_rng()
+    delta = levels / (2 * (levels - 1))
+    grid = np.arange(levels // 2) / (levels - 1)
+    samples = np.empty((trajectories, num_factors + 1, num_factors))
+    for t in range(trajectories):
+        point = rng.choice(grid, size=num_factors)
+        samples[t, 0] = point
+        for step, factor in enumerate(rng.permutation(num_factors)):
+            point = point.copy()
+            point[factor] += delta
+            samples[t, step + 1] = point
+    return samples, delta
+
+
+def morris_indices(samples, outputs, delta):
+    """Efeitos elementares: média (mu), média absoluta (mu*) e desvio (sigma)."""
+    trajectories, steps, num_factors = samples.shape
+    outputs = outputs.reshape(trajectories, steps)
+    changed = np.abs(np.diff(samples, axis=1)).argmax(axis=2)
+    effects = np.empty((trajectories, num_factors))
+    effects[np.arange(trajectories)[:, None], changed] = np.diff(outputs, axis=1) / delta
+    return {
+        "mu": effects.mean(axis=0),
+        "mu_star": np.abs(effects).mean(axis=0),
+        "sigma": effects.std(axis=0, ddof=1) if trajectories > 1 else np.zeros(num_factors)
+    }
+
+
+def sobol_sample(num_factors, n, rng=None):
+    """Matrizes A, B e AB_i do esquema de Saltelli, empilhadas: n * (k + 2) pontos."""
+    rng = rng or np.random.default_rng()
+    a = rng.random((n, num_factors))
+    b = rng.random((n, num_factors))
+    ab = np.repeat(a[None], num_factors, axis=0)
+    ab[np.arange(num_factors), :, np.arange(num_factors)] = b.T
+    return np.concatenate([a, b, ab.reshape(-1, num_factors)])
+
+
+def sobol_indices(outputs, num_factors, bootstrap=100, rng=None):
+    """Índices de primeira ordem (Saltelli 2010) e totais (Jansen) com IC de 95%."""
+    rng = rng or np.random.default_rng()
+    n = len(outputs) // (num_factors + 2)
+    f_a, f_b = outputs[:n], outputs[n:2 * n]
+    f_ab = outputs[2 * n:].reshape(num_factors, n)
+
+    def estimate(idx):
+        fa, fb, fab = f_a[idx], f_b[idx], f_ab[:, idx]
+        variance = np.var(np.concatenate([fa, fb], axis=-1), axis=-1)
+        variance = np.where(variance > 0, variance, np.inf)
+        first = np.mean(fb * (fab - fa), axis=-1) / variance
+        total = 0.5 * np.mean((fa - fab) ** 2, axis=-1) / variance
+        return first, total
+
+    first, total = estimate(np.arange(n))
+    resamples = rng.integers(0, n, (bootstrap, n))
+    boot_first, boot_total = _bootstrap(estimate, resamples)
+    return {
+        "S1": first,
+        "S1_conf": 1.96 * boot_first.std(axis=0),
+        "ST": total,
+        "ST_conf": 1.96 * boot_total.std(axis=0)
+    }
+
+
+def _bootstrap(estimate, resamples):
+    # Uma reamostragem de cada vez: k x n cabe em memória mesmo com muitos setores
+    firsts, totals = zip(*(estimate(idx) for idx in resamples))
+    return np.array(firsts), np.array(totals)
+
+
+def analyze(config, method="sobol", engine="analytic", metric="tempo_no_sistema", samples=1024,
+            spread=0.5, seed=0, workers=1, budget_seconds=300.0):
+    """Executa a análise e devolve a classificação dos parâmetros mais influentes.
+
+    `samples` é o número de trajetórias (Morris) ou o tamanho base n (Sobol,
+    n * (k + 2) avaliações). Um lote piloto mede o custo por avaliação e reduz
+    `samples` se necessário para respeitar `budget_seconds`.
+    """
+    if metric not in ENGINE_METRICS[engine]:
+        raise ValueError(f"Métrica '{metric}' indisponível no motor '{engine}'.")
+    problem = SensitivityProblem(config, spread)
+    k = problem.num_factors
+    rng = np.random.default_rng(seed)
+
+    def evaluate(unit):
+        if engine == "analytic":
+            return evaluate_analytic(problem, unit)[metric]
+        return evaluate_simulation(problem, unit, workers, seed)[metric]
+
+    start = time.perf_counter()
+    pilot = min(max(workers, 4), 32)
+    evaluate(rng.random((pilot, k)))
+    per_point = (time.perf_counter() - start) / pilot
+    points_per_sample = k + 1 if method == "morris" else k + 2
+    affordable = int(budget_seconds / max(per_point * points_per_sample, 1e-9))
+    samples = max(2, min(samples, affordable))
+
+    if method == "morris":
+        unit, delta = morris_sample(k, samples, rng=rng)
+        outputs = evaluate(unit.reshape(-1, k))
+        indices = morris_indices(unit, outputs, delta)
+        key = "mu_star"
+    else:
+        unit = sobol_sample(k, samples, rng=rng)
+        outputs = evaluate(unit)
+        indices = sobol_indices(outputs, k, rng=rng)
+        key = "ST"
+
+    ranking = [
+        {"Parâmetro": name, **{index: float(values[i]) for index, values in indices.items()}}
+        for i, name in enumerate(problem.names)
+    ]
+    ranking.sort(key=lambda row: row[key], reverse=True)
+    return {
+        "method": method,
+        "engine": engine,
+        "metric": metric,
+        "samples": samples,
+        "evaluations": len(outputs),
+        "seconds": time.perf_counter() - start,
+        "ranking": ranking
+    }
@@ -0,0 +1,243 @@
+# surrogate.py: Modelo substituto (processo gaussiano) das métricas da simulação
+import json
+import logging
+import os
+
+import numpy as np
+
+from models.compiled_config import config_hash, GRAVIDADE_SERVICE_FACTORS
+from models.experiments import ExperimentPlan, run_plan
+from models.markov_model import TURNO_FACTORS
+
+logger = logging.getLogger(__name__)
+
+SURROGATE_METRICS = ("Tempo Médio (min)", "Ocupação Médicos (%)")
+FEATURE_KEYS = ("num_patients", "medicos_disponiveis", "turno", "gravidade")
+TURNOS = tuple(TURNO_FACTORS)
+GRAVIDADES = tuple(GRAVIDADE_SERVICE_FACTORS)
+# Candidatos de hiperparâmetros avaliados pela verosimilhança marginal
+HYPER_CANDIDATES = 48
+
+
+def features(points):
+    """Codifica pontos {num_patients, medicos_disponiveis, turno, gravidade} numa matriz.
+
+    O número de pacientes entra em escala logarítmica; turno e gravidade
+    pelos fatores que o modelo aplica (matriz e tempo de atendimento).
+    """
+    return np.array([
+        [
+            np.log(max(point["num_patients"], 1)),
+            float(point["medicos_disponiveis"]),
+            TURNO_FACTORS.get(point["turno"], 1.0),
+            GRAVIDADE_SERVICE_FACTORS.get(point["gravidade"], 1.0)
+        ]
+        for point in points
+    ], dtype=float).reshape(-1, len(FEATURE_KEYS))
+
+
+class GaussianProcess:
+    def __init__(self, lengthscales=None, noise=1e-2):
+        """Regressão por processo gaussiano com núcleo RBF (um comprimento por dimensão).
+
+        As entradas são reescaladas para [0, 1] e a saída padronizada; os
+        hiperparâmetros são escolhidos por pesquisa aleatória da
+        verosimilhança marginal.
+        """
+        self.lengthscales = None if lengthscales is None else np.asarray(lengthscales, dtype=float)
+        self.noise = noise
+
+    def _kernel(self, A, B, lengthscales):
+        diff = (A[:, None, :] - B[None, :, :]) / lengthscales
+        return np.exp(-0.5 * np.sum(diff ** 2, axis=-1))
+
+    def _log_likelihood(self, X, y, lengthscales, noise):
+        K = self._kernel(X, X, lengthscales) + (noise + 1e-8) * np.eye(len(X))
+        try:
+            L = np.linalg.cholesky(K)
+        except np.linalg.LinAlgError:
+            return -np.inf
+        alpha = np.linalg.solve(L.T, np.linalg.solve(L, y))
+        return -0.5 * y @ alpha - np.sum(np.log(np.diag(L)))
+
+    def fit(self, X, y, optimize=True, seed=0):
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.low = X.min(axis=0)
+        self.span = np.where(X.max(axis=0) > self.low, X.max(axis=0) - self.low, 1.0)
+        self.y_mean = y.mean()
+        self.y_std = y.std() if y.std() > 0 else 1.0
+        self.X = (X - self.low) / self.span
+        self.y = (y - self.y_mean) / self.y_std
+        if optimize or self.lengthscales is None:
+            rng = np.random.default_rng(seed)
+            candidates = [(np.full(X.shape[1], 0.5), 1e-2)]
+            if self.lengthscales is not None:
+                candidates.append((self.lengthscales, self.noise))
+            for _ in range(HYPER_CANDIDATES):
+                candidates.append((10 ** rng.uniform(-1.3, 1.0, X.shape[1]), 10 ** rng.uniform(-4, -0.5)))
+            scores = [self._log_likelihood(self.X, self.y, ls, noise) for ls, noise in candidates]
+            self.lengthscales, self.noise = candidates[int(np.argmax(scores))]
+        K = self._kernel(self.X, self.X, self.lengthscales) + (self.noise + 1e-8) * np.eye(len(self.X))
+        self._L = np.linalg.cholesky(K)
+        self._alpha = np.linalg.solve(self._L.T, np.linalg.solve(self._L, self.y))
+        return self
+
+    def predict(self, X):
+        """Média e desvio-padrão previstos (nas unidades originais)."""
+        Xs = (np.asarray(X, dtype=float) - self.low) / self.span
+        Ks = self._kernel(Xs, self.X, self.lengthscales)
+        mean = Ks @ self._alpha
+        v = np.linalg.solve(self._L, Ks.T)
+        var = np.clip(1.0 + self.noise - np.sum(v ** 2, axis=0), 1e-12, None)
+        return mean * self.y_std + self.y_mean, np.sqrt(var) * self.y_std
+
+
+def surrogate_key(config):
+    """Identifica o hospital (setores, matriz base, saídas) para o qual o modelo vale.
+
+    Pacientes, médicos, turno e gravidade são entradas do modelo e não entram
+    na chave.
+    """
+    fixed = {key: config[key] for key in ("sectors", "transition_base", "exit_probs", "prioridade_ativa") if key in config}
+    if "service_means" in config:
+        fixed["service_means"] = config["service_means"]
+    return config_hash(fixed)
+
+
+class SimulationSurrogate:
+    def __init__(self, base_config):
+        """Emulador das métricas da simulação para um hospital fixo.
+
+        Acumula pontos simulados (pacientes, médicos, turno, gravidade) e as
+        métricas de `SURROGATE_METRICS`, com um processo gaussiano por métrica.
+        """
+        self.base_config = base_config
+        self.key = surrogate_key(base_config)
+        self.points = []
+        self.targets = {metric: [] for metric in SURROGATE_METRICS}
+        self.models = {}
+
+    @property
+    def trained(self):
+        return bool(self.models)
+
+    def add_rows(self, rows):
+        """Acrescenta linhas de `run_plan` (ou `summarize` com as chaves do ponto).
+
+        Cada linha deve trazer os valores executados de `FEATURE_KEYS` e de
+        `prioridade_ativa` (não se completam com a configuração base, que pode
+        já não ser a da simulação). Linhas com outra `prioridade_ativa` são de
+        outro hospital e são ignoradas.
+        """
+        for row in rows:
+            missing = [key for key in FEATURE_KEYS + ("prioridade_ativa",) if key not in row]
+            if missing:
+                raise ValueError(f"Linha sem os valores do ponto simulado: {', '.join(missing)}.")
+            if row["prioridade_ativa"] != self.base_config.get("prioridade_ativa"):
+                continue
+            point = {key: row[key] for key in FEATURE_KEYS}
+            self.points.append(point)
+            for metric in SURROGATE_METRICS:
+                self.targets[metric].append(float(row[metric]))
+
+    def fit(self, optimize=True):
+        if len(self.points) < 3:
+            self.models = {}
+            return self
+        X = features(self.points)
+        self.models = {
+            metric: GaussianProcess().fit(X, self.targets[metric], optimize=optimize)
+            for metric in SURROGATE_METRICS
+        }
+        return self
+
+    def predict(self, points):
+        """{métrica: (médias, desvios)} para os pontos; None se ainda não treinado."""
+        if not self.trained:
+            return None
+        X = features(points)
+        return {metric: model.predict(X) for metric, model in self.models.items()}
+
+    def candidates(self, patient_factors=None, medicos_factors=None, turnos=TURNOS, gravidades=GRAVIDADES):
+        """Grelha de pontos à volta da configuração base (fatores de 0,5 a 2)."""
+        patient_factors = np.linspace(0.5, 2.0, 7) if patient_factors is None else patient_factors
+        medicos_factors = np.linspace(0.5, 2.0, 7) if medicos_factors is None else medicos_factors
+        patients = sorted({max(1, int(self.base_config["num_patients"] * f)) for f in patient_factors})
+        medicos = sorted({max(1, int(self.base_config["medicos_disponiveis"] * f)) for f in medicos_factors})
+        return [
+            {"num_patients": n, "medicos_disponiveis": m, "turno": t, "gravidade": g}
+            for n in patients for m in medicos for t in turnos for g in gravidades
+        ]
+
+    def suggest(self, count, candidates=None, seed=0):
+        """Pontos onde o modelo está menos seguro (maior desvio relativo somado às métricas).
+
+        Sem modelo treinado, escolhe pontos ao acaso na grelha.
+        """
+        candidates = self.candidates() if candidates is None else candidates
+        known = {tuple(point[key] for key in FEATURE_KEYS) for point in self.points}
+        candidates = [c for c in candidates if tuple(c[key] for key in FEATURE_KEYS) not in known]
+        if not candidates:
+            return []
+        if not self.trained:
+            rng = np.random.default_rng(seed)
+            picks = rng.choice(len(candidates), size=min(count, len(candidates)), replace=False)
+            return [candidates[i] for i in picks]
+        predictions = self.predict(candidates)
+        uncertainty = sum(std / self.models[metric].y_std for metric, (_, std) in predictions.items())
+        return [candidates[i] for i in np.argsort(-uncertainty)[:count]]
+
+    def refine(self, count, workers=None, seed=0, pool=None):
+        """Simula os `count` pontos sugeridos, acrescenta-os e volta a treinar.
+
+        `pool` é passado a `run_plan` (pool de simulação partilhado).
+        """
+        points = self.suggest(count, seed=seed + len(self.points))
+        if not points:
+            return []
+        plan = ExperimentPlan.from_points(self.base_config, points, base_seed=seed)
+        rows = list(run_plan(plan, workers=workers, pool=pool))
+        self.add_rows(rows)
+        self.fit()
+        logger.info(f"Modelo substituto {self.key}: {len(self.points)} pontos")
+        return rows
+
+    def to_dict(self):
+        return {
+            "key": self.key,
+            "points": self.points,
+            "targets": self.targets,
+            "hyperparameters": {
+                metric: {"lengthscales": model.lengthscales.tolist(), "noise": model.noise}
+                for metric, model in self.models.items()
+            }
+        }
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.key}.json")
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        return path
+
+    @classmethod
+    def load(cls, base_config, directory):
+        """Modelo gravado para o hospital de `base_config`, ou um novo vazio."""
+        surrogate = cls(base_config)
+        path = os.path.join(directory, f"{surrogate.key}.json")
+        if not os.path.exists(path):
+            return surrogate
+        with open(path, "r") as f:
+            data = json.load(f)
+        surrogate.points = data["points"]
+        surrogate.targets = {metric: data["targets"].get(metric, []) for metric in SURROGATE_METRICS}
+        hyper = data.get("hyperparameters", {})
+        if len(surrogate.points) >= 3:
+            X = features(surrogate.points)
+            surrogate.models = {}
+            for metric in SURROGATE_METRICS:
+                params = hyper.get(metric, {})
+                model = GaussianProcess(params.get("lengthscales"), params.get("noise", 1e-2))
+                surrogate.models[metric] = model.fit(X, surrogate.targets[metric], optimize=not params)
+        return surrogate
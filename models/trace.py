@@ -0,0 +1,147 @@
+# trace.py: Traços de pacientes (percursos e tempos) para reprodução sob nova configuração
+import json
+
+import numpy as np
+
+from models.sampling import EXIT, END
+
+
+class PatientTrace:
+    def __init__(self, patient_ids, priorities, offsets, sectors, service_times, exited, sector_names):
+        """Traço colunar: o paciente k ocupa as posições offsets[k]:offsets[k+1].
+
+        `sectors` guarda o código (índice em `sector_names`) de cada setor
+        visitado, `service_times` o tempo de atendimento de cada visita e
+        `exited` se o percurso terminou em "Saída".
+        """
+        self.patient_ids = np.asarray(patient_ids, dtype=np.int64)
+        self.priorities = np.asarray(priorities, dtype=np.int8)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.sectors = np.asarray(sectors, dtype=np.int32)
+        self.service_times = np.asarray(service_times, dtype=float)
+        self.exited = np.asarray(exited, dtype=bool)
+        self.sector_names = list(sector_names)
+
+    def __len__(self):
+        return len(self.patient_ids)
+
+    @classmethod
+    def from_results(cls, results, sector_names, service_means=None):
+        """Constrói o traço a partir da lista `results` de uma simulação ou sessão.
+
+        Sessões antigas não guardam `service_times`; nesse caso o tempo total
+        do paciente é repartido pelas visitas em proporção ao tempo médio de
+        cada setor, `service_means` = {setor: média} (exato quando há uma só
+        visita; sem médias, a repartição é igual).
+        """
+        sector_names = list(sector_names)
+        codes = {name: idx for idx, name in enumerate(sector_names)}
+        service_means = service_means or {}
+        means = np.array([service_means.get(name, 1.0) for name in sector_names], dtype=float)
+        patient_ids, priorities, offsets, sectors, times, exited = [], [], [0], [], [], []
+        for r in results:
+            path = r["sectors_visited"]
+            ended = bool(path) and path[-1] == "Saída"
+            visits = path[:-1] if ended else path
+            if not visits:
+                continue
+            try:
+                visit_codes = [codes[name] for name in visits]
+            except KeyError as e:
+                raise ValueError(f"Setor {e} do traço não existe na configuração.")
+            if r.get("service_times") is not None and len(r["service_times"]) == len(visits):
+                visit_times = list(r["service_times"])
+            else:
+                weights = means[visit_codes]
+                visit_times = list(r["total_waiting_time"] * weights / weights.sum())
+            patient_ids.append(r["patient_id"])
+            priorities.append(-1 if r.get("priority") == "Alta" else 0)
+            sectors.extend(visit_codes)
+            times.extend(visit_times)
+            offsets.append(len(sectors))
+            exited.append(ended)
+        return cls(patient_ids, priorities, offsets, sectors, times, exited, sector_names)
+
+    @classmethod
+    def from_session(cls, session_data, service_means=None):
+        return cls.from_results(session_data["results"], session_data["config"]["sectors"], service_means)
+
+    @classmethod
+    def load(cls, path, service_means=None):
+        """Lê um traço gravado com `save` (.npz) ou um ficheiro de sessão (.json)."""
+        if path.endswith(".npz"):
+            with np.load(path, allow_pickle=False) as npz:
+                data = {key: npz[key] for key in npz.files}
+            data["sector_names"] = [str(name) for name in data["sector_names"]]
+            return cls.from_columnar(data)
+        with open(path, "r") as f:
+            return cls.from_session(json.load(f), service_means)
+
+    @classmethod
+    def from_columnar(cls, data):
+        """Aceita o dicionário produzido por `to_columnar`."""
+        return cls(
+            data["patient_ids"], data["priorities"], data["offsets"], data["sectors"],
+            data["service_times"], data["exited"], data["sector_names"]
+        )
+
+    def to_columnar(self):
+        return {
+            "patient_ids": self.patient_ids,
+            "priorities": self.priorities,
+            "offsets": self.offsets,
+            "sectors": self.sectors,
+            "service_times": self.service_times,
+            "exited": self.exited,
+            "sector_names": np.array(self.sector_names)
+        }
+
+    def save(self, path):
+        """Grava o traço em formato colunar comprimido (.npz)."""
+        np.savez_compressed(path, **self.to_columnar())
+
+    def for_sectors(self, sector_names):
+        """Recodifica os setores para a ordem de `sector_names` (nova configuração)."""
+        codes = {name: idx for idx, name in enumerate(sector_names)}
+        missing = [name for name in self.sector_names if name not in codes]
+        used = set(self.sectors.tolist())
+        if any(self.sector_names.index(name) in used for name in missing):
+            raise ValueError(f"Setores do traço ausentes na configuração: {missing}")
+        mapping = np.array([codes.get(name, -1) for name in self.sector_names], dtype=np.int32)
+        return PatientTrace(
+            self.patient_ids, self.priorities, self.offsets, mapping[self.sectors],
+            self.service_times, self.exited, sector_names
+        )
+
+
+class TraceRouting:
+    def __init__(self, trace, sectors):
+        """Decisões de encaminhamento e tempos de atendimento lidos de um traço."""
+        trace = trace.for_sectors(sectors)
+        self.num_patients = len(trace)
+        self._ids = trace.patient_ids.tolist()
+        self._priorities = trace.priorities.tolist()
+        self._offsets = trace.offsets.tolist()
+        self._sectors = trace.sectors.tolist()
+        self._times = trace.service_times.tolist()
+        self._exited = trace.exited.tolist()
+        self._position = self._offsets[:-1]
+
+    def patient_id(self, patient):
+        return self._ids[patient]
+
+    def priority(self, patient):
+        return self._priorities[patient]
+
+    def start_sector(self, patient):
+        return self._sectors[self._offsets[patient]]
+
+    def service_time(self, patient, sector):
+        return self._times[self._position[patient]]
+
+    def next_sector(self, patient, sector):
+        position = self._position[patient] + 1
+        self._position[patient] = position
+        if position < self._offsets[patient + 1]:
+            return self._sectors[position]
+        return EXIT if self._exited[patient] else END
@@ -0,0 +1,117 @@
+# transition_matrix.py: Matriz de transição editável em bloco, com importação/exportação CSV e YAML
+import io
+
+import numpy as np
+import pandas as pd
+
+# Valores iniciais de uma célula nova (os mesmos que o Planejador usava por omissão)
+DEFAULT_TRANSITION = 0.3
+DEFAULT_EXIT = 0.1
+EXIT_COLUMN = "Saída"
+SECTOR_COLUMN = "Setor"
+# Desvio máximo do total de cada linha em relação a 1
+ROW_TOLERANCE = 0.01
+
+
+class TransitionMatrix:
+    def __init__(self, sectors, transitions=None, exits=None):
+        """Probabilidades de transição (S x S) e de saída (S) de uma lista de setores.
+
+        Os valores ficam em arrays numpy; a interface edita-os como uma única
+        tabela (`to_frame` / `from_frame`) em vez de um campo por célula.
+        """
+        self.sectors = list(sectors)
+        size = len(self.sectors)
+        self.transitions = (np.full((size, size), DEFAULT_TRANSITION) if transitions is None
+                            else np.array(transitions, dtype=float).reshape(size, size))
+        self.exits = np.full(size, DEFAULT_EXIT) if exits is None else np.array(exits, dtype=float).reshape(size)
+
+    def resized(self, sectors):
+        """Matriz para outra lista de setores, mantendo os valores dos setores em comum."""
+        sectors = list(sectors)
+        matrix = TransitionMatrix(sectors)
+        old = {sector: idx for idx, sector in enumerate(self.sectors)}
+        new_idx = np.array([i for i, sector in enumerate(sectors) if sector in old], dtype=int)
+        old_idx = np.array([old[sectors[i]] for i in new_idx], dtype=int)
+        matrix.transitions[np.ix_(new_idx, new_idx)] = self.transitions[np.ix_(old_idx, old_idx)]
+        matrix.exits[new_idx] = self.exits[old_idx]
+        return matrix
+
+    def to_frame(self):
+        """Tabela com uma linha por origem e as colunas destino + `Saída`."""
+        frame = pd.DataFrame(self.transitions, index=self.sectors, columns=self.sectors)
+        frame[EXIT_COLUMN] = self.exits
+        frame.index.name = SECTOR_COLUMN
+        return frame
+
+    @classmethod
+    def from_frame(cls, frame, sectors=None):
+        """Lê a tabela de `to_frame` (colunas em falta contam como erro de formato)."""
+        sectors = list(frame.index) if sectors is None else list(sectors)
+        missing = [column for column in sectors + [EXIT_COLUMN] if column not in frame.columns]
+        if missing:
+            raise ValueError(f"Colunas em falta na matriz: {', '.join(map(str, missing))}.")
+        values = frame.loc[sectors, sectors].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        exits = pd.to_numeric(frame.loc[sectors, EXIT_COLUMN], errors="coerce").to_numpy(dtype=float)
+        return cls([str(sector) for sector in sectors], values, exits)
+
+    def row_totals(self):
+        return self.transitions.sum(axis=1) + self.exits
+
+    def errors(self, tol=ROW_TOLERANCE):
+        """Mensagens de validação (valores inválidos e linhas que não somam 1), numa só passagem."""
+        values = np.column_stack([self.transitions, self.exits])
+        messages = []
+        bad_cells = np.flatnonzero(np.any(~np.isfinite(values) | (values < 0) | (values > 1), axis=1))
+        for i in bad_cells:
+            messages.append(f"Probabilidades para {self.sectors[i]} devem estar entre 0 e 1.")
+        totals = self.row_totals()
+        for i in np.flatnonzero(np.abs(totals - 1.0) > tol):
+            if i not in bad_cells:
+                messages.append(f"Probabilidades para {self.sectors[i]} devem somar 1 (atual: {totals[i]:.2f}).")
+        return messages
+
+    def to_config(self):
+        """Campos `sectors`, `transition_base` e `exit_probs` do esquema de static/config.yaml."""
+        return {
+            "sectors": list(self.sectors),
+            "transition_base": self.transitions.tolist(),
+            "exit_probs": self.exits.tolist()
+        }
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config["sectors"], config["transition_base"], config.get("exit_probs"))
+
+    def to_csv(self):
+        return self.to_frame().to_csv(float_format="%.6g")
+
+    @classmethod
+    def from_csv(cls, text):
+        """Lê o CSV de `to_csv` (primeira coluna: setor de origem)."""
+        frame = pd.read_csv(io.StringIO(text), index_col=0)
+        frame.index = frame.index.astype(str).str.strip()
+        frame.columns = frame.columns.astype(str).str.strip()
+        if list(frame.index) != [column for column in frame.columns if column != EXIT_COLUMN]:
+            raise ValueError("As linhas e as colunas do CSV devem listar os mesmos setores, pela mesma ordem.")
+        return cls.from_frame(frame)
+
+    def to_yaml(self):
+        """Configuração YAML carregável por `DataManager.load_config_file` e por batch.py."""
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("Instale 'pyyaml' para exportar configurações YAML.")
+        return yaml.safe_dump(self.to_config(), allow_unicode=True, sort_keys=False, default_flow_style=None)
+
+    @classmethod
+    def from_yaml(cls, text, data_manager, source="YAML"):
+        """Lê uma configuração YAML, validada pelo `DataManager` (saídas em falta recebem o valor por omissão)."""
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("Instale 'pyyaml' para ler configurações YAML.")
+        data = yaml.safe_load(text)
+        if isinstance(data, dict) and "config" in data:
+            data = data["config"]
+        return cls.from_config(data_manager.validate_config(data, source))
@@ -0,0 +1,366 @@
+# validation.py: Validação de motores e estimadores contra o modelo de referência (SimPy)
+import glob
+import itertools
+import json
+import logging
+import math
+import os
+import time
+
+import numpy as np
+
+from models.batch_runner import time_in_system
+from models.compiled_config import compile_config
+from models.hospital_sim import HospitalSimulator
+from models.jit_kernel import PathSampler, HAS_NUMBA
+from models.markov_analytics import routing_matrix, expected_visits, expected_total_time
+from models.markov_model import MarkovHospitalModel
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_ENGINE = "simpy"
+ENGINES = ("simpy", "heap", "kernel-numpy", "kernel-numba", "analytic")
+# Tolerâncias por omissão: nível dos testes, distância KS, erro relativo das médias, erro da ocupação (p.p.)
+DEFAULT_TOLERANCE = {"alpha": 0.01, "ks_d": 0.05, "mean_rel": 0.02, "visits_rel": 0.02, "occupation_pp": 5.0}
+# Deslocamento das sementes dos motores candidatos (comparados com sorteios independentes)
+CANDIDATE_SEED_OFFSET = 10000
+
+
+def kolmogorov_sf(x):
+    """P(K > x) da distribuição de Kolmogorov (série alternada)."""
+    if x < 0.2:
+        return 1.0
+    k = np.arange(1, 101)
+    return float(np.clip(2.0 * np.sum((-1.0) ** (k - 1) * np.exp(-2.0 * (k * x) ** 2)), 0.0, 1.0))
+
+
+def ks_2samp(a, b):
+    """Teste de Kolmogorov-Smirnov de duas amostras: (estatística D, valor-p assintótico)."""
+    a = np.sort(np.asarray(a, dtype=float))
+    b = np.sort(np.asarray(b, dtype=float))
+    n, m = len(a), len(b)
+    if not n or not m:
+        return float("nan"), float("nan")
+    values = np.concatenate([a, b])
+    distance = np.abs(np.searchsorted(a, values, side="right") / n - np.searchsorted(b, values, side="right") / m)
+    statistic = float(distance.max())
+    effective = np.sqrt(n * m / (n + m))
+    return statistic, kolmogorov_sf((effective + 0.12 + 0.11 / effective) * statistic)
+
+
+def stress_config(num_sectors, exit_prob=0.05, medicos=2, num_patients=1000, seed=0):
+    """Configuração sintética com muitos setores e/ou congestionamento forte."""
+    rng = np.random.default_rng(seed)
+    sectors = ["Triagem", "Consulta"] + [f"Setor {i}" for i in range(3, num_sectors + 1)]
+    transition_base = rng.uniform(0, 1, (num_sectors, num_sectors))
+    transition_base /= transition_base.sum(axis=1, keepdims=True)
+    return {
+        "sectors": sectors,
+        "transition_base": (transition_base * (1 - exit_prob)).tolist(),
+        "exit_probs": [exit_prob] * num_sectors,
+        "num_patients": num_patients,
+        "turno": "manhã",
+        "gravidade": "média",
+        "medicos_disponiveis": medicos,
+        "prioridade_ativa": True
+    }
+
+
+def stress_corpus(num_patients=1000):
+    """Casos de esforço: muitos setores, congestionamento forte e poucos médicos."""
+    return {
+        "stress_S50_congestionado": stress_config(50, 0.05, 2, num_patients),
+        "stress_S10_congestionado": stress_config(10, 0.02, 1, num_patients, seed=1),
+        "stress_S200": stress_config(200, 0.2, 5, num_patients, seed=2)
+    }
+
+
+def session_corpus(paths, min_patients=1000):
+    """Configurações das sessões gravadas (.json); `min_patients` dá poder aos testes."""
+    files = []
+    for path in paths:
+        files.extend(sorted(glob.glob(os.path.join(path, "*.json"))) if os.path.isdir(path) else [path])
+    corpus = {}
+    for path in files:
+        with open(path, "r") as f:
+            data = json.load(f)
+        config = dict(data.get("config", data))
+        config["num_patients"] = max(int(config.get("num_patients", 0)), min_patients)
+        corpus[os.path.splitext(os.path.basename(path))[0]] = config
+    return corpus
+
+
+def available_engines():
+    return [engine for engine in ENGINES if engine != "kernel-numba" or HAS_NUMBA]
+
+
+def with_transitions(config, seed):
+    """Fixa a matriz de Markov (com a semente), para que todos os motores usem a mesma."""
+    np.random.seed(seed)
+    config = compile_config(config)
+    markov_model = MarkovHospitalModel(config)
+    transition_probs = markov_model.compute_transitions()
+    return config.with_transitions(transition_probs, markov_model.normalized_exit_probs)
+
+
+def run_engine(engine, config, seed):
+    """Uma execução de `engine`: devolve (tempos de atendimento, tempos no sistema,
+    visitas por setor e paciente, ocupação dos médicos em %)."""
+    if engine in ("simpy", "heap"):
+        results, stats = HospitalSimulator(config, seed=seed, engine=engine).run_simulation()
+    elif engine.startswith("kernel-"):
+        trace = PathSampler(config, engine.split("-", 1)[1]).sample(seed=seed).trace
+        results, stats = HospitalSimulator(config, trace=trace, engine="heap").run_simulation()
+    else:
+        raise ValueError(f"Motor desconhecido: {engine}. Use um de {ENGINES}.")
+    codes = config.sector_codes
+    totals = np.array([r["total_waiting_time"] for r in results], dtype=float)
+    visits = np.zeros((len(results), config.num_sectors))
+    for row, r in enumerate(results):
+        for sector in r["sectors_visited"]:
+            if sector in codes:
+                visits[row, codes[sector]] += 1
+    # A ocupação vem do integral do tempo-médico ocupado (models.schedule.busy_minutes)
+    return totals, time_in_system(results), visits, stats["doctor_occupation"] * 100
+
+
+def run_sampled(engine, config, seeds):
+    """Junta as replicações de um motor; devolve as amostras e o débito (pacientes/s).
+
+    Os tempos no sistema ficam separados por replicação (os pacientes de uma
+    replicação partilham as filas e não são independentes) e a ocupação,
+    que é uma medida da replicação, fica uma por semente.
+    """
+    totals, stays, visits, occupations = [], [], [], []
+    start = time.perf_counter()
+    for seed in seeds:
+        t, stay, v, o = run_engine(engine, config, seed)
+        totals.append(t)
+        stays.append(stay)
+        visits.append(v)
+        occupations.append(o)
+    seconds = time.perf_counter() - start
+    patients = sum(len(t) for t in totals)
+    return {
+        "totals": np.concatenate(totals),
+        "stays": stays,
+        "visits": np.concatenate(visits),
+        "occupations": np.array(occupations, dtype=float),
+        "seconds": seconds,
+        "throughput": patients / seconds if seconds > 0 else float("inf")
+    }
+
+
+def analytic_estimate(config):
+    """Médias da cadeia absorvente (sem distribuição nem ocupação)."""
+    start = time.perf_counter()
+    visits = expected_visits(routing_matrix(config.transition_probs.to_dense(), config.exit_probs))
+    mean_total = float(expected_total_time(visits, config.service_means))
+    seconds = time.perf_counter() - start
+    return {"visits": visits, "mean_total": mean_total, "seconds": seconds,
+            "throughput": config.num_patients / seconds if seconds > 0 else float("inf")}
+
+
+def normal_p_value(z):
+    """Valor-p bilateral de um desvio normal padronizado."""
+    return math.erfc(abs(z) / math.sqrt(2.0))
+
+
+def mean_test(reference, candidate):
+    """(z, valor-p) da diferença de médias por coluna; `candidate` sem variância é um valor exato."""
+    reference = np.asarray(reference, dtype=float)
+    variance = reference.var(axis=0, ddof=1) / len(reference)
+    if isinstance(candidate, np.ndarray) and candidate.ndim == reference.ndim:
+        variance = variance + candidate.var(axis=0, ddof=1) / len(candidate)
+        candidate = candidate.mean(axis=0)
+    difference = np.asarray(candidate) - reference.mean(axis=0)
+    std_error = np.sqrt(variance)
+    z = np.where(std_error > 0, difference / np.where(std_error > 0, std_error, 1.0), 0.0)
+    return z, np.vectorize(normal_p_value)(z)
+
+
+def student_t_p_value(t, df):
+    """Valor-p bilateral da distribuição t de Student com `df` >= 1 graus de liberdade (real).
+
+    Com x = sqrt(df) tan(θ) a densidade fica proporcional a cos(θ)^(df-1)
+    em [0, π/2), que se integra numericamente sem singularidades.
+    """
+    if not np.isfinite(t):
+        return 0.0
+    if df > 1000:
+        return normal_p_value(t)
+    theta = np.linspace(0.0, np.pi / 2, 4001)
+    density = np.cos(theta) ** (df - 1.0)
+    cumulative = np.concatenate([[0.0], np.cumsum((density[1:] + density[:-1]) / 2 * np.diff(theta))])
+    limit = math.atan(abs(t) / math.sqrt(df))
+    return float(1.0 - np.interp(limit, theta, cumulative) / cumulative[-1])
+
+
+def replication_test(reference, candidate):
+    """(t, valor-p) de Welch sobre valores por replicação (médias ou ocupações).
+
+    Com menos de duas replicações de um dos lados a variância é desconhecida
+    e a diferença não é detetável (valor-p 1).
+    """
+    reference = np.asarray(reference, dtype=float)
+    candidate = np.asarray(candidate, dtype=float)
+    if len(reference) < 2 or len(candidate) < 2:
+        return 0.0, 1.0
+    a = reference.var(ddof=1) / len(reference)
+    b = candidate.var(ddof=1) / len(candidate)
+    difference = candidate.mean() - reference.mean()
+    if a + b <= 0:
+        return 0.0, 1.0 if difference == 0 else 0.0
+    t = difference / math.sqrt(a + b)
+    df = (a + b) ** 2 / (a ** 2 / (len(reference) - 1) + b ** 2 / (len(candidate) - 1))
+    return float(t), student_t_p_value(t, df)
+
+
+def replication_ks(reference, candidate, permutations=1000, seed=0):
+    """KS entre amostras agrupadas por replicação: (estatística D, valor-p de permutação).
+
+    O valor-p troca replicações inteiras entre os dois lados (todas as
+    divisões ou `permutations` ao acaso), o que respeita a correlação dentro
+    de cada replicação. Com poucas replicações o teste tem pouca potência
+    (duas de cada lado nunca reprovam).
+    """
+    groups = [np.asarray(g, dtype=float) for g in list(reference) + list(candidate)]
+    n = len(reference)
+    if not n or len(groups) == n:
+        return float("nan"), float("nan")
+
+    def statistic(indices):
+        chosen = set(indices)
+        a = np.concatenate([g for i, g in enumerate(groups) if i in chosen])
+        b = np.concatenate([g for i, g in enumerate(groups) if i not in chosen])
+        return ks_2samp(a, b)[0]
+
+    observed = statistic(range(n))
+    if math.comb(len(groups), n) <= permutations:
+        splits = list(itertools.combinations(range(len(groups)), n))
+        extreme = sum(statistic(split) >= observed - 1e-12 for split in splits)
+        return observed, extreme / len(splits)
+    rng = np.random.default_rng(seed)
+    extreme = sum(statistic(rng.permutation(len(groups))[:n]) >= observed - 1e-12 for _ in range(permutations))
+    return observed, (1 + extreme) / (1 + permutations)
+
+
+def compare(name, engine, reference, candidate, tolerance):
+    """Linha do relatório: erros contra a referência, testes e débito.
+
+    Uma métrica só reprova quando a diferença é estatisticamente detetável
+    (valor-p < alpha) e maior do que a tolerância: com poucos pacientes o
+    ruído não reprova um motor correto e com muitos um viés pequeno é aceite.
+    O tempo no sistema (saída - chegada, com as filas) é comparado em
+    distribuição (KS) e em média com testes sobre replicações inteiras,
+    porque as filas correlacionam os pacientes de uma mesma replicação; o tempo de atendimento em média (é o que o estimador
+    analítico dá). As visitas são comparadas setor a setor (o pior
+    erro relativo vai para o relatório), com a correção de Bonferroni sobre os
+    setores. A ocupação é testada sobre os valores de cada replicação.
+    """
+    ref_totals = reference["totals"]
+    ref_mean = float(ref_totals.mean())
+    ref_visits = reference["visits"]
+    row = {"Config": name, "Motor": engine}
+    nan = float("nan")
+    if engine == "analytic":
+        mean_total = candidate["mean_total"]
+        visits = np.asarray(candidate["visits"], dtype=float)
+        statistic, ks_p, stay_error, t_stay, p_stay = nan, nan, nan, nan, nan
+        occupation_error, p_occupation = nan, nan
+        z_mean, p_mean = mean_test(ref_totals, mean_total)
+        z_visits, p_visits = mean_test(ref_visits, visits)
+    else:
+        mean_total = float(candidate["totals"].mean())
+        visits = candidate["visits"].mean(axis=0)
+        statistic, ks_p = replication_ks(reference["stays"], candidate["stays"])
+        ref_stay_mean = float(np.concatenate(reference["stays"]).mean())
+        stay_mean = float(np.concatenate(candidate["stays"]).mean())
+        stay_error = abs(stay_mean - ref_stay_mean) / ref_stay_mean if ref_stay_mean else 0.0
+        t_stay, p_stay = replication_test([s.mean() for s in reference["stays"]], [s.mean() for s in candidate["stays"]])
+        occupation_error = abs(float(candidate["occupations"].mean()) - float(reference["occupations"].mean()))
+        _, p_occupation = replication_test(reference["occupations"], candidate["occupations"])
+        z_mean, p_mean = mean_test(ref_totals, candidate["totals"])
+        z_visits, p_visits = mean_test(ref_visits, candidate["visits"])
+    mean_error = abs(mean_total - ref_mean) / ref_mean if ref_mean else 0.0
+    # Visitas por setor: erro relativo de cada setor e valor-p com a correção de Bonferroni
+    ref_sector_visits = ref_visits.mean(axis=0)
+    sector_errors = np.abs(visits - ref_sector_visits) / np.where(ref_sector_visits > 0, ref_sector_visits, 1.0)
+    sector_errors = np.where((ref_sector_visits > 0) | (visits == 0), sector_errors, np.inf)
+    sector_p = np.minimum(1.0, np.asarray(p_visits, dtype=float) * len(ref_sector_visits))
+    visits_error = float(sector_errors.max()) if len(sector_errors) else 0.0
+    visits_p = float(sector_p.min()) if len(sector_p) else 1.0
+    row.update({
+        "Pacientes/s": candidate["throughput"],
+        "Aceleração": candidate["throughput"] / reference["throughput"],
+        "KS D": statistic,
+        "KS p": ks_p,
+        "Erro Tempo no Sistema (%)": 100 * stay_error,
+        "t Tempo no Sistema": float(t_stay),
+        "Erro Tempo Médio (%)": 100 * mean_error,
+        "z Tempo Médio": float(z_mean),
+        "Erro Visitas (%)": 100 * visits_error,
+        "p Visitas": visits_p,
+        "Erro Ocupação (p.p.)": occupation_error,
+        "p Ocupação": float(p_occupation)
+    })
+    alpha = tolerance["alpha"]
+    checks = [
+        np.isnan(ks_p) or ks_p >= alpha or statistic <= tolerance["ks_d"],
+        np.isnan(p_stay) or float(p_stay) >= alpha or stay_error <= tolerance["mean_rel"],
+        float(p_mean) >= alpha or mean_error <= tolerance["mean_rel"],
+        not np.any((sector_p < alpha) & (sector_errors > tolerance["visits_rel"])),
+        np.isnan(p_occupation) or float(p_occupation) >= alpha or occupation_error <= tolerance["occupation_pp"]
+    ]
+    row["Aprovado"] = bool(all(checks))
+    return row
+
+
+def validate(corpus, engines=None, replications=2, base_seed=0, tolerance=None):
+    """Corre a referência e cada motor em todas as configurações do corpus.
+
+    `corpus` = {nome: configuração}. A matriz de cada configuração é fixada
+    uma vez; a referência usa as sementes base_seed..base_seed+R-1 e os outros
+    motores sementes independentes. Devolve as linhas do relatório (uma por
+    configuração e motor, incluindo a própria referência contra réplicas
+    independentes).
+    """
+    tolerance = dict(DEFAULT_TOLERANCE, **(tolerance or {}))
+    engines = list(engines or available_engines())
+    rows = []
+    for name, config in corpus.items():
+        config = with_transitions(config, base_seed)
+        seeds = [base_seed + r for r in range(replications)]
+        reference = run_sampled(REFERENCE_ENGINE, config, seeds)
+        logger.info(f"{name}: referência com {len(reference['totals'])} pacientes em {reference['seconds']:.2f} s")
+        candidate_seeds = [seed + CANDIDATE_SEED_OFFSET for seed in seeds]
+        for engine in engines:
+            if engine == "analytic":
+                candidate = analytic_estimate(config)
+            else:
+                candidate = run_sampled(engine, config, candidate_seeds)
+            rows.append(compare(name, engine, reference, candidate, tolerance))
+    return rows
+
+
+def engine_summary(rows):
+    """Por motor: taxa de aprovação e aceleração mediana; o mais rápido aprovado em tudo vem primeiro."""
+    summary = []
+    for engine in dict.fromkeys(row["Motor"] for row in rows):
+        engine_rows = [row for row in rows if row["Motor"] == engine]
+        summary.append({
+            "Motor": engine,
+            "Aprovado (%)": 100.0 * np.mean([row["Aprovado"] for row in engine_rows]),
+            "Aceleração Mediana": float(np.median([row["Aceleração"] for row in engine_rows])),
+            "Pior Erro Tempo Médio (%)": float(np.max([row["Erro Tempo Médio (%)"] for row in engine_rows]))
+        })
+    summary.sort(key=lambda s: (s["Aprovado (%)"] < 100.0, -s["Aceleração Mediana"]))
+    return summary
+
+
+def fastest_within_tolerance(rows, include_analytic=False):
+    """Motor mais rápido aprovado em todas as configurações (o analítico só dá médias)."""
+    for entry in engine_summary(rows):
+        if entry["Aprovado (%)"] == 100.0 and (include_analytic or entry["Motor"] != "analytic"):
+            return entry["Motor"]
+    return REFERENCE_ENGINE
@@ -0,0 +1,121 @@
+# worker_pool.py: Pool de simulação partilhado pelo servidor, com fila e junção de pedidos iguais
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from models.batch_runner import run_replication
+from models.compiled_config import config_hash
+
+logger = logging.getLogger(__name__)
+
+# Pedidos distintos em curso (na fila ou a correr) por processo de trabalho
+PENDING_PER_WORKER = 4
+
+
+class PoolBusyError(RuntimeError):
+    """A fila do pool está cheia e o pedido não pôde ser admitido a tempo."""
+
+
+class SimulationPool:
+    def __init__(self, workers=None, max_pending=None, executor=None):
+        """Executa replicações (`run_replication`) num pool de processos partilhado.
+
+        Pedidos iguais em curso — mesma configuração (hash), semente, motor e
+        núcleo — são juntos numa única execução: todos recebem o mesmo
+        `Future`, cujo resultado deve ser tratado como só de leitura. No máximo
+        `max_pending` pedidos distintos ficam em curso; acima disso `submit`
+        espera por uma vaga (ou falha com PoolBusyError). `executor` permite
+        usar outro executor com a interface `submit(fn, *args)`.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or PENDING_PER_WORKER * self.workers
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._inflight = {}
+        self._slots = threading.Condition()
+        self.counters = {"submitted": 0, "coalesced": 0, "rejected": 0, "completed": 0, "failed": 0}
+
+    @staticmethod
+    def key(config, seed, engine="simpy", kernel=None):
+        return config_hash(config), int(seed), engine, kernel
+
+    def submit(self, config, seed, engine="simpy", kernel=None, block=True, timeout=None):
+        """Agenda (ou junta-se a) uma replicação; devolve um `Future` da sessão.
+
+        Com `block=False`, ou passado `timeout` segundos sem vaga, lança
+        PoolBusyError.
+        """
+        key = self.key(config, seed, engine, kernel)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._slots:
+            while True:
+                future = self._inflight.get(key)
+                if future is not None:
+                    self.counters["coalesced"] += 1
+                    return future
+                if len(self._inflight) < self.max_pending:
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if not block or (remaining is not None and remaining <= 0) or not self._slots.wait(remaining):
+                    self.counters["rejected"] += 1
+                    raise PoolBusyError(f"Pool ocupado: {len(self._inflight)} simulações em curso.")
+            plain_config = config.to_dict() if hasattr(config, "to_dict") else config
+            future = self._executor_submit(run_replication, plain_config, int(seed), engine, None, kernel)
+            self._inflight[key] = future
+            self.counters["submitted"] += 1
+        future.add_done_callback(partial(self._release, key))
+        return future
+
+    def run(self, config, seed, engine="simpy", kernel=None, timeout=None):
+        """Versão síncrona de `submit`: devolve a sessão {config, results, stats}."""
+        return self.submit(config, seed, engine, kernel, timeout=timeout).result()
+
+    def _executor_submit(self, fn, *args):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            return self._executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # Um processo morreu: recriar o pool (os pedidos em curso falham com o erro)
+            if not self._owns_executor:
+                raise
+            logger.warning("Pool de simulação avariado; a recriar os processos.")
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor.submit(fn, *args)
+
+    def _release(self, key, future):
+        with self._slots:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            failed = future.cancelled() or future.exception() is not None
+            self.counters["failed" if failed else "completed"] += 1
+            self._slots.notify_all()
+
+    def stats(self):
+        """Contadores e ocupação atual (para mostrar na interface)."""
+        with self._slots:
+            return dict(self.counters, in_flight=len(self._inflight), workers=self.workers,
+                        max_pending=self.max_pending)
+
+    def shutdown(self, wait=True):
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def shared_pool():
+    """Pool único do processo, partilhado por todas as sessões do servidor Streamlit."""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = SimulationPool()
+            logger.info(f"Pool de simulação partilhado com {_shared_pool.workers} processos")
+        return _shared_pool
@@ -1,11 +1,11 @@
 # multi_turns.py: Simulação multi-turnos
 import streamlit as st
 import pandas as pd
+from models.experiments import ExperimentPlan, run_plan
+from models.worker_pool import shared_pool
 from models.hospital_sim import HospitalSimulator
-from models.markov_model import MarkovHospitalModel
 from utils.visualizer import Visualizer
 import json
-import numpy as np
 
 class MultiTurnsPage:
     def __init__(self, data_manager):
@@ -20,61 +20,88 @@ class MultiTurnsPage:
             st.warning("Configure uma simulação na aba Planejador primeiro!")
             return
 
-        config = st.session_state["config"].copy()
+        config = self.data_manager.compile_config(st.session_state["config"])
         turnos = ["manhã", "tarde", "noite"]
-        results_by_turno = {}
+
+        mode = st.radio("Modo", ["Turnos independentes", "Dia contínuo (filas passam entre turnos)"], horizontal=True)
+        if mode != "Turnos independentes":
+            self.render_continuous(config, turnos)
+            return
 
         if st.button("Simular Turnos", type="primary"):
+            plan = ExperimentPlan(config, {"turno": turnos})
+            rows = []
             with st.spinner("Simulando turnos..."):
-                for turno in turnos:
-                    config["turno"] = turno
-                    markov_model = MarkovHospitalModel(config)
-                    transition_probs = markov_model.compute_transitions()
-                    simulator = HospitalSimulator(config, transition_probs)
-                    results, stats = simulator.run_simulation()
-                    results_by_turno[turno] = {"results": results, "stats": stats}
+                # As três matrizes são calculadas num lote pelo plano; os turnos correm em paralelo no pool partilhado
+                rows.extend(run_plan(plan, pool=shared_pool()))
+            by_turno = (
+                pd.DataFrame(rows)
+                .groupby("turno")[["Tempo Médio (min)", "Ocupação Médicos (%)"]]
+                .mean()
+                .reindex(turnos)
+            )
+
+            # Comparação
+            st.subheader("Comparação por Turno")
+            df = by_turno.reset_index().rename(columns={"turno": "Turno"})
+            st.dataframe(df, use_container_width=True)
 
-                # Comparação
-                st.subheader("Comparação por Turno")
-                df = pd.DataFrame([
+            # Gráfico comparativo
+            chart_data = {
+                "labels": turnos,
+                "datasets": [
                     {
-                        "Turno": turno,
-                        "Tempo Médio (min)": np.mean([r["total_waiting_time"] for r in data["results"]]),
-                        "Ocupação Médicos (%)": data["stats"]["doctor_occupation"] * 100
+                        "label": "Tempo Médio (min)",
+                        "data": by_turno["Tempo Médio (min)"].tolist(),
+                        "backgroundColor": "rgba(75, 192, 192, 0.5)"
+                    },
+                    {
+                        "label": "Ocupação Médicos (%)",
+                        "data": by_turno["Ocupação Médicos (%)"].tolist(),
+                        "backgroundColor": "rgba(255, 99, 132, 0.5)"
                     }
-                    for turno, data in results_by_turno.items()
-                ])
-                st.dataframe(df, use_container_width=True)
+                ]
+            }
+
+            st.components.v1.html(f"""
+                <canvas id="turnosChart"></canvas>
+                <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.2"></script>
+                <script>
+                    const ctx = document.getElementById('turnosChart').getContext('2d');
+                    new Chart(ctx, {{
+                        type: 'bar',
+                        data: {json.dumps(chart_data)},
+                        options: {{
+                            scales: {{ y: {{ beginAtZero: true }} }},
+                            plugins: {{ legend: {{ display: true }} }}
+                        }}
+                    }});
+                </script>
+            """, height=400)
 
-                # Gráfico comparativo
-                chart_data = {
-                    "labels": turnos,
-                    "datasets": [
-                        {
-                            "label": "Tempo Médio (min)",
-                            "data": [np.mean([r["total_waiting_time"] for r in data["results"]]) for data in results_by_turno.values()],
-                            "backgroundColor": "rgba(75, 192, 192, 0.5)"
-                        },
-                        {
-                            "label": "Ocupação Médicos (%)",
-                            "data": [data["stats"]["doctor_occupation"] * 100 for data in results_by_turno.values()],
-                            "backgroundColor": "rgba(255, 99, 132, 0.5)"
-                        }
-                    ]
-                }
+    def render_continuous(self, config, turnos):
+        """Uma única simulação de um ou mais dias com escala por turno."""
+        days = st.slider("Dias", 1, 7, 1)
+        cols = st.columns(len(turnos))
+        medicos = {}
+        patients = {}
+        for col, turno in zip(cols, turnos):
+            col.markdown(f"**{turno.capitalize()}**")
+            medicos[turno] = col.number_input("Médicos", 1, 30, config["medicos_disponiveis"], key=f"medicos_{turno}")
+            patients[turno] = col.number_input("Chegadas", 0, 5000, config["num_patients"], key=f"chegadas_{turno}")
+
+        if st.button("Simular Dia", type="primary"):
+            # Com escala, as matrizes de cada turno substituem as `transition_probs` da sessão
+            config = config.replace(schedule={"turnos": turnos, "days": days, "medicos": medicos, "patients": patients})
+            with st.spinner("Simulando..."):
+                try:
+                    simulator = HospitalSimulator(config)
+                    results, stats = simulator.run_simulation()
+                except ValueError as e:
+                    st.error(f"Erro na escala: {e}")
+                    return
 
-                st.components.v1.html(f"""
-                    <canvas id="turnosChart"></canvas>
-                    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.2"></script>
-                    <script>
-                        const ctx = document.getElementById('turnosChart').getContext('2d');
-                        new Chart(ctx, {{
-                            type: 'bar',
-                            data: {json.dumps(chart_data)},
-                            options: {{
-                                scales: {{ y: {{ beginAtZero: true }} }},
-                                plugins: {{ legend: {{ display: true }} }}
-                            }}
-                        }});
-                    </script>
-                """, height=400)
\ No newline at end of file
+            st.subheader("Métricas por Turno")
+            df = pd.DataFrame(stats["shifts"])
+            st.dataframe(df, use_container_width=True)
+            st.line_chart(df.set_index("Turno")[["Tempo Médio no Sistema (min)", "Ocupação Médicos (%)"]])
@@ -1,9 +1,8 @@
 # optimizer.py: Otimização de recursos
 import streamlit as st
-from models.hospital_sim import HospitalSimulator
-from models.markov_model import MarkovHospitalModel
-import json
 import pandas as pd
+from models.experiments import ExperimentPlan, run_plan
+from models.worker_pool import shared_pool
 
 class OptimizerPage:
     def __init__(self, data_manager):
@@ -17,29 +16,36 @@ class OptimizerPage:
             st.warning("Configure uma simulação na aba Planejador primeiro!")
             return
 
-        config = st.session_state["config"].copy()
+        config = self.data_manager.compile_config(st.session_state["config"])
         st.subheader("Cenários de Otimização")
         
         medicos_range = st.slider("Faixa de Médicos", 1, 20, (config["medicos_disponiveis"], config["medicos_disponiveis"]+5))
-        results = []
-        
+        replications = st.number_input("Replicações", min_value=1, max_value=20, value=1)
+
         if st.button("Testar Cenários", type="primary"):
+            plan = ExperimentPlan(
+                config,
+                {"medicos_disponiveis": list(range(medicos_range[0], medicos_range[1] + 1))},
+                replications=int(replications)
+            )
+            progress_bar = st.progress(0)
+            table = st.empty()
+            rows = []
             with st.spinner("Otimizando..."):
-                for medicos in range(medicos_range[0], medicos_range[1]+1):
-                    config["medicos_disponiveis"] = medicos
-                    markov_model = MarkovHospitalModel(config)
-                    transition_probs = markov_model.compute_transitions()
-                    simulator = HospitalSimulator(config, transition_probs)
-                    sim_results, sim_stats = simulator.run_simulation()
-                    avg_time = sum(r["total_waiting_time"] for r in sim_results) / len(sim_results)
-                    results.append({
-                        "Médicos": medicos,
-                        "Tempo Médio (min)": avg_time,
-                        "Ocupação (%)": sim_stats["doctor_occupation"] * 100
-                    })
-                
-                df = pd.DataFrame(results)
-                st.dataframe(df, use_container_width=True)
-                
-                best_scenario = df.loc[df["Tempo Médio (min)"].idxmin()]
-                st.success(f"Melhor cenário: {best_scenario['Médicos']} médicos, Tempo Médio: {best_scenario['Tempo Médio (min)']:.2f} min, Ocupação: {best_scenario['Ocupação (%)']:.2f}%")
\ No newline at end of file
+                for row in run_plan(plan, pool=shared_pool()):
+                    rows.append(row)
+                    progress_bar.progress(len(rows) / (len(plan.points) * plan.replications))
+                    table.dataframe(pd.DataFrame(rows).sort_values(["Ponto", "Replicação"]), use_container_width=True)
+
+            df = (
+                pd.DataFrame(rows)
+                .groupby("medicos_disponiveis")[["Tempo no Sistema (min)", "Espera Média (min)", "Tempo Médio (min)", "Ocupação Médicos (%)"]]
+                .mean()
+                .reset_index()
+                .rename(columns={"medicos_disponiveis": "Médicos", "Ocupação Médicos (%)": "Ocupação (%)"})
+            )
+            table.dataframe(df, use_container_width=True)
+
+            # O tempo de atendimento não depende dos médicos: o critério é o tempo no sistema (com as filas)
+            best_scenario = df.loc[df["Tempo no Sistema (min)"].idxmin()]
+            st.success(f"Melhor cenário: {best_scenario['Médicos']} médicos, Tempo no Sistema: {best_scenario['Tempo no Sistema (min)']:.2f} min, Espera Média: {best_scenario['Espera Média (min)']:.2f} min, Ocupação: {best_scenario['Ocupação (%)']:.2f}%")
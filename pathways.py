@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
-import json
 import plotly.graph_objects as go
+from models.path_index import PathIndex
 
 class PathwaysPage:
     def __init__(self, data_manager):
@@ -16,32 +16,75 @@ class PathwaysPage:
             return
 
         results = st.session_state["results"]
-        patient_id = st.selectbox("Selecione o Paciente", [r["patient_id"] for r in results], key="patient_select")
-        patient_data = next(r for r in results if r["patient_id"] == patient_id)
-        
-        # Exibir informações do paciente
-        st.subheader(f"Caminho do Paciente {patient_id}")
+        if not results:
+            st.warning("A simulação não produziu resultados.")
+            return
+        index = self.path_index(results)
+
+        # Variantes de percurso mais frequentes
+        st.subheader("Caminhos Mais Frequentes")
+        st.write(f"**{len(index)}** caminhos distintos entre **{len(results)}** pacientes.")
+        max_k = min(50, len(index))
+        top_k = st.slider("Número de caminhos", 1, max_k, min(10, max_k), key="pathways_top_k") if max_k > 1 else 1
+        top = index.top_k(top_k)
+        st.dataframe(
+            pd.DataFrame(index.summary(top)).set_index("Variante"),
+            use_container_width=True
+        )
+
+        variant = st.selectbox(
+            "Detalhar Caminho",
+            top.tolist(),
+            format_func=lambda v: f"{' -> '.join(index.paths[v])} ({index.counts[v]} pacientes)",
+            key="variant_select"
+        )
+        members = index.members(variant)
+        cols = st.columns(3)
+        cols[0].metric("Pacientes", int(index.counts[variant]))
+        cols[1].metric("Tempo Médio", f"{index.mean_times[variant]:.2f} min")
+        cols[2].metric("Tempo P90", f"{index.p90_times[variant]:.2f} min")
+        sample_ids = [results[row]["patient_id"] for row in members[:20]]
+        st.write(f"**Pacientes (amostra)**: {', '.join(str(pid) for pid in sample_ids)}")
+        self.plot_path(list(index.paths[variant]), index.step_times(variant), f"Fluxo do Caminho {variant}")
+
+        # Procura direta de um paciente
+        st.subheader("Caminho de um Paciente")
+        patient_id = st.number_input("ID do Paciente", min_value=0, value=int(results[0]["patient_id"]), step=1, key="patient_select")
+        patient_data, patient_variant = index.patient(patient_id)
+        if patient_data is None:
+            st.warning(f"Paciente {patient_id} não encontrado.")
+            return
+
         st.write(f"**Tempo Total**: {patient_data['total_waiting_time']:.2f} min")
         st.write(f"**Prioridade**: {patient_data['priority']}")
-        st.write(f"**Caminho**: {' -> '.join(patient_data['sectors_visited'])}")
-        
-        # Gráfico de Sankey
-        st.markdown("**Fluxo do Paciente**")
-        
-        # Preparar dados para o Sankey
+        st.write(f"**Caminho**: {' -> '.join(patient_data['sectors_visited'])} (caminho {patient_variant})")
+
         sectors = patient_data["sectors_visited"]
         if not sectors:
             st.warning("Nenhum setor visitado registrado para este paciente.")
             return
+        step_times = patient_data.get("service_times")
+        if step_times is None:
+            # Sessões antigas: dividir o tempo total igualmente pelos setores
+            step_times = [patient_data["total_waiting_time"] / len(sectors)] * len(sectors)
+        self.plot_path(sectors, step_times, f"Fluxo do Paciente {patient_id}")
+
+    def path_index(self, results):
+        """Índice de caminhos dos resultados atuais, reconstruído só quando estes mudam."""
+        index = st.session_state.get("path_index")
+        if index is None or index.results is not results:
+            index = PathIndex(results)
+            st.session_state["path_index"] = index
+        return index
+
+    def plot_path(self, sectors, step_times, title):
+        """Sankey de um percurso; cada ligação tem o tempo passado no setor de origem."""
+        st.markdown(f"**{title}**")
 
-        # Estimar duração por setor (dividir tempo total igualmente)
-        total_time = patient_data["total_waiting_time"]
-        time_per_sector = total_time / len(sectors) if len(sectors) > 0 else 0
-        
         # Criar lista de nós únicos e índices
         unique_sectors = list(dict.fromkeys(sectors))  # Preserva ordem, remove duplicatas
         node_indices = {sector: idx for idx, sector in enumerate(unique_sectors)}
-        
+
         # Preparar dados para o Sankey
         source = []
         target = []
@@ -52,8 +95,8 @@ class PathwaysPage:
             target_sector = sectors[i + 1]
             source.append(node_indices[source_sector])
             target.append(node_indices[target_sector])
-            values.append(time_per_sector)
-            link_labels.append(f"{source_sector} -> {target_sector}: {time_per_sector:.2f} min")
+            values.append(step_times[i])
+            link_labels.append(f"{source_sector} -> {target_sector}: {step_times[i]:.2f} min")
 
         # Definir cores vibrantes para nós
         node_colors = {
@@ -85,7 +128,7 @@ class PathwaysPage:
 
         # Personalizar o layout
         fig.update_layout(
-            title=f"Fluxo do Paciente {patient_id}",
+            title=title,
             font=dict(size=14, color="white", family="Arial"),
             height=400,
             margin=dict(l=50, r=50, t=80, b=50),
@@ -0,0 +1,92 @@
+# regional.py: Simulação de uma rede regional de hospitais pela linha de comando
+import argparse
+import json
+import logging
+import os
+import sys
+
+from utils.data_manager import DataManager
+from models.batch_runner import save_session, summarize, write_summary
+from models.network import run_network
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Simula hospitais ligados por transferências, cada um no seu processo."
+    )
+    parser.add_argument("network", help="Rede em YAML/JSON (hospitals + transfers; ver static/rede.yaml)")
+    parser.add_argument("--seed", type=int, default=0, help="Semente da rede")
+    parser.add_argument("-w", "--workers", type=int, help="Processos (por omissão: um por hospital; 1 = sequencial)")
+    parser.add_argument("--max-window", type=float, help="Duração máxima de cada janela de sincronização (min)")
+    parser.add_argument("--check", action="store_true",
+                        help="Repetir a simulação sequencialmente e confirmar que os resultados são iguais")
+    parser.add_argument("--sessions-dir", default="sessions", help="Diretório onde gravar as sessões")
+    parser.add_argument("--no-sessions", action="store_true", help="Não gravar ficheiros de sessão")
+    parser.add_argument("-o", "--output", default="resumo_rede.csv", help="Tabela de resumo (.csv ou .json)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Mostrar progresso detalhado")
+    return parser.parse_args(argv)
+
+
+def load_network(path, data_manager):
+    """Lê a rede e valida a configuração de cada hospital como o batch.py."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Instale 'pyyaml' para ler configurações YAML.")
+            network = yaml.safe_load(f)
+        else:
+            network = json.load(f)
+    if not isinstance(network, dict) or not isinstance(network.get("hospitals"), dict):
+        raise ValueError(f"{path}: indique os hospitais em 'hospitals'.")
+    network["hospitals"] = {
+        name: data_manager.validate_config(config, f"{path}:{name}")
+        for name, config in network["hospitals"].items()
+    }
+    return network
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    logging.getLogger("models").setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    try:
+        network = load_network(args.network, DataManager())
+        output = run_network(network, seed=args.seed, workers=args.workers, max_window=args.max_window)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"Erro na rede: {e}", file=sys.stderr)
+        return 2
+
+    if args.check:
+        sequential = run_network(network, seed=args.seed, workers=1)
+        same = all(
+            sequential["hospitals"][name]["results"] == session["results"]
+            for name, session in output["hospitals"].items()
+        )
+        print("Resultados iguais à execução sequencial." if same else "AVISO: resultados diferentes da execução sequencial!")
+        if not same:
+            return 1
+
+    rows = []
+    for name, session in output["hospitals"].items():
+        row = summarize(name, 0, args.seed, session)
+        row["Transferidos (entrada)"] = sum(session["stats"]["transfers_in"].values())
+        row["Transferidos (saída)"] = sum(session["stats"]["transfers_out"].values())
+        rows.append(row)
+        if not args.no_sessions:
+            save_session(args.sessions_dir, f"rede_{name}", session)
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    df = write_summary(rows, args.output)
+
+    print(df.drop(columns=["Replicação", "Semente"]).to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    print(f"{output['windows']} janelas de sincronização, {output['transfers']} transferências.")
+    print(f"Resumo gravado em {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,20 @@
 # scenario.py: Análise de cenários
 import streamlit as st
 import pandas as pd
-import numpy as np
-from models.hospital_sim import HospitalSimulator
-import json
-from models.markov_model import MarkovHospitalModel
+from models.experiments import ExperimentPlan, run_plan
+from models.worker_pool import shared_pool
+from models.surrogate import SimulationSurrogate, SURROGATE_METRICS
+
+DESIGN_LABELS = {
+    "Fatorial completo": "full",
+    "Fatorial fracionário (2 níveis)": "fractional",
+    "Hipercubo latino": "lhs"
+}
 
 class ScenarioPage:
     def __init__(self, data_manager):
         self.data_manager = data_manager
+        self.surrogates_dir = "surrogates"
 
     def render(self):
         st.markdown("<h2 class='section-title'>🔍 Análise de Cenários</h2>", unsafe_allow_html=True)
@@ -18,36 +24,123 @@ class ScenarioPage:
             st.warning("Configure uma simulação na aba Planejador primeiro!")
             return
 
-        config = st.session_state["config"].copy()
+        config = self.data_manager.compile_config(st.session_state["config"])
         st.subheader("Configurar Cenários")
-        
-        patient_factor = st.slider("Fator de Pacientes", 0.5, 2.0, 1.0)
-        medicos_factor = st.slider("Fator de Médicos", 0.5, 2.0, 1.0)
-        
-        scenarios = [
-            {"name": "Base", "patients": config["num_patients"], "medicos": config["medicos_disponiveis"]},
-            {"name": "Mais Pacientes", "patients": int(config["num_patients"] * patient_factor), "medicos": config["medicos_disponiveis"]},
-            {"name": "Menos Médicos", "patients": config["num_patients"], "medicos": int(config["medicos_disponiveis"] * medicos_factor)}
-        ]
-        
+
+        patient_factor = st.slider("Fator de Pacientes", 0.5, 2.0, 1.5)
+        medicos_factor = st.slider("Fator de Médicos", 0.5, 2.0, 0.5)
+        turnos = st.multiselect("Turnos", ["manhã", "tarde", "noite"], default=[config["turno"]])
+        gravidades = st.multiselect("Gravidades", ["baixa", "média", "alta"], default=[config["gravidade"]])
+        prioridades = st.multiselect("Prioridade Ativa", [True, False], default=[config["prioridade_ativa"]])
+
+        # Níveis únicos substituem os da configuração antes de escolher o modelo substituto
+        # (a prioridade identifica o hospital do modelo)
+        multi_level, single_level = {}, {}
+        for key, levels in (("turno", turnos), ("gravidade", gravidades), ("prioridade_ativa", prioridades)):
+            if len(levels) > 1:
+                multi_level[key] = levels
+            elif levels:
+                single_level[key] = levels[0]
+        if single_level:
+            config = config.replace(**single_level)
+        surrogate = self.surrogate(config)
+
+        base_patients = config["num_patients"]
+        base_medicos = config["medicos_disponiveis"]
+        self.render_predictions(surrogate, config, patient_factor, medicos_factor, turnos, gravidades)
+
+        design_label = st.selectbox("Plano de Experiências", list(DESIGN_LABELS))
+        design = DESIGN_LABELS[design_label]
+        cols = st.columns(3)
+        replications = cols[0].number_input("Replicações", min_value=1, max_value=20, value=1)
+        samples = cols[1].number_input("Amostras (hipercubo)", min_value=2, max_value=200, value=10, disabled=design != "lhs")
+        fraction = cols[2].number_input("Fração p (2^(k-p))", min_value=1, max_value=3, value=1, disabled=design != "fractional")
+
+        patients = sorted({base_patients, max(1, int(base_patients * patient_factor))})
+        medicos = sorted({base_medicos, max(1, int(base_medicos * medicos_factor))})
+        factors = {"num_patients": patients, "medicos_disponiveis": medicos}
+        if design == "lhs":
+            factors = {"num_patients": (patients[0], patients[-1]), "medicos_disponiveis": (medicos[0], medicos[-1])}
+        factors.update(multi_level)
+
         if st.button("Simular Cenários", type="primary"):
-            results = []
-            with st.spinner("Simulando cenários..."):
-                for scenario in scenarios:
-                    config["num_patients"] = scenario["patients"]
-                    config["medicos_disponiveis"] = max(1, scenario["medicos"])
-                    markov_model = MarkovHospitalModel(config)
-                    transition_probs = markov_model.compute_transitions()
-                    simulator = HospitalSimulator(config, transition_probs)
-                    sim_results, sim_stats = simulator.run_simulation()
-                    avg_time = np.mean([r["total_waiting_time"] for r in sim_results])
-                    results.append({
-                        "Cenário": scenario["name"],
-                        "Pacientes": scenario["patients"],
-                        "Médicos": scenario["medicos"],
-                        "Tempo Médio (min)": avg_time,
-                        "Ocupação (%)": sim_stats["doctor_occupation"] * 100
-                    })
-                
-                df = pd.DataFrame(results)
-                st.dataframe(df, use_container_width=True)
\ No newline at end of file
+            try:
+                plan = ExperimentPlan(
+                    config, factors, design=design, replications=int(replications),
+                    fraction=int(fraction), samples=int(samples), seed=0
+                )
+            except ValueError as e:
+                st.error(f"Plano inválido: {e}")
+                return
+
+            total = len(plan.unique_points()) * plan.replications
+            st.write(f"**{len(plan.points)}** pontos no plano, **{total}** simulações distintas.")
+            progress_bar = st.progress(0)
+            table = st.empty()
+            rows = []
+            for row in run_plan(plan, pool=shared_pool()):
+                rows.append(row)
+                progress_bar.progress(min(len(rows) / len(plan.points) / plan.replications, 1.0))
+                table.dataframe(pd.DataFrame(rows).sort_values(["Ponto", "Replicação"]), use_container_width=True)
+
+            df = pd.DataFrame(rows)
+            summary = df.groupby(["Ponto"] + list(factors), dropna=False)[list(SURROGATE_METRICS)].mean()
+            st.subheader("Médias por Cenário")
+            st.dataframe(summary.reset_index(), use_container_width=True)
+            st.session_state["scenario_results"] = df
+
+            # Cada simulação também ensina o modelo substituto
+            surrogate.add_rows(rows)
+            surrogate.fit()
+            surrogate.save(self.surrogates_dir)
+
+    def surrogate(self, config):
+        """Modelo substituto do hospital atual (carregado do disco uma vez por sessão).
+
+        O modelo em cache passa a usar a configuração desta execução (mesmo
+        hospital, mas pacientes, médicos, turno ou gravidade podem ter mudado).
+        """
+        cached = st.session_state.get("surrogate")
+        probe = SimulationSurrogate(config)
+        if cached is None or cached.key != probe.key:
+            cached = SimulationSurrogate.load(config, self.surrogates_dir)
+            st.session_state["surrogate"] = cached
+        cached.base_config = config
+        return cached
+
+    def render_predictions(self, surrogate, config, patient_factor, medicos_factor, turnos, gravidades):
+        """Previsão instantânea (±2σ) dos cenários escolhidos nos controlos."""
+        st.subheader("Previsão Instantânea")
+        points = [
+            {
+                "num_patients": max(1, int(config["num_patients"] * patient_factor)),
+                "medicos_disponiveis": max(1, int(config["medicos_disponiveis"] * medicos_factor)),
+                "turno": turno,
+                "gravidade": gravidade
+            }
+            for turno in (turnos or [config["turno"]])
+            for gravidade in (gravidades or [config["gravidade"]])
+        ]
+        predictions = surrogate.predict(points)
+        if predictions is None:
+            st.info("O modelo substituto ainda não tem simulações suficientes. Use 'Refinar modelo' ou simule cenários.")
+        else:
+            rows = []
+            for idx, point in enumerate(points):
+                row = {"Turno": point["turno"], "Gravidade": point["gravidade"],
+                       "Pacientes": point["num_patients"], "Médicos": point["medicos_disponiveis"]}
+                for metric in SURROGATE_METRICS:
+                    mean, std = predictions[metric]
+                    row[metric] = f"{mean[idx]:.1f} ± {2 * std[idx]:.1f}"
+                rows.append(row)
+            st.dataframe(pd.DataFrame(rows), use_container_width=True)
+            st.caption(f"Modelo treinado com {len(surrogate.points)} simulações (intervalo ±2σ).")
+
+        cols = st.columns([1, 3])
+        budget = cols[0].number_input("Simulações por refinamento", min_value=1, max_value=50, value=8)
+        if cols[1].button("Refinar modelo"):
+            with st.spinner("Simulando os pontos mais incertos..."):
+                rows = surrogate.refine(int(budget), pool=shared_pool())
+            surrogate.save(self.surrogates_dir)
+            st.success(f"{len(rows)} simulações acrescentadas ao modelo.")
+            st.rerun()
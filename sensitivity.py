@@ -0,0 +1,72 @@
+# sensitivity.py: Análise de sensibilidade dos parâmetros
+import os
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from models.sensitivity import analyze, ENGINE_METRICS
+
+METRIC_LABELS = {
+    "tempo_no_sistema": "Tempo no Sistema (min, com filas)",
+    "tempo_medio": "Tempo de Atendimento (min, só serviço)",
+    "carga_por_medico": "Carga por Médico (min)",
+    "makespan": "Duração Mínima do Atendimento (min)",
+    "ocupacao_medicos": "Ocupação dos Médicos"
+}
+
+class SensitivityPage:
+    def __init__(self, data_manager):
+        self.data_manager = data_manager
+
+    def render(self):
+        st.markdown("<h2 class='section-title'>🎯 Análise de Sensibilidade</h2>", unsafe_allow_html=True)
+        st.markdown("Descubra quais probabilidades e recursos mais influenciam os tempos de espera.")
+
+        if "config" not in st.session_state:
+            st.warning("Configure uma simulação na aba Planejador primeiro!")
+            return
+
+        config = self.data_manager.compile_config(st.session_state["config"])
+        col1, col2 = st.columns(2)
+        with col1:
+            method = st.radio("Método", ["sobol", "morris"], format_func=lambda m: "Sobol" if m == "sobol" else "Morris",
+                              horizontal=True)
+            engine = st.radio("Motor", ["analytic", "simulation"], horizontal=True,
+                              format_func=lambda e: "Cadeia analítica" if e == "analytic" else "Simulação")
+            metric = st.selectbox("Métrica", ENGINE_METRICS[engine], format_func=METRIC_LABELS.get)
+            if metric == "tempo_medio":
+                st.caption("Soma dos tempos de atendimento, sem filas: o número de médicos não a altera.")
+            elif metric == "tempo_no_sistema" and engine == "analytic":
+                st.caption("Aproximação pela carga do setor mais ocupado; a simulação mede-o diretamente.")
+        with col2:
+            samples = st.select_slider("Amostras", [16, 32, 64, 128, 256, 512, 1024, 2048], value=512 if engine == "analytic" else 32)
+            spread = st.slider("Variação dos parâmetros (±%)", 10, 90, 50) / 100
+            budget_minutes = st.slider("Tempo máximo (min)", 1, 9, 5)
+
+        if st.button("Analisar Sensibilidade", type="primary"):
+            with st.spinner("Avaliando pontos amostrados..."):
+                analysis = analyze(
+                    config,
+                    method=method,
+                    engine=engine,
+                    metric=metric,
+                    samples=samples,
+                    spread=spread,
+                    workers=os.cpu_count() or 1,
+                    budget_seconds=budget_minutes * 60
+                )
+
+            st.caption(f"{analysis['evaluations']} avaliações em {analysis['seconds']:.1f} s")
+            df = pd.DataFrame(analysis["ranking"])
+            key = "mu_star" if method == "morris" else "ST"
+            top = df.head(15).iloc[::-1]
+            fig = px.bar(
+                top,
+                x=key,
+                y="Parâmetro",
+                orientation="h",
+                error_x=None if method == "morris" else "ST_conf",
+                title=f"Parâmetros mais influentes em {METRIC_LABELS[metric]}"
+            )
+            fig.update_layout(height=max(350, 28 * len(top)), margin=dict(l=50, r=50, t=80, b=50))
+            st.plotly_chart(fig, use_container_width=True)
+            st.dataframe(df, use_container_width=True)
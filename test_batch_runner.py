@@ -0,0 +1,61 @@
+# test_batch_runner.py: Testes unitários para a execução em lote
+import json
+import os
+import tempfile
+import unittest
+from models.batch_runner import run_batch, run_replication, config_hash
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        self.config = {
+            "sectors": ["Triagem", "Consulta", "Exames"],
+            "transition_base": [[0.6, 0.2, 0.1], [0.2, 0.5, 0.2], [0.1, 0.3, 0.5]],
+            "exit_probs": [0.1, 0.1, 0.1],
+            "num_patients": 5,
+            "turno": "manhã",
+            "gravidade": "média",
+            "medicos_disponiveis": 2,
+            "prioridade_ativa": True
+        }
+
+    def test_replication_is_reproducible(self):
+        first = run_replication(self.config, seed=7)
+        second = run_replication(self.config, seed=7)
+        self.assertEqual(
+            [r["total_waiting_time"] for r in first["results"]],
+            [r["total_waiting_time"] for r in second["results"]]
+        )
+        self.assertNotIn("transition_probs", self.config)
+
+    def test_batch_replays_trace(self):
+        session = run_replication(self.config, seed=3)
+        configs = {"base": self.config, "reforco": dict(self.config, medicos_disponiveis=6)}
+        rows = run_batch(configs, trace=session)
+        self.assertEqual(rows[0]["Tempo Médio (min)"], rows[1]["Tempo Médio (min)"])
+
+    def test_replay_reports_queue_time(self):
+        # Os mesmos atendimentos com mais médicos: só o tempo no sistema (as filas) muda
+        config = dict(self.config, num_patients=30, medicos_disponiveis=1)
+        session = run_replication(config, seed=3)
+        rows = run_batch({"base": config, "reforco": dict(config, medicos_disponiveis=6)}, trace=session)
+        self.assertEqual(rows[0]["Tempo Médio (min)"], rows[1]["Tempo Médio (min)"])
+        self.assertLess(rows[1]["Tempo no Sistema (min)"], rows[0]["Tempo no Sistema (min)"])
+        self.assertLess(rows[1]["Espera Média (min)"], rows[0]["Espera Média (min)"])
+        self.assertGreaterEqual(rows[1]["Espera Média (min)"], 0.0)
+        self.assertEqual(rows[0]["Pacientes"], len(session["results"]))
+
+    def test_batch_writes_sessions(self):
+        with tempfile.TemporaryDirectory() as sessions_dir:
+            rows = run_batch({"base": self.config}, replications=2, sessions_dir=sessions_dir)
+            self.assertEqual([row["Replicação"] for row in rows], [0, 1])
+            with open(os.path.join(sessions_dir, "base_rep1.json")) as f:
+                session = json.load(f)
+            self.assertEqual(set(session), {"config", "results", "stats"})
+            self.assertEqual(len(session["results"]), 5)
+
+    def test_config_hash_ignores_key_order(self):
+        reordered = dict(reversed(list(self.config.items())))
+        self.assertEqual(config_hash(self.config), config_hash(reordered))
+
+if __name__ == '__main__':
+    unittest.main()
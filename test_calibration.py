@@ -0,0 +1,148 @@
+# test_calibration.py: Testes unitários da calibração por registos de eventos
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from models.calibration import CalibrationState, ingest, summarize_chunk, turno_of_hours
+from models.compiled_config import compile_config
+from models.jit_kernel import PathSampler
+
+
+def event_log(num_patients=3000, days=2, seed=0):
+    """Registo ADT sintético gerado a partir de percursos amostrados do modelo."""
+    config = {
+        "sectors": ["Triagem", "Consulta", "Exames"],
+        "transition_base": [[0.2, 0.5, 0.2], [0.1, 0.3, 0.4], [0.1, 0.5, 0.2]],
+        "exit_probs": [0.1, 0.2, 0.2],
+        "num_patients": num_patients,
+        "turno": "manhã",
+        "gravidade": "média",
+        "medicos_disponiveis": 3,
+        "prioridade_ativa": True
+    }
+    np.random.seed(seed)
+    sampler = PathSampler(config, "numpy")
+    trace = sampler.sample(seed=seed).trace
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2025-03-01")
+    rows = []
+    for patient, (lo, hi) in enumerate(zip(trace.offsets[:-1], trace.offsets[1:])):
+        clock = rng.uniform(0, days * 1440) + np.concatenate([[0.0], np.cumsum(trace.service_times[lo:hi])])
+        gravidade = rng.choice(["baixa", "média", "alta"])
+        for k in range(hi - lo):
+            rows.append((f"P{patient}", clock[k], "A" if k == 0 else "T", sampler.config.sectors[trace.sectors[lo + k]], gravidade))
+        if trace.exited[patient]:
+            rows.append((f"P{patient}", clock[-1], "D", None, gravidade))
+    log = pd.DataFrame(rows, columns=["patient_id", "minutes", "event", "sector", "gravidade"]).sort_values("minutes")
+    log["timestamp"] = (start + pd.to_timedelta(log["minutes"], unit="min")).dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+    return sampler.config, log.drop(columns="minutes").reset_index(drop=True)
+
+
+class TestCalibration(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.config, cls.log = event_log()
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, "registo.csv")
+        cls.log.to_csv(cls.path, index=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def assertSameState(self, a, b):
+        self.assertEqual(a.transitions, b.transitions)
+        self.assertEqual(a.exits, b.exits)
+        self.assertEqual(a.admissions, b.admissions)
+        self.assertEqual(a.shifts, b.shifts)
+        self.assertEqual(set(a.service), set(b.service))
+        for key, (n, mean, m2) in a.service.items():
+            self.assertEqual(n, b.service[key][0])
+            self.assertAlmostEqual(mean, b.service[key][1], places=6)
+            self.assertAlmostEqual(m2, b.service[key][2], delta=1e-6 * max(m2, 1.0))
+
+    def test_recovers_model_parameters(self):
+        state = ingest([self.path], chunk_size=50_000)
+        self.assertEqual(len(state.open), 0)
+        config = state.to_config()
+        self.assertEqual(config["sectors"], list(self.config.sectors))
+        # Probabilidades conjuntas (com a saída) da execução que gerou o registo
+        np.testing.assert_allclose(config["transition_base"], self.config.transition_probs.to_dense(), atol=0.03)
+        np.testing.assert_allclose(config["exit_probs"], self.config.exit_probs, atol=0.03)
+        means = [config["service_means"][sector] for sector in config["sectors"]]
+        np.testing.assert_allclose(means, self.config.service_means, rtol=0.1)
+        compiled = compile_config(dict(config, medicos_disponiveis=3))
+        np.testing.assert_allclose(compiled.service_means, means)
+
+    def test_chunking_and_workers_do_not_change_counts(self):
+        whole = ingest([self.path], chunk_size=10**7)
+        chunked = ingest([self.path], chunk_size=333)
+        parallel = ingest([self.path], chunk_size=1000, workers=2)
+        self.assertSameState(whole, chunked)
+        self.assertSameState(whole, parallel)
+        self.assertEqual(whole.counters, chunked.counters)
+
+    def test_incremental_days(self):
+        cut = len(self.log) // 2
+        day1, day2 = os.path.join(self.tmp.name, "d1.csv"), os.path.join(self.tmp.name, "d2.csv")
+        self.log.iloc[:cut].to_csv(day1, index=False)
+        self.log.iloc[cut:].to_csv(day2, index=False)
+        state_path = os.path.join(self.tmp.name, "estado.json")
+        first = ingest([day1], chunk_size=700)
+        self.assertGreater(len(first.open), 0)
+        first.save(state_path)
+        resumed = ingest([day1, day2], CalibrationState.load(state_path), chunk_size=700)
+        self.assertEqual(resumed.counters["rows"], len(self.log))
+        self.assertSameState(resumed, ingest([self.path]))
+        self.assertEqual(len(resumed.open), 0)
+
+    def test_appended_log(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "registo.csv")
+            cut = len(self.log) // 2
+            self.log.iloc[:cut].to_csv(path, index=False)
+            state_path = ingest([path], chunk_size=700).save(os.path.join(directory, "estado.json"))
+            self.log.iloc[cut:].to_csv(path, mode="a", header=False, index=False)
+            resumed = ingest([path], CalibrationState.load(state_path), chunk_size=700)
+            self.assertSameState(resumed, ingest([self.path]))
+            self.assertEqual(resumed.counters["rows"], len(self.log))
+            self.assertEqual(resumed.files[os.path.abspath(path)]["rows"], len(self.log))
+            # Sem linhas novas nada é lido outra vez
+            self.assertEqual(ingest([path], resumed).counters["rows"], len(self.log))
+
+            # Um ficheiro reescrito (mais curto) não é lido de novo por cima do estado
+            self.log.iloc[:10].to_csv(path, index=False)
+            with self.assertRaises(ValueError):
+                ingest([path], resumed)
+
+    def test_dirty_rows(self):
+        frame = pd.DataFrame({
+            "patient_id": ["1", "1", "2", "3", "3", "3", "4"],
+            "timestamp": ["2025-01-01 08:00", "2025-01-01 08:30", "2025-01-01 09:00", "2025-01-01 10:00",
+                          "2025-01-01 10:20", "2025-01-01 11:00", "não é data"],
+            "event": ["admissão", " Alta ", "T", "A", "A", "D", "A"],
+            "sector": [" Triagem", None, "Consulta", "Triagem", "Consulta", None, "Triagem"]
+        })
+        state = CalibrationState().merge(summarize_chunk(frame))
+        self.assertEqual(state.counters["invalid"], 1)
+        self.assertEqual(state.counters["orphan"], 1)
+        self.assertEqual(state.counters["incomplete"], 1)
+        self.assertEqual(state.exits, {("manhã", "média", "Triagem"): 1, ("manhã", "média", "Consulta"): 1})
+        self.assertEqual(state.service[("manhã", "média", "Triagem")][:2], [1, 30.0])
+        self.assertEqual(list(turno_of_hours([7, 14, 15, 22, 23, 6])), ["manhã", "manhã", "tarde", "tarde", "noite", "noite"])
+
+    def test_sparse_rows_fall_back_to_pooled_counts(self):
+        state = ingest([self.path])
+        pooled = state.to_config()
+        sparse = state.to_config("noite", "alta", min_count=10**6)
+        self.assertEqual(sparse["transition_base"], pooled["transition_base"])
+        self.assertEqual(sparse["turno"], "noite")
+        dense = state.to_config("noite", "alta", min_count=1)
+        self.assertNotEqual(dense["transition_base"], pooled["transition_base"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+# test_compiled_config.py: Testes unitários da configuração compilada
+import json
+import pickle
+import unittest
+
+import numpy as np
+
+from models.compiled_config import CompiledConfig, compile_config, config_hash
+from models.hospital_sim import HospitalSimulator
+from models.batch_runner import run_replication
+from models.results_table import ResultsTable
+from data_manager import DataManager
+
+
+class TestCompiledConfig(unittest.TestCase):
+    def setUp(self):
+        self.config = {
+            "sectors": ["Triagem", "Consulta", "Exames"],
+            "transition_base": [[0.6, 0.2, 0.1], [0.2, 0.5, 0.2], [0.1, 0.3, 0.5]],
+            "exit_probs": [0.1, 0.1, 0.1],
+            "num_patients": 30,
+            "turno": "noite",
+            "gravidade": "alta",
+            "medicos_disponiveis": 2,
+            "prioridade_ativa": True
+        }
+
+    def test_resolved_fields(self):
+        compiled = compile_config(self.config)
+        self.assertEqual(compiled.sector_codes, {"Triagem": 0, "Consulta": 1, "Exames": 2})
+        self.assertEqual(compiled.doctor_sector, 1)
+        self.assertEqual(compiled.priority, -1)
+        self.assertAlmostEqual(compiled.turno_factor * compiled.gravidade_factor, 1.3 * 1.2)
+        np.testing.assert_allclose(compiled.service_means, [8.0, 12.0, 8.0])
+        self.assertIsNone(compiled.router)
+        self.assertEqual(compiled["sectors"], self.config["sectors"])
+
+    def test_immutable_and_hashable(self):
+        compiled = compile_config(self.config)
+        with self.assertRaises(AttributeError):
+            compiled.medicos = 5
+        with self.assertRaises(ValueError):
+            compiled.exit_probs[0] = 0.5
+        compiled["sectors"].append("Outro")
+        self.assertEqual(compiled.num_sectors, 3)
+        self.assertEqual(len(compiled["sectors"]), 3)
+        self.assertEqual(compiled.digest, config_hash(self.config))
+        self.assertEqual({compiled: 1}[pickle.loads(pickle.dumps(compiled))], 1)
+        self.assertNotEqual(compiled, compiled.replace(medicos_disponiveis=3))
+
+    def test_hash_uses_full_arrays(self):
+        base = np.full((60, 60), 0.01)
+        changed = base.copy()
+        changed[30, 30] = 0.02
+        self.assertIn("...", str(base))
+        self.assertNotEqual(config_hash(dict(self.config, transition_probs=base)),
+                            config_hash(dict(self.config, transition_probs=changed)))
+        self.assertEqual(config_hash(dict(self.config, transition_probs=base)),
+                         config_hash(dict(self.config, transition_probs=base.tolist())))
+
+    def test_service_means_override(self):
+        compiled = compile_config(dict(self.config, service_means={"Exames": 25.0}))
+        np.testing.assert_allclose(compiled.service_means, [8.0, 12.0, 25.0])
+        with self.assertRaises(ValueError):
+            compile_config(dict(self.config, service_means=[1.0]))
+
+    def test_simulator_accepts_compiled(self):
+        transition_probs = [[0.6, 0.2, 0.1], [0.2, 0.5, 0.2], [0.1, 0.3, 0.5]]
+        compiled = compile_config(self.config).with_transitions(transition_probs)
+        self.assertIsNotNone(compiled.router)
+        from_dict, _ = HospitalSimulator(self.config, transition_probs, seed=4).run_simulation()
+        from_compiled, _ = HospitalSimulator(compiled, seed=4).run_simulation()
+        self.assertEqual(from_dict, from_compiled)
+
+    def test_replication_returns_plain_config(self):
+        session = run_replication(compile_config(self.config), seed=1)
+        self.assertIsInstance(session["config"], dict)
+        self.assertNotIsInstance(session["config"], CompiledConfig)
+        self.assertIn("transition_probs", session["config"])
+
+    def test_session_without_transitions(self):
+        # sessions/simulacao_1.json foi gravada antes de as sessões guardarem a matriz normalizada
+        with open("sessions/simulacao_1.json", "r") as f:
+            session = json.load(f)
+        self.assertNotIn("transition_probs", session["config"])
+        config = DataManager().compile_session(session["config"], "simulacao_1")
+        transition_probs = config.transition_probs.to_dense()
+        self.assertEqual(transition_probs.shape, (len(config.sectors), len(config.sectors)))
+        np.testing.assert_allclose(transition_probs.sum(axis=1) + np.asarray(config["exit_probs"]), 1.0)
+        self.assertEqual(len(ResultsTable(session["results"], config.sectors)), len(session["results"]))
+        self.assertIs(DataManager().compile_session(config), config)
+
+
+if __name__ == "__main__":
+    unittest.main()
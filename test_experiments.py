@@ -0,0 +1,86 @@
+# test_experiments.py: Testes unitários dos planos de experiências
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from models.compiled_config import compile_config
+from models.experiments import ExperimentPlan, fractional_factorial, latin_hypercube, run_plan
+from models.markov_model import MarkovHospitalModel, compute_transitions_batch
+
+
+class TestExperimentPlan(unittest.TestCase):
+    def setUp(self):
+        self.config = {
+            "sectors": ["Triagem", "Consulta", "Exames"],
+            "transition_base": [[0.6, 0.2, 0.1], [0.2, 0.5, 0.2], [0.1, 0.3, 0.5]],
+            "exit_probs": [0.1, 0.1, 0.1],
+            "num_patients": 5,
+            "turno": "manhã",
+            "gravidade": "média",
+            "medicos_disponiveis": 2,
+            "prioridade_ativa": True
+        }
+
+    def test_full_factorial(self):
+        plan = ExperimentPlan(self.config, {"medicos_disponiveis": [1, 2, 3], "turno": ["manhã", "noite"]})
+        self.assertEqual(len(plan.points), 6)
+        self.assertIn({"medicos_disponiveis": 3, "turno": "noite"}, plan.points)
+
+    def test_fractional_factorial_is_balanced(self):
+        design = np.array(fractional_factorial(4, 1))
+        self.assertEqual(design.shape, (8, 4))
+        self.assertTrue(np.all(design.sum(axis=0) == 4))
+        self.assertEqual(len({tuple(row) for row in design}), 8)
+        with self.assertRaises(ValueError):
+            ExperimentPlan(self.config, {"turno": ["manhã", "tarde", "noite"]}, design="fractional")
+
+    def test_latin_hypercube_strata(self):
+        unit = latin_hypercube(10, 3, np.random.default_rng(0))
+        for column in unit.T:
+            self.assertEqual(sorted(np.floor(column * 10).astype(int).tolist()), list(range(10)))
+        plan = ExperimentPlan(self.config, {"num_patients": (5, 50)}, design="lhs", samples=8, seed=1)
+        self.assertTrue(all(isinstance(p["num_patients"], int) and 5 <= p["num_patients"] <= 50 for p in plan.points))
+
+    def test_compiled_base_config(self):
+        # As páginas passam a configuração compilada da sessão, com alterações por `replace`
+        compiled = compile_config(self.config).replace(turno="noite")
+        factors = {"medicos_disponiveis": [1, 3]}
+        from_dict = list(run_plan(ExperimentPlan(dict(self.config, turno="noite"), factors)))
+        from_compiled = list(run_plan(ExperimentPlan(compiled, factors)))
+        self.assertEqual(from_dict, from_compiled)
+
+    def test_duplicates_run_once(self):
+        plan = ExperimentPlan(self.config, {"medicos_disponiveis": [2, 2, 3]}, replications=2)
+        self.assertEqual(len(plan.tasks()), 4)
+        rows = list(run_plan(plan, workers=1))
+        self.assertEqual(len(rows), 6)
+        by_point = {(row["Ponto"], row["Replicação"]): row["Tempo Médio (min)"] for row in rows}
+        self.assertEqual(by_point[(0, 0)], by_point[(1, 0)])
+
+    def test_matrix_computed_once_per_turno(self):
+        plan = ExperimentPlan(self.config, {"medicos_disponiveis": [1, 2, 3], "turno": ["manhã", "noite"]})
+        with mock.patch("models.markov_model.compute_transitions_batch", wraps=compute_transitions_batch) as batch, \
+                mock.patch.object(MarkovHospitalModel, "compute_transitions") as single:
+            rows = list(run_plan(plan, workers=1))
+            unique = plan.unique_points()
+        self.assertEqual(len(rows), 6)
+        single.assert_not_called()
+        self.assertEqual(batch.call_count, 2)
+        self.assertEqual(sorted(batch.call_args[0][2]), [("manhã", "média"), ("noite", "média")])
+        matrices = {}
+        for config, _ in unique.values():
+            matrices.setdefault(config["turno"], set()).add(str(config["transition_probs"]))
+        self.assertEqual({turno: len(found) for turno, found in matrices.items()}, {"manhã": 1, "noite": 1})
+        self.assertNotEqual(matrices["manhã"], matrices["noite"])
+
+    def test_parallel_matches_sequential(self):
+        plan = ExperimentPlan(self.config, {"turno": ["manhã", "noite"]})
+        key = lambda row: row["Ponto"]
+        sequential = sorted(run_plan(plan, workers=1), key=key)
+        parallel = sorted(run_plan(plan, workers=2), key=key)
+        self.assertEqual(sequential, parallel)
+
+
+if __name__ == "__main__":
+    unittest.main()
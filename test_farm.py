@@ -0,0 +1,78 @@
+# test_farm.py: Testes unitários para o coordenador de replicações distribuídas
+import multiprocessing
+import threading
+import unittest
+from models.farm import FarmCoordinator, run_worker
+
+class TestFarm(unittest.TestCase):
+    def setUp(self):
+        self.config = {
+            "sectors": ["Triagem", "Consulta", "Exames"],
+            "transition_base": [[0.6, 0.2, 0.1], [0.2, 0.5, 0.2], [0.1, 0.3, 0.5]],
+            "exit_probs": [0.2, 0.2, 0.2],
+            "num_patients": 5,
+            "turno": "manhã",
+            "gravidade": "média",
+            "medicos_disponiveis": 2,
+            "prioridade_ativa": True
+        }
+
+    def test_duplicate_units_are_collapsed(self):
+        coordinator = FarmCoordinator({"a": self.config, "b": dict(self.config)}, seeds=[1, 2, 1])
+        self.assertEqual(len(coordinator.units), 2)
+
+    def test_identical_configs_keep_every_name(self):
+        coordinator = FarmCoordinator({"a": self.config, "b": dict(self.config)}, seeds=[1, 2])
+        while True:
+            unit = coordinator.lease("w")
+            if unit is None:
+                break
+            summary = {"Config": unit["name"], "Replicação": unit["replication"], "Semente": unit["seed"]}
+            coordinator.complete(unit["unit_id"], summary)
+        self.assertTrue(coordinator.done)
+        rows = coordinator.rows()
+        self.assertEqual([(row["Config"], row["Replicação"], row["Semente"]) for row in rows],
+                         [("a", 0, 1), ("a", 1, 2), ("b", 0, 1), ("b", 1, 2)])
+
+    def test_expired_lease_is_retried_and_results_deduplicated(self):
+        coordinator = FarmCoordinator({"a": self.config}, seeds=[1], lease_seconds=0.0, max_attempts=3)
+        first = coordinator.lease("w1")
+        second = coordinator.lease("w2")  # o prazo de w1 já expirou
+        self.assertEqual(first["unit_id"], second["unit_id"])
+        self.assertTrue(coordinator.complete(second["unit_id"], {"Config": "a", "Replicação": 0}))
+        self.assertFalse(coordinator.complete(first["unit_id"], {"Config": "a", "Replicação": 0}))
+        self.assertTrue(coordinator.done)
+        self.assertEqual(len(coordinator.rows()), 1)
+
+    def test_failures_stop_after_max_attempts(self):
+        coordinator = FarmCoordinator({"a": self.config}, seeds=[1], max_attempts=2)
+        for _ in range(2):
+            unit = coordinator.lease("w")
+            coordinator.fail(unit["unit_id"], "erro")
+        self.assertIsNone(coordinator.lease("w"))
+        self.assertTrue(coordinator.done)
+        self.assertEqual(len(coordinator.failed), 1)
+
+    def test_local_worker_processes(self):
+        coordinator = FarmCoordinator({"a": self.config, "b": dict(self.config, medicos_disponiveis=3)}, seeds=[0, 1, 2])
+        server = coordinator.make_server("127.0.0.1", 0)
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        workers = [multiprocessing.Process(target=run_worker, args=(url,), kwargs={"poll_interval": 0.05}) for _ in range(3)]
+        try:
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join(timeout=60)
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertTrue(coordinator.done)
+        rows = coordinator.rows()
+        self.assertEqual(len(rows), 6)
+        self.assertEqual({(row["Config"], row["Semente"]) for row in rows},
+                         {(name, seed) for name in "ab" for seed in range(3)})
+
+if __name__ == '__main__':
+    unittest.main()
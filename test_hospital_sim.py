@@ -1,6 +1,9 @@
 # test_hospital_sim.py: Testes unitários para a simulação
 import unittest
+import numpy as np
 from models.hospital_sim import HospitalSimulator
+from models.event_kernel import HeapEventKernel
+from models.sampling import SparseTransitions
 
 class TestHospitalSimulator(unittest.TestCase):
     def setUp(self):
@@ -29,5 +32,79 @@ class TestHospitalSimulator(unittest.TestCase):
         self.assertTrue(all(v >= 0 for v in stats["sector_visits"].values()))
         self.assertTrue(0 <= stats["doctor_occupation"] <= 1)
 
+    def test_occupation_is_busy_time_over_capacity(self):
+        # Vários médicos ocupados ao mesmo tempo: o tempo-médico ocupado é a soma das consultas
+        config = dict(self.config, num_patients=40, medicos_disponiveis=3)
+        for engine in ("simpy", "heap"):
+            results, stats = HospitalSimulator(config, self.transition_probs, seed=2, engine=engine).run_simulation()
+            consultas = sum(
+                duration for r in results
+                for sector, duration in zip(r["sectors_visited"], r["service_times"]) if sector == "Consulta"
+            )
+            horizon = max(r["departure_time"] for r in results)
+            self.assertAlmostEqual(stats["doctor_occupation"], consultas / (3 * horizon))
+            self.assertTrue(0 < stats["doctor_occupation"] <= 1)
+
+    def test_sparse_matches_dense(self):
+        dense_results, _ = HospitalSimulator(self.config, self.transition_probs, seed=3).run_simulation()
+        sparse = SparseTransitions.from_dense(self.transition_probs)
+        sparse_results, _ = HospitalSimulator(self.config, sparse, seed=3).run_simulation()
+        self.assertEqual(dense_results, sparse_results)
+
+    def test_sparse_routing_respects_missing_entries(self):
+        config = dict(self.config, num_patients=50, exit_probs=[0.2, 0.2, 0.2])
+        # Triagem -> Consulta -> Exames -> Triagem, sem outras ligações
+        sparse = {"indptr": [0, 1, 2, 3], "indices": [1, 2, 0], "data": [1.0, 1.0, 1.0]}
+        results, _ = HospitalSimulator(config, sparse, seed=1).run_simulation()
+        order = {"Triagem": "Consulta", "Consulta": "Exames", "Exames": "Triagem"}
+        for result in results:
+            path = [s for s in result["sectors_visited"] if s != "Saída"]
+            for current, following in zip(path, path[1:]):
+                self.assertEqual(order[current], following)
+
+    def test_heap_kernel_advances_in_windows(self):
+        config = dict(self.config, num_patients=40)
+        whole, _ = HospitalSimulator(config, self.transition_probs, seed=5, engine="heap").run_simulation()
+        kernel = HeapEventKernel(HospitalSimulator(config, self.transition_probs, seed=5, engine="heap"))
+        for until in range(10, 2000, 10):
+            kernel.advance(until)
+        kernel.advance()
+        self.assertEqual(kernel.results, whole)
+
+        # Chegada de fora: entra no setor indicado, no instante pedido
+        kernel = HeapEventKernel(HospitalSimulator(config, self.transition_probs, seed=5, engine="heap"))
+        finished = {}
+        kernel.on_finish = lambda patient, result, exited: finished.setdefault(patient, kernel.extra.get(patient))
+        kernel.add_arrival(30.0, (1, 1), 2, -1, "externo")
+        kernel.run()
+        arrival = [r for r in kernel.results if r["arrival_time"] == 30.0]
+        self.assertEqual(len(kernel.results), 41)
+        self.assertEqual(len(arrival), 1)
+        self.assertEqual(arrival[0]["sectors_visited"][0], "Exames")
+        self.assertEqual(finished[40], "externo")
+
+    def test_heap_engine_results(self):
+        results, stats = HospitalSimulator(self.config, self.transition_probs, seed=2, engine="heap").run_simulation()
+        self.assertEqual(sorted(r["patient_id"] for r in results), list(range(5)))
+        self.assertEqual(set(stats), {"avg_time_per_sector", "sector_visits", "doctor_usage", "doctor_occupation"})
+        self.assertEqual(
+            sum(stats["sector_visits"].values()),
+            sum(len([s for s in r["sectors_visited"] if s != "Saída"]) for r in results)
+        )
+        self.assertTrue(0 <= stats["doctor_occupation"] <= 1)
+
+    def test_heap_engine_matches_simpy_statistically(self):
+        config = dict(self.config, num_patients=3000)
+        means = {}
+        for engine in ["simpy", "heap"]:
+            results, _ = HospitalSimulator(config, self.transition_probs, seed=4, engine=engine).run_simulation()
+            means[engine] = np.mean([r["total_waiting_time"] for r in results])
+        # Erro padrão da média ~ 1.5 min com 3000 pacientes
+        self.assertAlmostEqual(means["simpy"], means["heap"], delta=6.0)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            HospitalSimulator(self.config, self.transition_probs, engine="outro")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,74 @@
+# test_jit_kernel.py: Testes unitários do núcleo de amostragem de percursos em lote
+import unittest
+
+import numpy as np
+
+from models.batch_runner import run_replication
+from models.jit_kernel import PathSampler, HAS_NUMBA
+from models.markov_analytics import routing_matrix, expected_visits
+
+
+class TestPathSampler(unittest.TestCase):
+    def setUp(self):
+        config = {
+            "sectors": ["Triagem", "Consulta", "Exames", "Raio-X"],
+            "transition_base": [
+                [0.5, 0.2, 0.1, 0.1], [0.2, 0.4, 0.2, 0.1], [0.1, 0.3, 0.4, 0.1], [0.0, 0.0, 0.0, 0.0]
+            ],
+            "exit_probs": [0.1, 0.1, 0.1, 0.05],
+            "num_patients": 500,
+            "turno": "manhã",
+            "gravidade": "alta",
+            "medicos_disponiveis": 2,
+            "prioridade_ativa": True
+        }
+        np.random.seed(0)
+        # Configuração com a matriz já calculada: todos os núcleos usam a mesma
+        self.config = PathSampler(config, "numpy").config
+
+    def assertSamePaths(self, a, b):
+        np.testing.assert_array_equal(a.totals, b.totals)
+        np.testing.assert_array_equal(a.sector_time, b.sector_time)
+        np.testing.assert_array_equal(a.sector_visits, b.sector_visits)
+        np.testing.assert_array_equal(a.trace.offsets, b.trace.offsets)
+        np.testing.assert_array_equal(a.trace.sectors, b.trace.sectors)
+        np.testing.assert_array_equal(a.trace.service_times, b.trace.service_times)
+        np.testing.assert_array_equal(a.trace.exited, b.trace.exited)
+
+    def test_numpy_matches_python_loop_bit_for_bit(self):
+        for chunk_size in (64, 4096):
+            numpy_paths = PathSampler(self.config, "numpy", chunk_size=chunk_size).sample(seed=7)
+            loop_paths = PathSampler(self.config, "python", chunk_size=chunk_size).sample(seed=7)
+            self.assertSamePaths(numpy_paths, loop_paths)
+
+    @unittest.skipUnless(HAS_NUMBA, "Numba não instalado")
+    def test_numba_matches_numpy(self):
+        self.assertSamePaths(
+            PathSampler(self.config, "numba").sample(seed=7),
+            PathSampler(self.config, "numpy").sample(seed=7)
+        )
+
+    def test_expected_visits(self):
+        paths = PathSampler(self.config, "numpy").sample(20000, seed=1)
+        visits = expected_visits(routing_matrix(self.config.transition_probs.to_dense(), self.config.exit_probs))
+        np.testing.assert_allclose(paths.sector_visits / 20000, visits, rtol=0.05)
+        np.testing.assert_allclose(paths.totals.sum(), paths.sector_time.sum())
+        self.assertTrue(np.all(paths.trace.priorities == -1))
+
+    def test_invalid_backend(self):
+        with self.assertRaises(ValueError):
+            PathSampler(self.config, "fortran")
+        if not HAS_NUMBA:
+            with self.assertRaises(ValueError):
+                PathSampler(self.config, "numba")
+
+    def test_replication_with_kernel(self):
+        session = run_replication(self.config.to_dict(), seed=3, engine="heap", kernel="numpy")
+        again = run_replication(self.config.to_dict(), seed=3, engine="simpy", kernel="numpy")
+        self.assertEqual(len(session["results"]), 500)
+        totals = [r["total_waiting_time"] for r in session["results"]]
+        self.assertEqual(sorted(totals), sorted(r["total_waiting_time"] for r in again["results"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+# test_markov_analytics.py: Testes unitários da ocupação transitória por uniformização
+import unittest
+
+import numpy as np
+
+from models.markov_analytics import (
+    routing_matrix, fundamental_matrix, expected_visits, generator_matrix, transient_occupancy, simulated_occupancy,
+    IncrementalMarkovAnalysis, REFRESH_EVERY
+)
+from models.markov_model import normalize_transitions
+from models.jit_kernel import PathSampler
+
+
+class TestTransientOccupancy(unittest.TestCase):
+    def setUp(self):
+        self.transitions = np.array([[0.5, 0.3, 0.1], [0.2, 0.4, 0.2], [0.1, 0.3, 0.5]])
+        self.exits = np.array([0.1, 0.2, 0.1])
+        self.means = np.array([10.0, 15.0, 10.0])
+
+    def test_single_sector_closed_form(self):
+        times = np.linspace(0, 300, 31)
+        occupancy = transient_occupancy([[1.0]], [0.3], [10.0], times, num_patients=50)
+        np.testing.assert_allclose(occupancy[:, 0], 50 * np.exp(-times * 0.3 / 10.0), rtol=1e-8)
+
+    def test_generator_rows_sum_to_zero(self):
+        generator = generator_matrix(self.transitions, self.exits, self.means)
+        np.testing.assert_allclose(generator.sum(axis=1), 0.0, atol=1e-12)
+        self.assertTrue(np.all(generator[-1] == 0))
+
+    def test_area_equals_expected_time_per_sector(self):
+        times = np.linspace(0, 4000, 8001)
+        occupancy = transient_occupancy(self.transitions, self.exits, self.means, times)
+        visits = expected_visits(routing_matrix(self.transitions, self.exits))
+        np.testing.assert_allclose(np.trapezoid(occupancy, times, axis=0), visits * self.means, rtol=1e-3)
+
+    def test_matches_sampled_paths(self):
+        config = {
+            "sectors": ["Triagem", "Consulta", "Exames"],
+            "transition_base": self.transitions.tolist(),
+            "transition_probs": self.transitions.tolist(),
+            "exit_probs": self.exits.tolist(),
+            "num_patients": 20000,
+            "turno": "manhã",
+            "gravidade": "média",
+            "medicos_disponiveis": 2,
+            "prioridade_ativa": False
+        }
+        paths = PathSampler(config, "numpy").sample(seed=0)
+        trace = paths.trace
+        results = [
+            {
+                "sectors_visited": [config["sectors"][c] for c in trace.sectors[lo:hi]],
+                "service_times": trace.service_times[lo:hi].tolist()
+            }
+            for lo, hi in zip(trace.offsets[:-1], trace.offsets[1:])
+        ]
+        times = np.array([5.0, 30.0, 60.0, 120.0])
+        simulated = simulated_occupancy(results, config["sectors"], times)
+        analytic = transient_occupancy(self.transitions, self.exits, [10.0, 15.0, 10.0], times, 20000)
+        # Erro de Monte Carlo ~ sqrt(n): tolerância de 5 desvios
+        np.testing.assert_array_less(np.abs(simulated - analytic), 5 * np.sqrt(analytic) + 1)
+
+
+class TestIncrementalMarkovAnalysis(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.transitions = rng.uniform(0, 1, (8, 8))
+        self.exits = rng.uniform(0.05, 0.3, 8)
+        self.means = rng.uniform(5, 20, 8)
+
+    def assertMatchesFullSolve(self, analysis):
+        routing = routing_matrix(analysis.transition_probs, analysis.exit_probs)
+        np.testing.assert_allclose(analysis.fundamental, fundamental_matrix(routing), rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(analysis.visits(), expected_visits(routing), rtol=1e-9)
+        transitions, exits = normalize_transitions(analysis.transition_probs, analysis.exit_probs)
+        np.testing.assert_allclose(analysis.normalized_transitions, transitions)
+        np.testing.assert_allclose(analysis.normalized_exits, exits)
+
+    def test_row_edits_match_full_solve(self):
+        analysis = IncrementalMarkovAnalysis(self.transitions, self.exits, self.means)
+        rng = np.random.default_rng(1)
+        for _ in range(REFRESH_EVERY - 1):
+            row = rng.integers(8)
+            edited = analysis.transition_probs[row].copy()
+            edited[rng.integers(8)] = rng.uniform(0, 1)
+            self.assertTrue(analysis.update_row(row, edited))
+        self.assertEqual(analysis.counters["full_solves"], 1)
+        self.assertEqual(analysis.counters["rank_one"], REFRESH_EVERY - 1)
+        self.assertMatchesFullSolve(analysis)
+        self.assertAlmostEqual(analysis.total_time(), float(expected_visits(analysis.routing) @ self.means))
+        self.assertFalse(analysis.update_row(0, analysis.transition_probs[0]))
+
+    def test_zero_row_and_refresh(self):
+        analysis = IncrementalMarkovAnalysis(self.transitions, self.exits)
+        analysis.update_row(3, np.zeros(8), 0.0)
+        self.assertMatchesFullSolve(analysis)
+        for step in range(REFRESH_EVERY):
+            analysis.update_row(step % 8, self.transitions[step % 8] * (2 + step % 3))
+        self.assertEqual(analysis.counters["full_solves"], 2)
+        self.assertMatchesFullSolve(analysis)
+
+    def test_selective_invalidation(self):
+        transitions = self.transitions.copy()
+        # O setor 7 não é alcançável a partir da entrada
+        transitions[:, 7] = 0.0
+        analysis = IncrementalMarkovAnalysis(transitions, self.exits, self.means)
+        visits = analysis.visits()
+        analysis.absorption_time()
+        analysis.update_row(7, np.ones(8))
+        self.assertIs(analysis.visits(), visits)
+        np.testing.assert_allclose(analysis.absorption_time(), fundamental_matrix(analysis.routing) @ self.means)
+
+        analysis.set_means(self.means * 2)
+        self.assertIs(analysis.visits(), visits)
+        self.assertAlmostEqual(analysis.total_time(), 2 * float(visits @ self.means))
+        analysis.update_row(0, np.ones(8))
+        self.assertIsNot(analysis.visits(), visits)
+        self.assertMatchesFullSolve(analysis)
+
+    def test_update_diffs_rows(self):
+        analysis = IncrementalMarkovAnalysis(self.transitions, self.exits)
+        edited = self.transitions.copy()
+        edited[2, 5] = 0.0
+        exits = self.exits.copy()
+        exits[6] = 0.5
+        self.assertEqual(analysis.update(edited, exits), [2, 6])
+        self.assertEqual(analysis.invalid_rows(), list(range(8)))
+        self.assertMatchesFullSolve(analysis)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 import numpy as np
-from models.markov_model import MarkovHospitalModel
+from models.markov_model import MarkovHospitalModel, compute_transitions_batch
 
 class TestMarkovModel(unittest.TestCase):
     def setUp(self):
@@ -44,5 +44,34 @@ class TestMarkovModel(unittest.TestCase):
         for prob in transition_probs.flatten():
             self.assertGreaterEqual(prob, 0)
 
+    def test_batch_shapes_and_normalization(self):
+        combos = [("manhã", "baixa"), ("tarde", "média"), ("noite", "alta")]
+        transitions, exits = self.model.compute_transitions_batch(combos, seed=1)
+        self.assertEqual(transitions.shape, (3, 3, 3))
+        self.assertEqual(exits.shape, (3, 3))
+        np.testing.assert_allclose(transitions.sum(axis=-1) + exits, 1.0)
+
+        transitions, exits = self.model.compute_transitions_batch(combos, noise_draws=4, seed=1)
+        self.assertEqual(transitions.shape, (3, 4, 3, 3))
+        self.assertEqual(exits.shape, (3, 4, 3))
+
+    def test_batch_is_cached_per_seed(self):
+        combos = [("manhã", "média")]
+        first = compute_transitions_batch(self.config["transition_base"], self.config["exit_probs"], combos, seed=5)
+        second = compute_transitions_batch(self.config["transition_base"], self.config["exit_probs"], combos, seed=5)
+        other = compute_transitions_batch(self.config["transition_base"], self.config["exit_probs"], combos, seed=6)
+        self.assertIs(first[0], second[0])
+        self.assertFalse(np.array_equal(first[0], other[0]))
+        self.assertFalse(first[0].flags.writeable)
+
+    def test_batch_matches_single_model(self):
+        np.random.seed(0)
+        single = self.model.compute_transitions()
+        np.random.seed(0)
+        batch, _ = compute_transitions_batch(
+            [[0.6, 0.3, 0.0], [0.2, 0.5, 0.2], [0.1, 0.3, 0.5]], [0.1, 0.1, 0.1], [("manhã", "média")]
+        )
+        np.testing.assert_allclose(batch[0], single)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,97 @@
+# test_network.py: Testes unitários da rede de hospitais com sincronização conservadora
+import math
+import unittest
+
+from models.batch_runner import run_replication
+from models.network import run_network, parse_network, safe_times, hospital_seed
+
+
+def hospital(num_patients, medicos, sectors=("Triagem", "Consulta", "Exames")):
+    size = len(sectors)
+    return {
+        "sectors": list(sectors),
+        "transition_base": [[0.3] * size for _ in range(size)],
+        "exit_probs": [0.15] * size,
+        "num_patients": num_patients,
+        "turno": "manhã",
+        "gravidade": "média",
+        "medicos_disponiveis": medicos,
+        "prioridade_ativa": True
+    }
+
+
+class TestNetwork(unittest.TestCase):
+    def setUp(self):
+        self.network = {
+            "hospitals": {
+                "Lubango": hospital(120, 3),
+                "Referência": hospital(40, 2),
+                "Satélite": hospital(80, 1, ("Triagem", "Consulta"))
+            },
+            "transfers": [
+                {"from": "Satélite", "to": "Lubango", "probability": 0.3, "time": 45},
+                {"from": "Lubango", "to": "Referência", "probability": 0.2, "time": 90, "sector": "Consulta"},
+                {"from": "Referência", "to": "Lubango", "probability": 0.1, "time": 90}
+            ]
+        }
+
+    def test_isolated_hospital_matches_heap_engine(self):
+        config = hospital(150, 2)
+        output = run_network({"hospitals": {"H": config}}, seed=4)
+        reference = run_replication(config, hospital_seed(4, 0), "heap")
+        self.assertEqual(output["hospitals"]["H"]["results"], reference["results"])
+        self.assertEqual(output["hospitals"]["H"]["stats"]["doctor_occupation"], reference["stats"]["doctor_occupation"])
+
+    def test_parallel_equals_sequential(self):
+        sequential = run_network(self.network, seed=1, workers=1)
+        parallel = run_network(self.network, seed=1, workers=3)
+        narrow = run_network(self.network, seed=1, workers=2, max_window=5.0)
+        self.assertGreater(narrow["windows"], sequential["windows"])
+        for name, session in sequential["hospitals"].items():
+            self.assertEqual(parallel["hospitals"][name]["results"], session["results"])
+            self.assertEqual(narrow["hospitals"][name]["results"], session["results"])
+        self.assertGreater(sequential["transfers"], 0)
+
+    def test_transfers_are_conserved(self):
+        output = run_network(self.network, seed=2, workers=1)
+        hospitals = output["hospitals"]
+        sent = sum(sum(s["stats"]["transfers_out"].values()) for s in hospitals.values())
+        received = sum(sum(s["stats"]["transfers_in"].values()) for s in hospitals.values())
+        self.assertEqual(sent, received)
+        self.assertEqual(sent, output["transfers"])
+        self.assertEqual(len(hospitals["Satélite"]["results"]), 80)
+        arrivals = [r for r in hospitals["Referência"]["results"] if "origin" in r]
+        self.assertTrue(arrivals)
+        for result in arrivals:
+            self.assertEqual(result["origin"], "Lubango")
+            self.assertEqual(result["sectors_visited"][0], "Consulta")
+            self.assertGreaterEqual(result["arrival_time"], 90)
+        transferred = [r for r in hospitals["Satélite"]["results"] if "transferred_to" in r]
+        self.assertEqual(len(transferred), hospitals["Satélite"]["stats"]["transfers_out"]["Lubango"])
+
+    def test_safe_times(self):
+        _, _, links = parse_network(self.network)
+        safe = safe_times(links, [10.0, 50.0, 0.0])
+        # Satélite não recebe transferências; Lubango espera pelo Satélite (0 + 45)
+        self.assertEqual(safe[2], math.inf)
+        self.assertEqual(safe[0], 45.0)
+        self.assertEqual(safe[1], 100.0)
+        self.assertEqual(safe_times(links, [10.0, 50.0, math.inf]), [140.0, 100.0, math.inf])
+
+    def test_invalid_networks(self):
+        invalid = [
+            {"from": "Satélite", "to": "Lubango", "probability": 0.3, "time": 0},
+            {"from": "Satélite", "to": "Huambo", "probability": 0.3, "time": 10},
+            {"from": "Satélite", "to": "Lubango", "probability": 0.3, "time": 10, "sector": "Raio-X"},
+            {"from": "Lubango", "to": "Satélite", "probability": 0.9, "time": 10}
+        ]
+        for transfer in invalid:
+            network = dict(self.network, transfers=self.network["transfers"] + [transfer])
+            with self.assertRaises(ValueError):
+                run_network(network)
+        with self.assertRaises(ValueError):
+            run_network({"hospitals": {}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+# test_path_index.py: Testes unitários do índice de caminhos
+import unittest
+
+import numpy as np
+
+from models.path_index import PathIndex
+
+
+class TestPathIndex(unittest.TestCase):
+    def setUp(self):
+        a = ["Triagem", "Consulta", "Saída"]
+        b = ["Triagem", "Exames"]
+        self.results = [
+            {"patient_id": 10, "total_waiting_time": 10.0, "sectors_visited": a, "service_times": [4.0, 6.0], "priority": "Normal"},
+            {"patient_id": 11, "total_waiting_time": 30.0, "sectors_visited": b, "priority": "Normal"},
+            {"patient_id": 12, "total_waiting_time": 20.0, "sectors_visited": list(a), "service_times": [8.0, 12.0], "priority": "Normal"},
+            {"patient_id": 13, "total_waiting_time": 40.0, "sectors_visited": list(a), "service_times": [10.0, 30.0], "priority": "Alta"}
+        ]
+        self.index = PathIndex(self.results)
+
+    def test_variants(self):
+        self.assertEqual(len(self.index), 2)
+        top = self.index.top_k(5).tolist()
+        self.assertEqual(top, [0, 1])
+        self.assertEqual(self.index.counts.tolist(), [3, 1])
+        self.assertAlmostEqual(self.index.mean_times[0], 70.0 / 3)
+        self.assertAlmostEqual(self.index.p50_times[0], np.percentile([10, 20, 40], 50))
+        self.assertAlmostEqual(self.index.p90_times[0], np.percentile([10, 20, 40], 90))
+        self.assertEqual(self.index.members(0).tolist(), [0, 2, 3])
+
+    def test_patient_lookup_and_step_times(self):
+        result, variant = self.index.patient(11)
+        self.assertEqual(result["total_waiting_time"], 30.0)
+        self.assertEqual(variant, 1)
+        self.assertEqual(self.index.patient(99), (None, None))
+        np.testing.assert_allclose(self.index.step_times(0), [22.0 / 3, 16.0])
+        np.testing.assert_allclose(self.index.step_times(1), [15.0, 15.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
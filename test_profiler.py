@@ -0,0 +1,49 @@
+# test_profiler.py: Testes unitários do perfil por fases
+import json
+import os
+import pstats
+import tempfile
+import unittest
+
+from models.hospital_sim import HospitalSimulator
+from models.profiler import PhaseProfiler
+
+
+class TestPhaseProfiler(unittest.TestCase):
+    def setUp(self):
+        self.config = {
+            "sectors": ["Triagem", "Consulta", "Exames"],
+            "num_patients": 20,
+            "gravidade": "média",
+            "medicos_disponiveis": 2,
+            "exit_probs": [0.2, 0.2, 0.2],
+            "prioridade_ativa": False
+        }
+        self.transition_probs = [[0.2, 0.5, 0.1], [0.2, 0.3, 0.3], [0.1, 0.5, 0.2]]
+
+    def test_phases_recorded(self):
+        profiler = PhaseProfiler()
+        with profiler.phase("alocação"):
+            data = [0] * 100000
+        self.assertEqual(len(data), 100000)
+        record = profiler.phases["alocação"]
+        self.assertGreaterEqual(record["wall_s"], 0)
+        self.assertGreater(record["peak_kib"], 700)
+        restored = PhaseProfiler.from_dict(json.loads(profiler.to_json()))
+        self.assertEqual(restored.rows(), profiler.rows())
+
+    def test_simulation_phases_and_cprofile(self):
+        profiler = PhaseProfiler(trace_memory=False)
+        HospitalSimulator(self.config, self.transition_probs, seed=1).run_simulation(profiler, profile_engine=True)
+        self.assertEqual([row["Fase"] for row in profiler.rows()], ["Simulação (motor)", "Agregação de estatísticas"])
+        self.assertIsNone(profiler.phases["Simulação (motor)"]["peak_kib"])
+        self.assertIn("patient_process", profiler.profiles["Simulação (motor)"])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sim.prof")
+            with open(path, "wb") as f:
+                f.write(profiler.raw_profiles["Simulação (motor)"])
+            self.assertGreater(pstats.Stats(path).total_calls, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
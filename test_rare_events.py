@@ -0,0 +1,65 @@
+# test_rare_events.py: Testes unitários da estimativa de caudas por amostragem por importância
+import unittest
+
+import numpy as np
+
+from models.batch_runner import run_replication
+from models.rare_events import TailEstimator
+
+
+class TestTailEstimator(unittest.TestCase):
+    def setUp(self):
+        # Um setor que volta a si próprio: T ~ Exponencial de média m/p
+        self.single = {
+            "sectors": ["Triagem"],
+            "transition_base": [[0.7]],
+            "transition_probs": [[0.7]],
+            "exit_probs": [0.3],
+            "num_patients": 1,
+            "turno": "manhã",
+            "gravidade": "média",
+            "medicos_disponiveis": 1,
+            "prioridade_ativa": False
+        }
+        self.config = {
+            "sectors": ["Triagem", "Consulta", "Exames"],
+            "transition_base": [[0.6, 0.2, 0.1], [0.2, 0.5, 0.2], [0.1, 0.3, 0.5]],
+            "exit_probs": [0.1, 0.1, 0.1],
+            "num_patients": 20000,
+            "turno": "manhã",
+            "gravidade": "média",
+            "medicos_disponiveis": 3,
+            "prioridade_ativa": False
+        }
+
+    def test_closed_form_single_sector(self):
+        estimator = TailEstimator(self.single, seed=0)
+        for threshold in (240, 400):
+            exact = np.exp(-threshold * 0.3 / 10.0)
+            estimate = estimator.estimate(threshold, samples=10000)
+            self.assertLess(abs(estimate.probability - exact), 4 * estimate.std_error)
+            self.assertLess(estimate.relative_error, 0.1)
+            # A simulação direta precisaria de muito mais pacientes
+            self.assertGreater(estimate.plain_runs, 50 * estimate.samples)
+
+    def test_sector_threshold_matches_total_with_one_sector(self):
+        estimate = TailEstimator(self.single, seed=1).estimate(240, sector="Triagem")
+        self.assertLess(abs(estimate.probability - np.exp(-7.2)), 4 * estimate.std_error)
+        with self.assertRaises(ValueError):
+            TailEstimator(self.single).estimate(240, sector="Raio-X")
+
+    def test_matches_simulation(self):
+        session = run_replication(self.config, seed=0, engine="heap")
+        times = np.array([r["total_waiting_time"] for r in session["results"]])
+        direct = (times > 300).mean()
+        direct_error = np.sqrt(direct * (1 - direct) / len(times))
+        estimate = TailEstimator(session["config"], seed=0).estimate(300)
+        self.assertLess(abs(estimate.probability - direct), 4 * np.hypot(direct_error, estimate.std_error))
+
+    def test_nominal_paths_have_unit_weight(self):
+        _, log_ratio, _ = TailEstimator(self.config, seed=0).simulate(100)
+        np.testing.assert_allclose(log_ratio, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# test_resources.py: Testes unitários para o recurso com fila em heap
+import unittest
+import simpy
+from models.resources import HeapPriorityResource
+
+class TestHeapPriorityResource(unittest.TestCase):
+    def setUp(self):
+        self.env = simpy.Environment()
+        self.resource = HeapPriorityResource(self.env, capacity=1)
+        self.order = []
+
+    def patient(self, name, priority, service=1.0):
+        with self.resource.request(priority=priority) as req:
+            yield req
+            self.order.append(name)
+            yield self.env.timeout(service)
+
+    def test_priority_then_fifo(self):
+        for name, priority in [("a", 0), ("b", 0), ("c", -1), ("d", 0), ("e", -1)]:
+            self.env.process(self.patient(name, priority))
+        self.env.run()
+        self.assertEqual(self.order, ["a", "c", "e", "b", "d"])
+
+    def test_wait_counters(self):
+        for name in "abc":
+            self.env.process(self.patient(name, 0, service=2.0))
+        self.env.run()
+        counters = self.resource.counters()
+        self.assertEqual(counters["grants"], 3)
+        self.assertEqual(counters["max_queue_length"], 2)
+        self.assertEqual(counters["queue_length"], 0)
+        self.assertAlmostEqual(counters["total_wait"], 0 + 2 + 4)
+        self.assertAlmostEqual(counters["max_wait"], 4.0)
+
+    def test_set_capacity(self):
+        starts = []
+
+        def patient(name):
+            with self.resource.request(priority=0) as req:
+                yield req
+                starts.append((name, self.env.now))
+                yield self.env.timeout(10)
+
+        def grow():
+            yield self.env.timeout(2)
+            self.resource.set_capacity(3)
+
+        for name in "abcd":
+            self.env.process(patient(name))
+        self.env.process(grow())
+        self.env.run()
+        self.assertEqual(starts, [("a", 0), ("b", 2), ("c", 2), ("d", 10)])
+
+    def test_cancelled_request_leaves_queue(self):
+        def impatient():
+            with self.resource.request(priority=0) as req:
+                result = yield req | self.env.timeout(0.5)
+                if req not in result:
+                    self.order.append("desistiu")
+                    return
+        self.env.process(self.patient("a", 0))
+        self.env.process(impatient())
+        self.env.process(self.patient("b", 0))
+        self.env.run()
+        self.assertEqual(self.order, ["a", "desistiu", "b"])
+        self.assertEqual(len(self.resource.put_queue), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+# test_results_table.py: Testes unitários da tabela de resultados
+import unittest
+
+import numpy as np
+
+from models.results_table import ResultsTable
+
+
+class TestResultsTable(unittest.TestCase):
+    def setUp(self):
+        self.sectors = [f"Setor {i}" for i in range(70)]
+        self.results = [
+            {"patient_id": 0, "total_waiting_time": 12.5, "sectors_visited": ["Setor 0", "Setor 1", "Saída"], "priority": "Alta"},
+            {"patient_id": 1, "total_waiting_time": 30.0, "sectors_visited": ["Setor 0", "Setor 65"], "priority": "Normal"},
+            {"patient_id": 2, "total_waiting_time": 5.0, "sectors_visited": ["Setor 0", "Saída"], "priority": "Normal"}
+        ]
+        self.table = ResultsTable(self.results, self.sectors)
+
+    def test_filters(self):
+        self.assertEqual(self.table.filter().tolist(), [0, 1, 2])
+        self.assertEqual(self.table.filter(sector="Setor 1").tolist(), [0])
+        self.assertEqual(self.table.filter(sector="Setor 65").tolist(), [1])
+        self.assertEqual(self.table.filter(priority="Normal", min_time=10).tolist(), [1])
+
+    def test_page_is_numeric(self):
+        indices = self.table.filter()
+        page = self.table.page(indices, 1, 2)
+        self.assertEqual(page["Paciente"].tolist(), [2])
+        self.assertTrue(np.issubdtype(page["Tempo Total (min)"].dtype, np.floating))
+        self.assertEqual(page["Setores Visitados"].iloc[0], "Setor 0 -> Saída")
+        self.assertEqual(ResultsTable.num_pages(len(indices), 2), 2)
+        self.assertEqual(ResultsTable.num_pages(0, 2), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+# test_sampling.py: Testes unitários para matrizes esparsas e tabelas de alias
+import unittest
+import numpy as np
+from models.sampling import SparseTransitions, AliasTable, uniform_block
+
+class TestSampling(unittest.TestCase):
+    def setUp(self):
+        self.dense = np.array([
+            [0.0, 0.6, 0.3, 0.0],
+            [0.2, 0.0, 0.0, 0.7],
+            [0.0, 0.0, 0.0, 0.0],
+            [0.1, 0.1, 0.1, 0.1]
+        ])
+
+    def test_csr_round_trip(self):
+        sparse = SparseTransitions.from_dense(self.dense)
+        self.assertEqual(len(sparse.data), 8)
+        np.testing.assert_array_equal(sparse.to_dense(), self.dense)
+        np.testing.assert_array_equal(SparseTransitions.from_any(sparse.to_dict()).to_dense(), self.dense)
+
+    def test_alias_frequencies(self):
+        table = AliasTable(SparseTransitions.from_dense(self.dense))
+        self.assertEqual(table.uniform_rows, [2])
+        uniforms = uniform_block(np.random.default_rng(0))
+        draws = 200000
+        for row in range(4):
+            counts = np.bincount([table.sample(row, uniforms.next()) for _ in range(draws)], minlength=4)
+            weights = self.dense[row] if self.dense[row].sum() > 0 else np.ones(4)
+            np.testing.assert_allclose(counts / draws, weights / weights.sum(), atol=0.01)
+
+    def test_alias_never_picks_missing_entries(self):
+        table = AliasTable(self.dense)
+        picks = {table.sample(0, u) for u in np.linspace(0, 1, 1000, endpoint=False)}
+        self.assertEqual(picks, {1, 2})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# test_schedule.py: Testes unitários da simulação contínua com escala por turno
+import unittest
+
+import numpy as np
+
+from models.hospital_sim import HospitalSimulator
+from models.schedule import ShiftSchedule, busy_minutes
+
+
+class TestShiftSchedule(unittest.TestCase):
+    def setUp(self):
+        self.config = {
+            "sectors": ["Triagem", "Consulta", "Exames"],
+            "transition_base": [[0.2, 0.5, 0.1], [0.2, 0.3, 0.3], [0.1, 0.5, 0.2]],
+            "exit_probs": [0.3, 0.3, 0.3],
+            "num_patients": 10,
+            "turno": "manhã",
+            "gravidade": "média",
+            "medicos_disponiveis": 2,
+            "prioridade_ativa": False,
+            "schedule": {
+                "days": 2,
+                "medicos": {"manhã": 4, "tarde": 2, "noite": 1},
+                "patients": {"manhã": 12, "tarde": 8, "noite": 3}
+            }
+        }
+
+    def test_single_pass_per_shift_metrics(self):
+        results, stats = HospitalSimulator(self.config, seed=1).run_simulation()
+        self.assertEqual(len(results), 2 * (12 + 8 + 3))
+        shifts = stats["shifts"]
+        self.assertEqual([row["Turno"] for row in shifts][:3], ["Dia 1 - manhã", "Dia 1 - tarde", "Dia 1 - noite"])
+        self.assertEqual([row["Chegadas"] for row in shifts], [12, 8, 3, 12, 8, 3])
+        self.assertEqual([row["Médicos"] for row in shifts], [4, 2, 1, 4, 2, 1])
+        for r in results:
+            self.assertGreaterEqual(r["departure_time"] - r["arrival_time"], r["total_waiting_time"] - 1e-9)
+        for row in shifts:
+            self.assertTrue(0 <= row["Ocupação Médicos (%)"] <= 100 + 1e-9)
+
+    def test_busy_minutes_with_overlapping_doctors(self):
+        # Dois médicos: [0, 10] e [2, 6] sobrepostos, depois [12, 15]
+        usage = [(0.0, 1), (2.0, 1), (6.0, -1), (10.0, -1), (12.0, 1), (15.0, -1)]
+        self.assertAlmostEqual(float(busy_minutes(usage, 0.0, 20.0)), 17.0)
+        np.testing.assert_allclose(busy_minutes(usage, [0.0, 5.0], [5.0, 13.0]), [8.0, 7.0])
+        self.assertEqual(float(busy_minutes([], 0.0, 20.0)), 0.0)
+        results, stats = HospitalSimulator(self.config, seed=1).run_simulation()
+        horizon = max(r["departure_time"] for r in results)
+        schedule = ShiftSchedule.from_config(self.config)
+        self.assertAlmostEqual(stats["doctor_occupation"],
+                               float(busy_minutes(stats["doctor_usage"], 0.0, horizon)) / schedule.doctor_minutes(horizon))
+        self.assertTrue(0 <= stats["doctor_occupation"] <= 1)
+
+    def test_reproducible_with_seed(self):
+        np.random.seed(3)
+        first, _ = HospitalSimulator(self.config, seed=1).run_simulation()
+        np.random.seed(4)
+        second, _ = HospitalSimulator(self.config, seed=1).run_simulation()
+        self.assertEqual([r["sectors_visited"] for r in first], [r["sectors_visited"] for r in second])
+        self.assertEqual(first, second)
+
+    def test_arrivals_inside_shifts(self):
+        schedule = ShiftSchedule.from_config(self.config)
+        arrivals = schedule.arrivals(np.random.default_rng(0))
+        self.assertTrue(np.all(np.diff(arrivals) >= 0))
+        self.assertEqual(int(np.sum(arrivals < schedule.shift_minutes)), 12)
+        self.assertLess(arrivals.max(), schedule.horizon)
+
+    def test_queue_carries_over(self):
+        # Um médico e muitas chegadas de manhã: parte da fila passa para a tarde
+        config = dict(self.config, schedule={"medicos": {"manhã": 1, "tarde": 1, "noite": 1},
+                                             "patients": {"manhã": 80, "tarde": 0, "noite": 0}})
+        results, _ = HospitalSimulator(config, seed=2).run_simulation()
+        self.assertTrue(any(r["departure_time"] > 480 for r in results))
+        self.assertTrue(all(r["turno"] == "manhã" for r in results))
+
+    def test_heap_engine_rejects_schedule(self):
+        with self.assertRaises(ValueError):
+            HospitalSimulator(self.config, engine="heap")
+
+    def test_unknown_turno(self):
+        with self.assertRaises(ValueError):
+            ShiftSchedule(medicos={"madrugada": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+# test_sensitivity.py: Testes unitários para a análise de sensibilidade
+import unittest
+import numpy as np
+from models.markov_analytics import routing_matrix, expected_visits
+from models.sensitivity import analyze, sobol_sample, evaluate_analytic, evaluate_simulation, SensitivityProblem
+
+class TestSensitivity(unittest.TestCase):
+    def setUp(self):
+        self.config = {
+            "sectors": ["Triagem", "Consulta", "Exames"],
+            "transition_base": [[0.1, 0.6, 0.2], [0.2, 0.3, 0.3], [0.1, 0.3, 0.4]],
+            "exit_probs": [0.1, 0.2, 0.2],
+            "num_patients": 20,
+            "turno": "manhã",
+            "gravidade": "média",
+            "medicos_disponiveis": 3,
+            "prioridade_ativa": True
+        }
+
+    def test_expected_visits_geometric(self):
+        # Com saída 0.5 em todos os setores, cada paciente faz em média 2 atendimentos
+        routing = routing_matrix(np.ones((3, 3)), [0.5, 0.5, 0.5])
+        visits = expected_visits(routing)
+        self.assertAlmostEqual(visits.sum(), 2.0)
+
+    def test_batched_visits_match_single(self):
+        problem = SensitivityProblem(self.config)
+        params = problem.scale(np.random.default_rng(0).random((4, problem.num_factors)))
+        batch = expected_visits(routing_matrix(params["transition_base"], params["exit_probs"]))
+        for k in range(4):
+            single = expected_visits(routing_matrix(params["transition_base"][k], params["exit_probs"][k]))
+            np.testing.assert_allclose(batch[k], single)
+
+    def test_sobol_sample_shape(self):
+        samples = sobol_sample(5, 8, rng=np.random.default_rng(0))
+        self.assertEqual(samples.shape, (8 * 7, 5))
+
+    def test_doctors_do_not_affect_service_time(self):
+        # `tempo_medio` soma só os atendimentos: os médicos não entram
+        for method in ["morris", "sobol"]:
+            analysis = analyze(self.config, method=method, metric="tempo_medio", samples=64)
+            ranking = {row["Parâmetro"]: row for row in analysis["ranking"]}
+            key = "mu_star" if method == "morris" else "ST"
+            self.assertAlmostEqual(ranking["Médicos"][key], 0.0)
+            self.assertGreater(ranking["Gravidade"][key], 0.0)
+
+    def test_doctors_affect_time_in_system(self):
+        config = dict(self.config, num_patients=100, medicos_disponiveis=1)
+        for method in ["morris", "sobol"]:
+            analysis = analyze(config, method=method, samples=64)
+            self.assertEqual(analysis["metric"], "tempo_no_sistema")
+            ranking = {row["Parâmetro"]: row for row in analysis["ranking"]}
+            key = "mu_star" if method == "morris" else "ST"
+            self.assertGreater(ranking["Médicos"][key], 0.0)
+
+    def test_time_in_system_follows_simulation(self):
+        # Consulta como gargalo: menos médicos, mais tempo no sistema (aproximação e simulação)
+        config = dict(self.config, num_patients=60, transition_base=[[0.0, 0.9, 0.0], [0.0, 0.5, 0.1], [0.0, 0.5, 0.1]],
+                      exit_probs=[0.1, 0.4, 0.4])
+        problem = SensitivityProblem(config)
+        unit = np.full((2, problem.num_factors), 0.5)
+        unit[:, -2] = [0.0, 0.99]
+        analytic = evaluate_analytic(problem, unit)
+        simulated = evaluate_simulation(problem, unit)
+        self.assertGreater(analytic["tempo_no_sistema"][0], analytic["tempo_no_sistema"][1])
+        self.assertGreater(simulated["tempo_no_sistema"][0], simulated["tempo_no_sistema"][1])
+        np.testing.assert_allclose(analytic["tempo_medio"][0], analytic["tempo_medio"][1])
+
+    def test_doctors_drive_makespan_when_consulta_is_busy(self):
+        analysis = analyze(self.config, method="morris", metric="makespan", samples=32)
+        ranking = {row["Parâmetro"]: row for row in analysis["ranking"]}
+        self.assertGreater(ranking["Médicos"]["mu_star"], 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+# test_surrogate.py: Testes unitários do modelo substituto (processo gaussiano)
+import tempfile
+import unittest
+
+import numpy as np
+
+from models.experiments import ExperimentPlan, run_plan
+from models.surrogate import GaussianProcess, SimulationSurrogate, surrogate_key
+
+
+class TestGaussianProcess(unittest.TestCase):
+    def test_fits_smooth_function(self):
+        rng = np.random.default_rng(0)
+        X = rng.random((30, 2))
+        y = np.sin(3 * X[:, 0]) + X[:, 1] ** 2
+        gp = GaussianProcess().fit(X, y)
+        X_test = rng.random((20, 2))
+        mean, std = gp.predict(X_test)
+        expected = np.sin(3 * X_test[:, 0]) + X_test[:, 1] ** 2
+        self.assertLess(np.max(np.abs(mean - expected)), 0.1)
+        self.assertTrue(np.all(std > 0))
+
+    def test_uncertainty_grows_away_from_data(self):
+        X = np.linspace(0, 1, 8).reshape(-1, 1)
+        gp = GaussianProcess(lengthscales=[0.2], noise=1e-4).fit(X, np.cos(4 * X[:, 0]), optimize=False)
+        _, near = gp.predict([[0.5]])
+        _, far = gp.predict([[2.0]])
+        self.assertLess(near[0], far[0])
+
+
+class TestSimulationSurrogate(unittest.TestCase):
+    def setUp(self):
+        self.config = {
+            "sectors": ["Triagem", "Consulta", "Exames"],
+            "transition_base": [[0.6, 0.2, 0.1], [0.2, 0.5, 0.2], [0.1, 0.3, 0.5]],
+            "exit_probs": [0.2, 0.2, 0.2],
+            "num_patients": 6,
+            "turno": "manhã",
+            "gravidade": "média",
+            "medicos_disponiveis": 2,
+            "prioridade_ativa": False
+        }
+
+    def test_key_ignores_model_inputs(self):
+        changed = dict(self.config, num_patients=60, medicos_disponiveis=5, turno="noite")
+        self.assertEqual(surrogate_key(self.config), surrogate_key(changed))
+        self.assertNotEqual(surrogate_key(self.config), surrogate_key(dict(self.config, exit_probs=[0.3, 0.2, 0.2])))
+
+    def test_from_points_plan(self):
+        points = [{"num_patients": 4, "medicos_disponiveis": 1}, {"num_patients": 8, "medicos_disponiveis": 3}]
+        plan = ExperimentPlan.from_points(self.config, points, replications=2)
+        rows = list(run_plan(plan, workers=1))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual({row["Pacientes"] for row in rows}, {4, 8})
+        with self.assertRaises(ValueError):
+            ExperimentPlan.from_points(self.config, [])
+
+    def test_rows_carry_the_simulated_point(self):
+        # Turno, gravidade e prioridade de nível único mudam a configuração, não os fatores
+        config = dict(self.config, turno="noite", gravidade="alta", prioridade_ativa=True)
+        plan = ExperimentPlan(config, {"medicos_disponiveis": [1, 3]})
+        rows = list(run_plan(plan, workers=1))
+        for row in rows:
+            self.assertEqual((row["turno"], row["gravidade"], row["prioridade_ativa"]), ("noite", "alta", True))
+            self.assertEqual(row["num_patients"], 6)
+        stale = SimulationSurrogate(self.config)
+        stale.add_rows(rows)
+        self.assertEqual(stale.points, [])
+        surrogate = SimulationSurrogate(config)
+        surrogate.add_rows(rows)
+        self.assertEqual({(p["turno"], p["gravidade"]) for p in surrogate.points}, {("noite", "alta")})
+        with self.assertRaises(ValueError):
+            surrogate.add_rows([{"num_patients": 5, "Tempo Médio (min)": 1.0, "Ocupação Médicos (%)": 1.0}])
+
+    def test_refine_trains_and_suggests_unseen_points(self):
+        surrogate = SimulationSurrogate(self.config)
+        self.assertIsNone(surrogate.predict([self.config]))
+        rows = surrogate.refine(6, workers=1)
+        self.assertEqual(len(rows), 6)
+        self.assertTrue(surrogate.trained)
+        predictions = surrogate.predict(surrogate.points[:2])
+        for mean, std in predictions.values():
+            self.assertEqual(mean.shape, (2,))
+            self.assertTrue(np.all(std >= 0))
+
+        known = {tuple(sorted(point.items())) for point in surrogate.points}
+        for point in surrogate.suggest(5):
+            self.assertNotIn(tuple(sorted(point.items())), known)
+
+    def test_save_and_load_round_trip(self):
+        surrogate = SimulationSurrogate(self.config)
+        rows = [
+            {"num_patients": n, "medicos_disponiveis": m, "turno": "manhã", "gravidade": "média",
+             "prioridade_ativa": False, "Tempo Médio (min)": 10.0 + n / m, "Ocupação Médicos (%)": 100.0 * n / (n + 10 * m)}
+            for n in (5, 10, 20) for m in (1, 2, 4)
+        ]
+        surrogate.add_rows(rows)
+        surrogate.add_rows([dict(rows[0], prioridade_ativa=True)])
+        self.assertEqual(len(surrogate.points), len(rows))
+        surrogate.fit()
+        probe = [{"num_patients": 12, "medicos_disponiveis": 3, "turno": "manhã", "gravidade": "média"}]
+        expected = surrogate.predict(probe)
+
+        with tempfile.TemporaryDirectory() as directory:
+            surrogate.save(directory)
+            loaded = SimulationSurrogate.load(self.config, directory)
+            empty = SimulationSurrogate.load(dict(self.config, exit_probs=[0.5, 0.5, 0.5]), directory)
+        self.assertEqual(loaded.points, surrogate.points)
+        for metric, (mean, std) in loaded.predict(probe).items():
+            np.testing.assert_allclose(mean, expected[metric][0])
+            np.testing.assert_allclose(std, expected[metric][1])
+        self.assertFalse(empty.trained)
+
+
+if __name__ == "__main__":
+    unittest.main()
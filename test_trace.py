@@ -0,0 +1,73 @@
+# test_trace.py: Testes unitários da reprodução de traços
+import os
+import tempfile
+import unittest
+
+from models.hospital_sim import HospitalSimulator
+from models.trace import PatientTrace
+
+
+class TestTraceReplay(unittest.TestCase):
+    def setUp(self):
+        self.config = {
+            "sectors": ["Triagem", "Consulta", "Exames"],
+            "num_patients": 200,
+            "gravidade": "média",
+            "medicos_disponiveis": 1,
+            "exit_probs": [0.2, 0.2, 0.2],
+            "prioridade_ativa": False
+        }
+        transition_probs = [[0.2, 0.5, 0.1], [0.2, 0.3, 0.3], [0.1, 0.5, 0.2]]
+        results, stats = HospitalSimulator(self.config, transition_probs, seed=5).run_simulation()
+        self.session = {"config": self.config, "results": results, "stats": stats}
+
+    def by_patient(self, results):
+        return {r["patient_id"]: r for r in results}
+
+    def test_replay_reproduces_paths_and_times(self):
+        for engine in ("simpy", "heap"):
+            replay, _ = HospitalSimulator(self.config, trace=self.session, engine=engine).run_simulation()
+            original = self.by_patient(self.session["results"])
+            for patient_id, result in self.by_patient(replay).items():
+                self.assertEqual(result["sectors_visited"], original[patient_id]["sectors_visited"])
+                self.assertAlmostEqual(result["total_waiting_time"], original[patient_id]["total_waiting_time"])
+
+    def test_more_doctors_only_change_contention(self):
+        base = HospitalSimulator(self.config, trace=self.session)
+        _, base_stats = base.run_simulation()
+        staffed = HospitalSimulator(dict(self.config, medicos_disponiveis=8), trace=self.session)
+        results, stats = staffed.run_simulation()
+        self.assertEqual(stats["sector_visits"], base_stats["sector_visits"])
+        self.assertEqual(
+            sorted(r["total_waiting_time"] for r in results),
+            sorted(r["total_waiting_time"] for r in self.session["results"])
+        )
+        self.assertLess(staffed.medicos.mean_wait, base.medicos.mean_wait)
+
+    def test_legacy_session_splits_total_time(self):
+        legacy = [{k: v for k, v in r.items() if k != "service_times"} for r in self.session["results"]]
+        trace = PatientTrace.from_results(legacy, self.config["sectors"], {"Consulta": 15.0})
+        self.assertEqual(len(trace), len(legacy))
+        totals = {pid: trace.service_times[trace.offsets[k]:trace.offsets[k + 1]].sum()
+                  for k, pid in enumerate(trace.patient_ids)}
+        for r in legacy:
+            self.assertAlmostEqual(totals[r["patient_id"]], r["total_waiting_time"])
+
+    def test_columnar_round_trip(self):
+        trace = PatientTrace.from_session(self.session)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.npz")
+            trace.save(path)
+            loaded = PatientTrace.load(path)
+        self.assertEqual(loaded.sector_names, trace.sector_names)
+        self.assertEqual(loaded.sectors.tolist(), trace.sectors.tolist())
+        self.assertEqual(loaded.exited.tolist(), trace.exited.tolist())
+
+    def test_unknown_sector(self):
+        config = dict(self.config, sectors=["Triagem", "Consulta"], exit_probs=[0.2, 0.2])
+        with self.assertRaises(ValueError):
+            HospitalSimulator(config, trace=self.session)
+
+
+if __name__ == "__main__":
+    unittest.main()
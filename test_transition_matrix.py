@@ -0,0 +1,66 @@
+# test_transition_matrix.py: Testes unitários da matriz de transição editável
+import os
+import unittest
+
+import numpy as np
+
+from data_manager import DataManager
+from models.transition_matrix import TransitionMatrix, EXIT_COLUMN, DEFAULT_TRANSITION, DEFAULT_EXIT
+
+
+class TestTransitionMatrix(unittest.TestCase):
+    def setUp(self):
+        self.matrix = TransitionMatrix(
+            ["Triagem", "Consulta", "Exames"],
+            [[0.6, 0.2, 0.1], [0.2, 0.5, 0.2], [0.1, 0.3, 0.5]],
+            [0.1, 0.1, 0.1]
+        )
+
+    def test_csv_round_trip(self):
+        text = self.matrix.to_csv()
+        self.assertTrue(text.startswith("Setor,Triagem,Consulta,Exames,Saída"))
+        loaded = TransitionMatrix.from_csv(text)
+        self.assertEqual(loaded.sectors, self.matrix.sectors)
+        np.testing.assert_allclose(loaded.transitions, self.matrix.transitions)
+        np.testing.assert_allclose(loaded.exits, self.matrix.exits)
+        with self.assertRaises(ValueError):
+            TransitionMatrix.from_csv("Setor,A,B,Saída\nB,0.5,0.4,0.1\nA,0.5,0.4,0.1\n")
+
+    def test_yaml_uses_config_schema(self):
+        data_manager = DataManager()
+        loaded = TransitionMatrix.from_yaml(self.matrix.to_yaml(), data_manager)
+        np.testing.assert_allclose(loaded.transitions, self.matrix.transitions)
+        self.assertEqual(data_manager.validate_config(loaded.to_config())["sectors"], self.matrix.sectors)
+
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "config.yaml")
+        with open(path, encoding="utf-8") as f:
+            static = TransitionMatrix.from_yaml(f.read(), data_manager, path)
+        self.assertEqual(static.sectors, ["Triagem", "Consulta", "Exames"])
+        np.testing.assert_allclose(static.exits, 0.1)
+        with self.assertRaises(ValueError):
+            TransitionMatrix.from_yaml("sectors: [A]\ntransition_base: [[1.0]]\n", data_manager)
+
+    def test_frame_and_resize(self):
+        frame = self.matrix.to_frame()
+        frame.loc["Consulta", EXIT_COLUMN] = 0.3
+        edited = TransitionMatrix.from_frame(frame, self.matrix.sectors)
+        self.assertEqual(edited.exits[1], 0.3)
+        resized = edited.resized(["Exames", "Triagem", "Raio-X"])
+        np.testing.assert_allclose(resized.transitions[:2, :2], [[0.5, 0.1], [0.1, 0.6]])
+        np.testing.assert_allclose(resized.transitions[2], DEFAULT_TRANSITION)
+        np.testing.assert_allclose(resized.exits, [0.1, 0.1, DEFAULT_EXIT])
+
+    def test_errors(self):
+        self.assertEqual(self.matrix.errors(), [])
+        self.matrix.transitions[1, 1] = 0.7
+        self.matrix.transitions[2, 0] = -0.1
+        self.matrix.exits[0] = np.nan
+        errors = self.matrix.errors()
+        self.assertEqual(len(errors), 3)
+        self.assertIn("Consulta devem somar 1 (atual: 1.20)", errors[2])
+        large = TransitionMatrix([f"S{i}" for i in range(300)], np.full((300, 300), 0.9 / 300), np.full(300, 0.1))
+        self.assertEqual(large.errors(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+# test_validation.py: Testes unitários da validação de motores
+import os
+import unittest
+
+import numpy as np
+
+from models.validation import (
+    ks_2samp, kolmogorov_sf, replication_ks, replication_test, student_t_p_value, compare, validate, stress_config, session_corpus, fastest_within_tolerance,
+    DEFAULT_TOLERANCE
+)
+
+
+class TestValidation(unittest.TestCase):
+    def test_ks_2samp(self):
+        rng = np.random.default_rng(0)
+        a = rng.exponential(10, 2000)
+        statistic, p_value = ks_2samp(a, a)
+        self.assertEqual(statistic, 0.0)
+        self.assertEqual(p_value, 1.0)
+        _, p_same = ks_2samp(a, rng.exponential(10, 2000))
+        _, p_shifted = ks_2samp(a, rng.exponential(12, 2000))
+        self.assertGreater(p_same, 0.01)
+        self.assertLess(p_shifted, 1e-4)
+        self.assertAlmostEqual(kolmogorov_sf(1.36), 0.049, places=3)
+
+    def test_replication_tests(self):
+        self.assertAlmostEqual(student_t_p_value(9.6, 2), 1 - 9.6 / np.sqrt(2 + 9.6 ** 2), places=4)
+        self.assertAlmostEqual(student_t_p_value(2.228, 10), 0.05, places=3)
+        self.assertEqual(replication_test([1.0], [5.0, 6.0]), (0.0, 1.0))
+        rng = np.random.default_rng(3)
+        # Replicações com escalas diferentes (filas partilhadas): o KS por paciente reprova, o agrupado não
+        reference = [rng.exponential(scale, 500) for scale in rng.normal(100, 25, 5)]
+        candidate = [rng.exponential(scale, 500) for scale in rng.normal(100, 25, 5)]
+        _, p_pooled = ks_2samp(np.concatenate(reference), np.concatenate(candidate))
+        _, p_grouped = replication_ks(reference, candidate)
+        self.assertLess(p_pooled, 0.01)
+        self.assertGreater(p_grouped, 0.01)
+        shifted = [stays * 3 for stays in candidate]
+        self.assertLess(replication_ks(reference, shifted)[1], 0.01)
+
+    def test_biased_engine_is_rejected(self):
+        rng = np.random.default_rng(1)
+
+        def sample(scale):
+            visits = rng.poisson(3.0, (4000, 3)).astype(float)
+            return {"totals": rng.exponential(30 * scale, 4000), "stays": list(rng.exponential(90 * scale, (4, 1000))),
+                    "visits": visits * scale, "occupations": rng.normal(50.0, 1.0, 4), "throughput": 1000.0}
+
+        reference = sample(1.0)
+        good = compare("c", "heap", reference, sample(1.0), DEFAULT_TOLERANCE)
+        bad = compare("c", "heap", reference, sample(1.2), DEFAULT_TOLERANCE)
+        self.assertTrue(good["Aprovado"])
+        self.assertFalse(bad["Aprovado"])
+        self.assertGreater(bad["Erro Tempo Médio (%)"], 10)
+        # Mesmo total de visitas, mas trocadas entre setores
+        swapped_reference = dict(reference, visits=rng.poisson([3.0, 1.0], (4000, 2)).astype(float))
+        swapped = dict(sample(1.0), visits=rng.poisson([1.0, 3.0], (4000, 2)).astype(float))
+        swapped["totals"] = reference["totals"]
+        row = compare("c", "heap", swapped_reference, swapped, DEFAULT_TOLERANCE)
+        self.assertFalse(row["Aprovado"])
+        self.assertGreater(row["Erro Visitas (%)"], 100)
+        self.assertLess(row["p Visitas"], 0.01)
+        # Mesmos atendimentos, mas filas mais longas: só o tempo no sistema muda
+        queued = dict(sample(1.0), totals=reference["totals"], visits=reference["visits"])
+        queued["stays"] = [stays * 1.3 for stays in reference["stays"]]
+        row = compare("c", "heap", reference, queued, DEFAULT_TOLERANCE)
+        self.assertFalse(row["Aprovado"])
+        self.assertGreater(row["Erro Tempo no Sistema (%)"], 20)
+
+    def test_occupation_is_tested_per_replication(self):
+        rng = np.random.default_rng(2)
+        reference = {"totals": rng.exponential(30, 4000), "stays": list(rng.exponential(90, (3, 1000))),
+                     "visits": rng.poisson(3.0, (4000, 3)).astype(float), "occupations": rng.normal(60.0, 8.0, 3),
+                     "throughput": 1000.0}
+
+        def candidate(occupations):
+            return dict(reference, occupations=np.asarray(occupations, dtype=float))
+
+        # Replicações ruidosas: uma diferença de 10 p.p. não é detetável
+        noisy = compare("c", "heap", reference, candidate(reference["occupations"] + 10.0 + rng.normal(0, 8.0, 3)),
+                        DEFAULT_TOLERANCE)
+        self.assertGreater(noisy["Erro Ocupação (p.p.)"], DEFAULT_TOLERANCE["occupation_pp"])
+        self.assertGreaterEqual(noisy["p Ocupação"], DEFAULT_TOLERANCE["alpha"])
+        self.assertTrue(noisy["Aprovado"])
+        # Replicações estáveis: o mesmo desvio reprova
+        stable = dict(reference, occupations=rng.normal(60.0, 0.5, 6))
+        biased = compare("c", "heap", stable, candidate(rng.normal(70.0, 0.5, 6)), DEFAULT_TOLERANCE)
+        self.assertLess(biased["p Ocupação"], DEFAULT_TOLERANCE["alpha"])
+        self.assertFalse(biased["Aprovado"])
+
+    def test_validate_corpus(self):
+        corpus = {"pequeno": stress_config(5, exit_prob=0.2, medicos=2, num_patients=400)}
+        rows = validate(corpus, ["heap", "kernel-numpy", "analytic"], replications=2)
+        self.assertEqual([row["Motor"] for row in rows], ["heap", "kernel-numpy", "analytic"])
+        for row in rows:
+            self.assertTrue(row["Aprovado"], row)
+            self.assertGreater(row["Pacientes/s"], 0)
+        self.assertIn(fastest_within_tolerance(rows), ("heap", "kernel-numpy"))
+
+    def test_session_corpus(self):
+        sessions = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions")
+        corpus = session_corpus([sessions], min_patients=50)
+        self.assertTrue(corpus)
+        for config in corpus.values():
+            self.assertGreaterEqual(config["num_patients"], 50)
+            self.assertIn("sectors", config)
+
+
+if __name__ == "__main__":
+    unittest.main()
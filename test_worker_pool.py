@@ -0,0 +1,91 @@
+# test_worker_pool.py: Testes unitários do pool de simulação partilhado
+import threading
+import unittest
+from concurrent.futures import Future
+
+from models.experiments import ExperimentPlan, run_plan
+from models.worker_pool import SimulationPool, PoolBusyError
+
+
+class ManualExecutor:
+    """Executor que só corre as tarefas quando o teste manda (pedidos ficam em curso)."""
+
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.calls.append((future, fn, args))
+        return future
+
+    def run_all(self):
+        calls, self.calls = self.calls, []
+        for future, fn, args in calls:
+            future.set_result(fn(*args))
+
+
+class TestSimulationPool(unittest.TestCase):
+    def setUp(self):
+        self.config = {
+            "sectors": ["Triagem", "Consulta", "Exames"],
+            "transition_base": [[0.6, 0.2, 0.1], [0.2, 0.5, 0.2], [0.1, 0.3, 0.5]],
+            "exit_probs": [0.1, 0.1, 0.1],
+            "num_patients": 5,
+            "turno": "manhã",
+            "gravidade": "média",
+            "medicos_disponiveis": 2,
+            "prioridade_ativa": True
+        }
+
+    def test_identical_requests_are_coalesced(self):
+        executor = ManualExecutor()
+        pool = SimulationPool(workers=1, executor=executor)
+        first = pool.submit(self.config, seed=1)
+        second = pool.submit(dict(self.config), seed=1)
+        other = pool.submit(self.config, seed=2)
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(len(executor.calls), 2)
+        executor.run_all()
+        self.assertIs(first.result(), second.result())
+        self.assertEqual(len(first.result()["results"]), 5)
+        stats = pool.stats()
+        self.assertEqual((stats["submitted"], stats["coalesced"], stats["completed"], stats["in_flight"]), (2, 1, 2, 0))
+        # Depois de terminar, o mesmo pedido volta a ser executado
+        pool.submit(self.config, seed=1)
+        self.assertEqual(len(executor.calls), 1)
+
+    def test_admission_control(self):
+        executor = ManualExecutor()
+        pool = SimulationPool(workers=1, max_pending=2, executor=executor)
+        pool.submit(self.config, seed=1)
+        pool.submit(self.config, seed=2)
+        # Um pedido igual a um em curso não ocupa vaga
+        pool.submit(self.config, seed=2, block=False)
+        with self.assertRaises(PoolBusyError):
+            pool.submit(self.config, seed=3, block=False)
+        with self.assertRaises(PoolBusyError):
+            pool.submit(self.config, seed=3, timeout=0.05)
+        self.assertEqual(pool.stats()["rejected"], 2)
+
+        # Um pedido bloqueado entra assim que uma vaga fica livre
+        admitted = []
+        waiter = threading.Thread(target=lambda: admitted.append(pool.submit(self.config, seed=3, timeout=5)))
+        waiter.start()
+        executor.run_all()
+        waiter.join(5)
+        self.assertEqual(len(admitted), 1)
+
+    def test_run_plan_through_pool(self):
+        plan = ExperimentPlan(self.config, {"medicos_disponiveis": [1, 2]}, replications=2)
+        pool = SimulationPool(workers=2)
+        try:
+            pooled = sorted(run_plan(plan, pool=pool), key=lambda row: (row["Ponto"], row["Replicação"]))
+        finally:
+            pool.shutdown()
+        local = sorted(run_plan(plan, workers=1), key=lambda row: (row["Ponto"], row["Replicação"]))
+        self.assertEqual(pooled, local)
+
+
+if __name__ == "__main__":
+    unittest.main()
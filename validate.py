@@ -0,0 +1,80 @@
+# validate.py: Validação de precisão e velocidade dos motores contra a referência SimPy
+import argparse
+import logging
+import os
+import sys
+
+import pandas as pd
+
+from models.validation import (
+    available_engines, session_corpus, stress_corpus, validate, engine_summary, fastest_within_tolerance,
+    DEFAULT_TOLERANCE, ENGINES
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compara motores e estimadores com o modelo SimPy (precisão e débito)."
+    )
+    parser.add_argument("corpus", nargs="*", default=["sessions"],
+                        help="Sessões (.json) ou diretórios com sessões (por omissão: sessions/)")
+    parser.add_argument("--no-stress", action="store_true", help="Não incluir os casos de esforço sintéticos")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, help="Motores a validar (por omissão: todos os disponíveis)")
+    parser.add_argument("-r", "--replications", type=int, default=2, help="Replicações por motor e configuração (o tempo no sistema e a ocupação são testados "
+                             "sobre replicações: com menos de 5 os testes têm pouca potência)")
+    parser.add_argument("--patients", type=int, default=1000, help="Mínimo de pacientes por replicação")
+    parser.add_argument("--seed", type=int, default=0, help="Semente base")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_TOLERANCE["alpha"], help="Nível dos testes estatísticos")
+    parser.add_argument("--ks-tolerance", type=float, default=DEFAULT_TOLERANCE["ks_d"],
+                        help="Distância KS aceite mesmo quando detetável")
+    parser.add_argument("--mean-tolerance", type=float, default=DEFAULT_TOLERANCE["mean_rel"],
+                        help="Erro relativo máximo dos tempos médios (no sistema e de atendimento) e das visitas")
+    parser.add_argument("--occupation-tolerance", type=float, default=DEFAULT_TOLERANCE["occupation_pp"],
+                        help="Erro da ocupação dos médicos aceite mesmo quando detetável (pontos percentuais)")
+    parser.add_argument("-o", "--output", default="validacao.csv", help="Relatório (.csv ou .json)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Mostrar progresso")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    logging.getLogger("models").setLevel(logging.INFO if args.verbose else logging.ERROR)
+
+    try:
+        corpus = session_corpus(args.corpus, args.patients)
+    except (OSError, ValueError) as e:
+        print(f"Erro ao carregar o corpus: {e}", file=sys.stderr)
+        return 2
+    if not args.no_stress:
+        corpus.update(stress_corpus(args.patients))
+    if not corpus:
+        print("Corpus vazio.", file=sys.stderr)
+        return 2
+    engines = args.engines or available_engines()
+    if "kernel-numba" in engines and "kernel-numba" not in available_engines():
+        print("O Numba não está instalado: kernel-numba ignorado.", file=sys.stderr)
+        engines = [engine for engine in engines if engine != "kernel-numba"]
+
+    tolerance = {"alpha": args.alpha, "ks_d": args.ks_tolerance, "mean_rel": args.mean_tolerance, "visits_rel": args.mean_tolerance,
+                 "occupation_pp": args.occupation_tolerance}
+    rows = validate(corpus, engines, args.replications, args.seed, tolerance)
+    df = pd.DataFrame(rows)
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    if args.output.endswith(".json"):
+        df.to_json(args.output, orient="records", indent=2, force_ascii=False)
+    else:
+        df.to_csv(args.output, index=False)
+
+    print(df.to_string(index=False, float_format=lambda v: f"{v:.3g}"))
+    print()
+    print(pd.DataFrame(engine_summary(rows)).to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    print(f"Motor mais rápido dentro da tolerância: {fastest_within_tolerance(rows)}")
+    print(f"Relatório gravado em {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,22 +7,30 @@ import streamlit as st
 import json
 
 class Visualizer:
-    def plot_waiting_times(self, results):
+    # Os métodos *_figure constroem os gráficos sem os mostrar (podem ficar em cache);
+    # os plot_* mostram-nos na página
+    def waiting_times_figure(self, results):
         times = [r["total_waiting_time"] for r in results]
         fig, ax = plt.subplots()
         sns.histplot(times, bins=20, kde=True, ax=ax)
         ax.set_title("Distribuição dos Tempos de Espera")
         ax.set_xlabel("Tempo Total (min)")
         ax.set_ylabel("Frequência")
-        st.pyplot(fig)
+        return fig
 
-    def plot_transition_probabilities(self, transition_probs, sectors):
+    def plot_waiting_times(self, results):
+        st.pyplot(self.waiting_times_figure(results))
+
+    def transition_probabilities_figure(self, transition_probs, sectors):
         fig, ax = plt.subplots()
         sns.heatmap(transition_probs, annot=True, fmt=".2f", cmap="Blues", xticklabels=sectors, yticklabels=sectors, ax=ax)
         ax.set_title("Probabilidades de Transição")
-        st.pyplot(fig)
+        return fig
 
-    def plot_sankey_flow(self, results, sectors):
+    def plot_transition_probabilities(self, transition_probs, sectors):
+        st.pyplot(self.transition_probabilities_figure(transition_probs, sectors))
+
+    def sankey_figure(self, results, sectors):
         labels = sectors + ["Saída"]
         source = []
         target = []
@@ -46,9 +54,12 @@ class Visualizer:
             link=dict(source=source, target=target, value=value)
         )])
         fig.update_layout(title_text="Fluxo de Pacientes (Sankey)")
-        st.plotly_chart(fig)
+        return fig
 
-    def plot_doctor_occupation(self, doctor_usage):
+    def plot_sankey_flow(self, results, sectors):
+        st.plotly_chart(self.sankey_figure(results, sectors))
+
+    def doctor_occupation_figure(self, doctor_usage):
         times = [t for t, _ in doctor_usage]
         usage = [u for _, u in doctor_usage]
         fig, ax = plt.subplots()
@@ -56,18 +67,24 @@ class Visualizer:
         ax.set_title("Ocupação dos Médicos")
         ax.set_xlabel("Tempo (min)")
         ax.set_ylabel("Médicos Ocupados")
-        st.pyplot(fig)
+        return fig
 
-    def plot_sector_times(self, stats, sectors):
+    def plot_doctor_occupation(self, doctor_usage):
+        st.pyplot(self.doctor_occupation_figure(doctor_usage))
+
+    def sector_times_figure(self, stats, sectors):
         sector_times = stats["avg_time_per_sector"]
         fig, ax = plt.subplots()
         sns.barplot(x=list(sector_times.values()), y=list(sector_times.keys()), ax=ax, palette="Blues")
         ax.set_title("Tempo Médio por Setor")
         ax.set_xlabel("Tempo (min)")
         ax.set_ylabel("Setor")
-        st.pyplot(fig)
+        return fig
 
-    def plot_normalized_probs(self, transition_probs, exit_probs, sectors):
+    def plot_sector_times(self, stats, sectors):
+        st.pyplot(self.sector_times_figure(stats, sectors))
+
+    def normalized_probs_figure(self, transition_probs, exit_probs, sectors):
         fig, ax = plt.subplots(figsize=(8, 6))
         data = np.array(transition_probs)
         exit_data = np.array(exit_probs).reshape(-1, 1)
@@ -75,4 +92,20 @@ class Visualizer:
         labels = sectors + ["Saída"]
         sns.heatmap(combined, annot=True, fmt=".3f", cmap="Blues", xticklabels=labels, yticklabels=sectors, ax=ax)
         ax.set_title("Probabilidades Normalizadas (Transição + Saída)")
-        st.pyplot(fig)
\ No newline at end of file
+        return fig
+
+    def plot_normalized_probs(self, transition_probs, exit_probs, sectors):
+        st.pyplot(self.normalized_probs_figure(transition_probs, exit_probs, sectors))
+
+    def plot_occupancy(self, times, analytic, simulated, sectors):
+        """Ocupação esperada (cadeia contínua) e simulada de cada setor ao longo do tempo."""
+        fig, ax = plt.subplots(figsize=(9, 5))
+        colors = sns.color_palette("tab10", len(sectors))
+        for idx, sector in enumerate(sectors):
+            ax.plot(times, analytic[:, idx], color=colors[idx], label=f"{sector} (analítica)")
+            ax.step(times, simulated[:, idx], where="post", color=colors[idx], linestyle="--", alpha=0.6)
+        ax.set_title("Pacientes por Setor: analítica (linha) vs simulação (tracejado)")
+        ax.set_xlabel("Tempo (min)")
+        ax.set_ylabel("Pacientes no Setor")
+        ax.legend(fontsize="small", ncol=2)
+        st.pyplot(fig)